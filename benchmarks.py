@@ -0,0 +1,967 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Benchmarks comparing the hash map implementations and their options.
+
+import asyncio
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import islice, permutations
+from concurrent.futures import ThreadPoolExecutor
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from cow import PAGE_SIZE
+from hash_functions import HASH_FUNCTIONS, SeededHash, builtin_hash, fnv1a_64, hash_many, word_hash
+from hash_map_async import AsyncHashMap, event_loop_lag
+from hash_map_cache import CACHE_POLICIES, BoundedCache
+from hash_map_cuckoo import BUCKET_SLOTS, CuckooHashMap
+from hash_map_mmap import MmapHashMap
+from hash_map_oa import (PROBING_STRATEGIES, ArrayHashMap, HashMap as OAHashMap,
+                         NumpyIntHashMap, SwissHashMap, np)
+from hash_map_parallel import parallel_build
+from hash_map_sc import (ARRAY_CHAINS, LINKED_CHAINS, MOVE_TO_FRONT_CHAINS, TREEIFY_THRESHOLD,
+                         HashMap as SCHashMap, find_mode, top_k)
+from hash_map_sharded import ShardedHashMap
+from primes import next_prime
+
+
+def polynomial_hash(key: str) -> int:
+    """
+    Per-character hash loop like hash_function_1/2, but well distributed, so
+    large benchmark tables are not dominated by collisions.
+    """
+    hash = 0
+    for letter in key:
+        hash = (hash * 31 + ord(letter)) & 0xFFFFFFFF
+    return hash
+
+
+def _elapsed(func, *args) -> float:
+    """
+    Times a single call of a function.
+
+    :param func: The function that will be timed.
+    :param args: Positional arguments passed to the function.
+
+    :return: A float value representing the elapsed seconds.
+    """
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def _build(map_class, keys: list, function=polynomial_hash):
+    """
+    Builds a map by putting every key one at a time.
+
+    :param map_class: The hash map class that will be built.
+    :param keys: List of keys that will be added with their index as value.
+    :param function: The hash function given to the map.
+
+    :return: The built hash map.
+    """
+    m = map_class(11, function)
+    for value, key in enumerate(keys):
+        m.put(key, value)
+    return m
+
+
+def _bytes_per_entry(map_class, keys: list) -> float:
+    """
+    Measures the memory allocated by a map while it is built, excluding the keys.
+
+    :param map_class: The hash map class that will be measured.
+    :param keys: List of keys that will be added.
+
+    :return: A float value representing the allocated bytes per entry.
+    """
+    tracemalloc.start()
+    m = _build(map_class, keys)
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del m
+    return allocated / len(keys)
+
+
+def _lookups(m, keys: list) -> None:
+    """
+    Calls get for every key in the list.
+    """
+    for key in keys:
+        m.get(key)
+
+
+def bench_array_engine(n: int = 100_000) -> None:
+    """
+    Compares memory per entry and lookups per second of HashEntry storage
+    against the array-backed engine.
+
+    :param n: Int value representing the number of keys.
+
+    :return: None.
+    """
+    keys = ['str' + str(i) for i in range(n)]
+    for map_class in (OAHashMap, ArrayHashMap):
+        per_entry = _bytes_per_entry(map_class, keys)
+        m = _build(map_class, keys)
+        seconds = _elapsed(_lookups, m, keys)
+        print(f"{map_class.__name__:>14}: {per_entry:8.1f} bytes/entry "
+              f"{n / seconds:12,.0f} lookups/s")
+
+
+def _hash_all(function, keys: list) -> None:
+    """
+    Calls the hash function once for every key in the list.
+    """
+    for key in keys:
+        function(key)
+
+
+def bench_resize(n: int = 1_000_000) -> None:
+    """
+    Times resize_table on loaded maps, next to the cost of hashing every key
+    again, which cached hashes remove from each resize.
+
+    :param n: Int value representing the number of keys.
+
+    :return: None.
+    """
+    keys = ['str' + str(i) for i in range(n)]
+    rehash = _elapsed(_hash_all, polynomial_hash, keys)
+    for map_class in (OAHashMap, SCHashMap):
+        m = _build(map_class, keys)
+        seconds = _elapsed(m.resize_table, m.get_capacity() * 2)
+        print(f"{map_class.__module__:>14}: resize {seconds:8.3f}s "
+              f"(hashing every key again would add {rehash:.3f}s)")
+
+
+def _percentile(samples: list, percent: float) -> float:
+    """
+    Returns the given percentile of a sorted list of samples.
+    """
+    return samples[min(len(samples) - 1, int(len(samples) * percent / 100))]
+
+
+def bench_incremental_resize(n: int = 200_000) -> None:
+    """
+    Compares insert latency percentiles with stop-the-world and incremental resizing.
+
+    :param n: Int value representing the number of keys.
+
+    :return: None.
+    """
+    keys = ['str' + str(i) for i in range(n)]
+    clock = time.perf_counter
+    for map_class in (OAHashMap, SCHashMap):
+        for incremental in (False, True):
+            m = map_class(11, polynomial_hash, incremental)
+            samples = []
+            for value, key in enumerate(keys):
+                start = clock()
+                m.put(key, value)
+                samples.append(clock() - start)
+            samples.sort()
+            print(f"{map_class.__module__:>14} incremental={incremental!s:<5}: "
+                  f"p50 {_percentile(samples, 50) * 1e6:7.2f}us "
+                  f"p99 {_percentile(samples, 99) * 1e6:7.2f}us "
+                  f"p99.99 {_percentile(samples, 99.99) * 1e6:9.2f}us "
+                  f"max {samples[-1] * 1e3:8.2f}ms")
+
+
+def bench_tombstone_churn(n: int = 20_000, rounds: int = 10) -> None:
+    """
+    Keeps n live keys in an open addressing map while every round removes and
+    inserts n keys. Miss lookups must probe until an empty bucket, so their
+    cost shows whether tombstones are letting probe chains grow.
+
+    :param n: Int value representing the number of live keys.
+    :param rounds: Int value representing the number of churn rounds.
+
+    :return: None.
+    """
+    misses = ['miss' + str(i) for i in range(n)]
+    m = _build(OAHashMap, ['str' + str(i) for i in range(n)])
+    for churn in range(1, rounds + 1):
+        for i in range(n):
+            m.remove('str' + str((churn - 1) * n + i))
+            m.put('str' + str(churn * n + i), i)
+        seconds = _elapsed(_lookups, m, misses)
+        print(f"round {churn:2}: {m.get_tombstones():7} tombstones "
+              f"{m.get_capacity():8} capacity {seconds / n * 1e6:6.2f}us per miss")
+
+
+def _put_loop(m, pairs: list) -> None:
+    """
+    Calls put for every key/value pair in the list.
+    """
+    for key, value in pairs:
+        m.put(key, value)
+
+
+def bench_bulk_load(n: int = 200_000) -> None:
+    """
+    Compares loading a map with a put loop against a single put_many call.
+
+    :param n: Int value representing the number of keys.
+
+    :return: None.
+    """
+    pairs = [('str' + str(i), i) for i in range(n)]
+    for map_class in (OAHashMap, SCHashMap):
+        loop = _elapsed(_put_loop, map_class(11, polynomial_hash), pairs)
+        bulk = _elapsed(map_class(11, polynomial_hash).put_many, pairs)
+        print(f"{map_class.__module__:>14}: put loop {loop:7.3f}s put_many {bulk:7.3f}s")
+
+
+def bench_probing(n: int = 100_000) -> None:
+    """
+    Compares probe lengths and lookup throughput of each probing strategy.
+
+    :param n: Int value representing the number of keys.
+
+    :return: None.
+    """
+    keys = ['str' + str(i) for i in range(n)]
+    for probing in PROBING_STRATEGIES:
+        m = OAHashMap(11, polynomial_hash, probing=probing)
+        m.put_many((key, value) for value, key in enumerate(keys))
+        stats = m.probe_stats()
+        seconds = _elapsed(_lookups, m, keys)
+        print(f"{probing:>14}: average probe {stats['average']:5.2f} max probe {stats['max']:4} "
+              f"{n / seconds:12,.0f} lookups/s")
+
+
+def bench_numpy_lookups(n: int = 10_000_000, size: int = 1_000_000) -> None:
+    """
+    Compares scalar get calls against the vectorized NumpyIntHashMap.get_many
+    on integer keys, about half of which are hits.
+
+    :param n: Int value representing the number of lookups.
+    :param size: Int value representing the number of keys in the map.
+
+    :return: None.
+    """
+    if np is None:
+        print("NumPy is not installed, skipping")
+        return
+    m = NumpyIntHashMap(size * 2)
+    for key in range(0, size * 2, 2):
+        m.put(key, key)
+    queries = np.random.default_rng(0).integers(0, size * 2, n)
+
+    sample = queries[:min(n, 200_000)].tolist()     # The scalar path is timed on a sample
+    scalar = _elapsed(_lookups, m, sample) / len(sample)
+    vector = _elapsed(m.get_many, queries) / n
+    print(f"scalar get: {1 / scalar:14,.0f} lookups/s")
+    print(f"  get_many: {1 / vector:14,.0f} lookups/s")
+
+
+def _trial_division_next_prime(capacity: int) -> int:
+    """
+    The trial division prime search the maps used before primes.next_prime.
+    """
+    if capacity % 2 == 0:
+        capacity += 1
+    while True:
+        factor = 3
+        while factor ** 2 <= capacity and capacity % factor != 0:
+            factor += 2
+        if capacity > 2 and factor ** 2 > capacity:
+            return capacity
+        capacity += 2
+
+
+def _next_primes(function, sizes: list) -> None:
+    """
+    Calls a prime search function for every size in the list.
+    """
+    for size in sizes:
+        function(size)
+
+
+def _construct(map_class, sizes: list) -> None:
+    """
+    Constructs one map for every size in the list.
+    """
+    for size in sizes:
+        map_class(size, polynomial_hash)
+
+
+def bench_prime_startup(count: int = 1000) -> None:
+    """
+    Times constructing maps of assorted sizes, and the prime search alone for
+    assorted sizes up to 2 ** 40 that are too large to allocate.
+
+    :param count: Int value representing the number of maps and sizes.
+
+    :return: None.
+    """
+    rng = random.Random(0)
+    small = [rng.randrange(1, 5000) for _ in range(count)]
+    large = [rng.randrange(2 ** 30, 2 ** 40) for _ in range(count // 10)]
+
+    print(f"construct {count} maps: {_elapsed(_construct, OAHashMap, small):7.3f}s")
+    for function in (_trial_division_next_prime, next_prime):
+        print(f"{function.__name__:>26}: {_elapsed(_next_primes, function, large):7.3f}s "
+              f"for {len(large)} sizes up to 2 ** 40")
+
+
+def _find_mode_get_put(da: DynamicArray) -> None:
+    """
+    Counts values with a get followed by a put, two chain walks per element.
+    """
+    m = SCHashMap()
+    for num in range(da.length()):
+        count = m.get(da[num])
+        m.put(da[num], 1 if count is None else count + 1)
+
+
+def bench_find_mode(n: int = 10_000_000) -> None:
+    """
+    Times find_mode and top_k on a skewed (Pareto distributed) input against
+    counting with get and put.
+
+    :param n: Int value representing the number of elements.
+
+    :return: None.
+    """
+    rng = random.Random(0)
+    da = DynamicArray(['v' + str(int(rng.paretovariate(1.2))) for _ in range(n)])
+    print(f"  get + put: {_elapsed(_find_mode_get_put, da):7.3f}s")
+    print(f"  find_mode: {_elapsed(find_mode, da):7.3f}s")
+    print(f"  top_k(10): {_elapsed(top_k, da, 10):7.3f}s")
+
+
+def bench_chains(n: int = 200_000, lookups: int = 1_000_000) -> None:
+    """
+    Compares bytes per entry, put throughput and get throughput of each
+    separate chaining bucket type. Lookups are Pareto distributed, so a few
+    hot keys take most of them.
+
+    :param n: Int value representing the number of keys.
+    :param lookups: Int value representing the number of get calls.
+
+    :return: None.
+    """
+    keys = ['str' + str(i) for i in range(n)]
+    rng = random.Random(0)
+    hot = [keys[min(n, int(rng.paretovariate(1.2))) - 1] for _ in range(lookups)]
+    pairs = [(key, value) for value, key in enumerate(keys)]
+    for chains in (LINKED_CHAINS, ARRAY_CHAINS, MOVE_TO_FRONT_CHAINS):
+        def build(pairs=pairs, chains=chains):
+            m = SCHashMap(11, polynomial_hash, chains=chains)
+            _put_loop(m, pairs)
+            return m
+        tracemalloc.start()
+        m = build()
+        per_entry = tracemalloc.get_traced_memory()[0] / n
+        tracemalloc.stop()
+        del m
+        put = _elapsed(build)
+        m = build()
+        get = _elapsed(_lookups, m, hot)
+        print(f"{chains:>14}: {per_entry:8.1f} bytes/entry {n / put:12,.0f} puts/s "
+              f"{lookups / get:12,.0f} gets/s")
+
+
+def _mixed_load(m, keys: list) -> None:
+    """
+    Puts every key in the list, then gets each of them twice.
+    """
+    for value, key in enumerate(keys):
+        m.put(key, value)
+    for key in keys + keys:
+        m.get(key)
+
+
+def bench_sharded(n: int = 400_000, threads: int = 8) -> None:
+    """
+    Runs a put/get load from a thread pool against ShardedHashMap with a
+    growing number of shards. One shard is the same as one global lock.
+
+    :param n: Int value representing the number of keys.
+    :param threads: Int value representing the number of worker threads.
+
+    :return: None.
+    """
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f"{threads} threads, GIL {'enabled' if gil else 'disabled'}")
+    keys = ['str' + str(i) for i in range(n)]
+    slices = [keys[start::threads] for start in range(threads)]
+    for shards in (1, 2, 4, 8, 16, 32):
+        m = ShardedHashMap(11, polynomial_hash, shards)
+        with ThreadPoolExecutor(threads) as pool:
+            start = time.perf_counter()
+            list(pool.map(_mixed_load, [m] * threads, slices))
+            seconds = time.perf_counter() - start
+        print(f"{shards:3} shards: {n * 3 / seconds:12,.0f} ops/s")
+
+
+def bench_parallel_build(n: int = 1_000_000) -> None:
+    """
+    Compares building a map with put_many in one process against
+    parallel_build with a growing number of worker processes.
+
+    :param n: Int value representing the number of keys.
+
+    :return: None.
+    """
+    pairs = [('str' + str(i), i) for i in range(n)]
+    print(f"{os.cpu_count()} cores")
+    for map_class in (OAHashMap, SCHashMap):
+        single = _elapsed(map_class(11, polynomial_hash).put_many, pairs)
+        print(f"{map_class.__module__:>14} put_many: {single:7.3f}s")
+        for workers in (2, 4, 8):
+            seconds = _elapsed(parallel_build, pairs, map_class, polynomial_hash, workers)
+            print(f"{map_class.__module__:>14} {workers} workers: {seconds:7.3f}s")
+
+
+def bench_mmap(n: int = 1_000_000) -> None:
+    """
+    Times building and opening a hash map file, and compares its lookups
+    against an in-memory open addressing map.
+
+    :param n: Int value representing the number of keys.
+
+    :return: None.
+    """
+    keys = ['str' + str(i) for i in range(n)]
+    path = os.path.join(tempfile.mkdtemp(), 'bench.a6hm')
+    build = _elapsed(MmapHashMap.build, path, ((key, key) for key in keys))
+    start = time.perf_counter()
+    m = MmapHashMap(path)
+    opened = time.perf_counter() - start
+    print(f"build {build:7.3f}s open {opened * 1e3:7.3f}ms "
+          f"{os.path.getsize(path) / n:6.1f} file bytes/entry")
+
+    sample = random.Random(0).sample(keys, min(n, 200_000))
+    mapped = _elapsed(_lookups, m, sample)
+    memory = _elapsed(_lookups, _build(OAHashMap, keys), sample)
+    print(f"  MmapHashMap: {len(sample) / mapped:12,.0f} lookups/s")
+    print(f"    OAHashMap: {len(sample) / memory:12,.0f} lookups/s")
+    m.close()
+    os.remove(path)
+
+
+def bench_snapshot(n: int = 1_000_000) -> None:
+    """
+    Compares loading a saved snapshot against rebuilding the map with put.
+
+    :param n: Int value representing the number of keys.
+
+    :return: None.
+    """
+    keys = ['str' + str(i) for i in range(n)]
+    path = os.path.join(tempfile.mkdtemp(), 'bench.snapshot')
+    for map_class in (OAHashMap, SCHashMap):
+        m = _build(map_class, keys)
+        save = _elapsed(m.save, path)
+        load = _elapsed(map_class.load, path)
+        rebuild = _elapsed(_build, map_class, keys)
+        print(f"{map_class.__module__:>14}: save {save:7.3f}s load {load:7.3f}s "
+              f"rebuild with put {rebuild:7.3f}s {os.path.getsize(path) / n:6.1f} bytes/entry")
+    os.remove(path)
+
+
+def _export(view, m, keys: list, every: int) -> int:
+    """
+    Reads every item of a snapshot while updating one random key of the map
+    after every every items, the way a live map keeps changing under an export.
+
+    :return: An int value representing the number of items read.
+    """
+    rng = random.Random(0)
+    count = 0
+    for count, pair in enumerate(view.items(), 1):
+        if count % every == 0:
+            m.put(keys[rng.randrange(len(keys))], count)
+    return count
+
+
+def bench_cow_snapshot(n: int = 300_000, rates: tuple = (.001, .01)) -> None:
+    """
+    Compares exporting a live map with get_keys_and_values, which copies
+    every entry, against reading a copy-on-write snapshot while the map is
+    updated at the given rates of writes per item read. The snapshot itself
+    takes constant time, and its memory is the pages the writes copied.
+    Every time includes the overhead of tracemalloc, for both approaches.
+
+    :param n: Int value representing the number of keys.
+    :param rates: Tuple of writes per exported item.
+
+    :return: None.
+    """
+    keys = ['str' + str(i) for i in range(n)]
+    for map_class in (SCHashMap, OAHashMap):
+        m = _build(map_class, keys)
+        tracemalloc.start()
+        seconds = _elapsed(m.get_keys_and_values)
+        copied = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{map_class.__module__:>12} copy: {seconds:6.3f}s, {copied / 2 ** 20:6.1f}MiB")
+
+        for rate in rates:
+            tracemalloc.start()
+            gc.disable()            # Keeps a collection of the whole map out of the time taken by snapshot
+            start = time.perf_counter()
+            view = m.snapshot()
+            taken = time.perf_counter() - start
+            gc.enable()
+            count = _export(view, m, keys, int(1 / rate))
+            seconds = time.perf_counter() - start
+            pages = view.get_copied_pages()
+            copied = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            view.close()
+            del view                # Otherwise freeing it and its map is timed by the next snapshot
+            total = -(-m.get_capacity() // PAGE_SIZE)
+            print(f"{map_class.__module__:>12} snapshot, {rate:5.1%} writes: taken in {taken * 1e6:5.1f}us, "
+                  f"{count} items in {seconds:6.3f}s, {copied / 2 ** 20:6.1f}MiB, "
+                  f"{pages}/{total} pages copied")
+
+
+def bench_stats(n: int = 200_000) -> None:
+    """
+    Compares put and get throughput with stats disabled and enabled.
+
+    :param n: Int value representing the number of keys.
+
+    :return: None.
+    """
+    keys = ['str' + str(i) for i in range(n)]
+    pairs = [(key, value) for value, key in enumerate(keys)]
+    for map_class in (OAHashMap, SCHashMap):
+        for stats in (False, True):
+            m = map_class(11, polynomial_hash, stats=stats)
+            put = _elapsed(_put_loop, m, pairs)
+            get = _elapsed(_lookups, m, keys)
+            print(f"{map_class.__module__:>14} stats={stats!s:<5}: {n / put:12,.0f} puts/s "
+                  f"{n / get:12,.0f} gets/s")
+
+
+def bench_hash_functions(n: int = 1_000_000, map_keys: int = 5_000) -> None:
+    """
+    Compares the throughput of each hash function on batches of short and
+    long keys, and the probe lengths and chain collisions they give in both maps. The map
+    stats use fewer keys, since hash_function_1 sends most of them to the
+    same few buckets.
+
+    :param n: Int value representing the number of keys hashed.
+    :param map_keys: Int value representing the number of keys put in each map.
+
+    :return: None.
+    """
+    keys = ['str' + str(i) for i in range(n)]
+    long_keys = ['/users/' + str(i) + '/sessions/' + str(i * 7919) for i in range(n)]
+    pairs = [(key, value) for value, key in enumerate(keys[:map_keys])]
+    for function in (hash_function_1, hash_function_2, polynomial_hash) + HASH_FUNCTIONS:
+        seconds = _elapsed(hash_many, keys, function)
+        long_seconds = _elapsed(hash_many, long_keys, function)
+        oa = OAHashMap(11, function)
+        oa.put_many(pairs)
+        probes = oa.probe_stats()
+        sc = SCHashMap(11, function, stats=True)
+        sc.put_many(pairs)
+        print(f"{function.__name__:>15}: {n / seconds:11,.0f} short keys/s {n / long_seconds:11,.0f} long keys/s "
+              f"OA average probe {probes['average']:8.2f} max {probes['max']:5} "
+              f"SC collision rate {sc.get_stats()['collision_rate']:5.2f}")
+
+
+def bench_hash_flooding(sizes: tuple = (500, 1000, 2000, 4000)) -> None:
+    """
+    Puts adversarial keys, permutations of the same letters that all share
+    one hash_function_1 value, into both maps and times lookups. With
+    hash_function_1 every lookup scans the whole chain or probe run, and
+    with a SeededHash the time per lookup stays flat as the key count grows.
+
+    :param sizes: Tuple of key counts.
+
+    :return: None.
+    """
+    for n in sizes:
+        keys = [''.join(letters) for letters in islice(permutations('abcdefgh'), n)]
+        for map_class in (OAHashMap, SCHashMap):
+            for function in (hash_function_1, SeededHash()):
+                m = map_class(11, function)
+                for key in keys:
+                    m.put(key, key)
+                seconds = _elapsed(_lookups, m, keys)
+                name = type(function).__name__ if isinstance(function, SeededHash) else function.__name__
+                print(f"{n:5} keys {map_class.__module__:>12} {name:>15}: {seconds / n * 1e6:9.2f}us per get")
+
+
+def bench_treeify(sizes: tuple = (500, 1000, 2000, 4000)) -> None:
+    """
+    Puts colliding keys, permutations of the same letters that all share one
+    hash_function_1 value, into one chain of a separate chaining map and
+    times lookups with and without treeified buckets. Plain chains are
+    scanned end to end, and tree buckets are binary searched.
+
+    :param sizes: Tuple of key counts.
+
+    :return: None.
+    """
+    for n in sizes:
+        keys = [''.join(letters) for letters in islice(permutations('abcdefgh'), n)]
+        for treeify in (None, TREEIFY_THRESHOLD):
+            m = SCHashMap(11, hash_function_1, treeify=treeify)
+            for key in keys:
+                m.put(key, key)
+            seconds = _elapsed(_lookups, m, keys)
+            print(f"{n:5} keys treeify={str(treeify):>4}: {seconds / n * 1e6:9.2f}us per get")
+
+
+def _fill(m, keys: list) -> None:
+    """
+    Puts every key in the list, with its index as value.
+    """
+    for value, key in enumerate(keys):
+        m.put(key, value)
+
+
+def bench_capacity(n: int = 100_000) -> None:
+    """
+    Times building each map with and without reserve, then removes all but
+    1% of the keys and compares the capacity and clear time of a map that
+    keeps its peak capacity against one built with shrink=True.
+
+    :param n: Int value representing the number of keys.
+
+    :return: None.
+    """
+    keys = ['str' + str(i) for i in range(n)]
+    for map_class in (OAHashMap, SCHashMap):
+        m = map_class(11, polynomial_hash)
+        grown = _elapsed(_fill, m, keys)
+        m = map_class(11, polynomial_hash)
+        m.reserve(n)
+        reserved = _elapsed(_fill, m, keys)
+        print(f"{map_class.__module__:>12}: put {grown:6.2f}s, after reserve {reserved:6.2f}s")
+
+        for shrink in (False, True):
+            m = map_class(11, polynomial_hash, shrink=shrink)
+            m.put_many((key, 0) for key in keys)
+            m.remove_many(keys[n // 100:])
+            capacity = m.get_capacity()
+            seconds = _elapsed(m.clear)
+            print(f"{map_class.__module__:>12} shrink={str(shrink):>5}: capacity {capacity:8} "
+                  f"after removes, clear {seconds * 1e3:7.2f}ms")
+
+
+def bench_swiss(n: int = 200_000) -> None:
+    """
+    Compares hit and miss lookup latency of the quadratic prober, its
+    array-backed engine and SwissHashMap, which filters slots by control
+    bytes before comparing keys. Keys are hashed with builtin_hash so the
+    probes dominate. SwissHashMap runs at loads up to 7/8, the other two under .5.
+
+    :param n: Int value representing the number of keys.
+
+    :return: None.
+    """
+    keys = ['str' + str(i) for i in range(n)]
+    misses = ['miss' + str(i) for i in range(n)]
+    for map_class in (OAHashMap, ArrayHashMap, SwissHashMap):
+        m = _build(map_class, keys, builtin_hash)
+        hits = _elapsed(_lookups, m, keys)
+        missed = _elapsed(_lookups, m, misses)
+        print(f"{map_class.__name__:>14}: load {m.table_load():4.2f}, hit {hits / n * 1e9:6.0f}ns, "
+              f"miss {missed / n * 1e9:6.0f}ns")
+
+
+def _latencies(m, keys: list) -> list:
+    """
+    Times every get separately, with the garbage collector paused so its
+    pauses are not counted against the map.
+
+    :return: Sorted list of nanoseconds per get.
+    """
+    clock = time.perf_counter_ns
+    latencies = []
+    gc.disable()
+    for key in keys:
+        start = clock()
+        m.get(key)
+        latencies.append(clock() - start)
+    gc.enable()
+    latencies.sort()
+    return latencies
+
+
+def bench_cuckoo(n: int = 100_000) -> None:
+    """
+    Compares the lookup latency percentiles of cuckoo hashing, whose get
+    checks two buckets and the stash, against the open addressing and
+    chaining maps. Every map hashes with fnv1a_64, and cuckoo hashing also
+    with word_hash, which it would switch to anyway since hash_function_1 and
+    hash_function_2 give too many of the keys the same pair of values. On a
+    busy machine the highest percentiles also include time the process was
+    not scheduled.
+
+    :param n: Int value representing the number of keys.
+
+    :return: None.
+    """
+    keys = ['str' + str(i) for i in range(n)]
+    lookups = keys + ['miss' + str(i) for i in range(n)]
+    random.Random(0).shuffle(lookups)
+    maps = (('open addressing', OAHashMap(11, fnv1a_64)),
+            ('chaining', SCHashMap(11, fnv1a_64)),
+            ('cuckoo', CuckooHashMap(11, fnv1a_64, word_hash)),
+            ('cuckoo, 4 slots', CuckooHashMap(11, fnv1a_64, word_hash, bucket_size=BUCKET_SLOTS)))
+
+    for name, m in maps:
+        for value, key in enumerate(keys):
+            m.put(key, value)
+        latencies = _latencies(m, lookups)
+        p50, p99, p999 = (latencies[int(len(latencies) * q)] for q in (.5, .99, .999))
+        print(f"{name:>16}: load {m.table_load():4.2f}, p50 {p50:6}ns, p99 {p99:6}ns, "
+              f"p99.9 {p999:6}ns, max {latencies[-1]:8}ns")
+
+
+async def _fill_async(m, keys: list) -> float:
+    """
+    Puts every key into a map, awaiting the put of an AsyncHashMap and
+    yielding to the event loop every 100 puts, while event_loop_lag runs.
+
+    :return: A float value representing the largest event loop lag in seconds.
+    """
+    stop = asyncio.Event()
+    monitor = asyncio.get_running_loop().create_task(event_loop_lag(stop))
+    await asyncio.sleep(0)
+    for value, key in enumerate(keys):
+        if isinstance(m, AsyncHashMap):
+            await m.put(key, value)
+        else:
+            m.put(key, value)
+        if value % 100 == 99:
+            await asyncio.sleep(0)
+    stop.set()
+    return await monitor
+
+
+def bench_async_lag(n: int = 200_000) -> None:
+    """
+    Measures the worst event loop lag while a coroutine grows a map from
+    empty, for each map used directly, where put runs whole resizes, and
+    behind AsyncHashMap, which builds and moves the table in chunks. What
+    lag remains behind AsyncHashMap is mostly full garbage collections,
+    which scan every entry of the map.
+
+    :param n: Int value representing the number of keys.
+
+    :return: None.
+    """
+    keys = ['str' + str(i) for i in range(n)]
+    for map_class in (OAHashMap, SCHashMap):
+        for facade in (False, True):
+            m = AsyncHashMap(11, fnv1a_64, map_class) if facade else map_class(11, fnv1a_64)
+            start = time.perf_counter()
+            lag = asyncio.run(_fill_async(m, keys))
+            print(f"{map_class.__module__:>12} {type(m).__name__:>12}: worst lag {lag * 1e3:8.1f}ms, "
+                  f"{time.perf_counter() - start:6.2f}s")
+
+
+def _zipf_trace(keys: int, length: int, skew: float, seed: int = 0) -> list:
+    """
+    Returns a trace of key names where the key of rank r is requested with
+    probability proportional to 1 / r ** skew.
+
+    :param keys: Int value representing the number of distinct keys.
+    :param length: Int value representing the number of requests.
+    :param skew: Float value representing the Zipf exponent.
+    :param seed: Int value seeding the trace.
+
+    :return: List of keys.
+    """
+    rng = random.Random(seed)
+    names = ['key' + str(i) for i in range(keys)]
+    rng.shuffle(names)
+    return rng.choices(names, cum_weights=list(_cumulative(1 / (r ** skew) for r in range(1, keys + 1))), k=length)
+
+
+def _cumulative(weights):
+    """
+    Generates the running totals of weights.
+    """
+    total = 0.0
+    for weight in weights:
+        total += weight
+        yield total
+
+
+def _scan_trace(trace: list, every: int, scan: int) -> list:
+    """
+    Returns a trace with a run of scan keys that are never requested again
+    inserted after every every requests, like a batch job reading cold data.
+    """
+    mixed = []
+    for start in range(0, len(trace), every):
+        mixed.extend(trace[start:start + every])
+        mixed.extend('scan' + str(start) + '_' + str(i) for i in range(scan))
+    return mixed
+
+
+def _replay(cache, trace: list) -> None:
+    """
+    Requests every key of a trace from a cache, putting it after a miss.
+    """
+    for key in trace:
+        if cache.get(key) is None:
+            cache.put(key, key)
+
+
+class _ScanEvictCache:
+    """
+    Cache that bounds a chaining map the way callers did before BoundedCache,
+    evicting the first key of get_keys_and_values, an O(n) scan per eviction.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self._map = SCHashMap(max_entries, builtin_hash)
+        self._max_entries = max_entries
+
+    def get(self, key: str):
+        return self._map.get(key)
+
+    def put(self, key: str, value: object) -> None:
+        if self._map.get_size() >= self._max_entries:
+            self._map.remove(self._map.get_keys_and_values()[0][0])
+        self._map.put(key, value)
+
+
+def bench_cache(n: int = 400_000, keys: int = 100_000, size: int = 2_000) -> None:
+    """
+    Replays request traces through a BoundedCache of each policy and reports
+    hit rates and requests per second: a Zipf trace, the same trace with
+    runs of keys seen once, and a flatter Zipf trace. The scan-evicting
+    cache callers used before runs a shorter trace, since every eviction
+    walks its whole table. Keys are hashed with builtin_hash so the cache
+    itself dominates the throughput.
+
+    :param n: Int value representing the requests per trace.
+    :param keys: Int value representing the distinct keys of the Zipf traces.
+    :param size: Int value representing the entries each cache keeps.
+
+    :return: None.
+    """
+    zipf = _zipf_trace(keys, n, .99)
+    traces = (('zipf .99', zipf),
+              ('zipf .99 + scans', _scan_trace(zipf, 1000, 500)),
+              ('zipf .7', _zipf_trace(keys, n, .7, 1)))
+    for name, trace in traces:
+        for policy in CACHE_POLICIES:
+            cache = BoundedCache(size, policy=policy, function=builtin_hash)
+            seconds = _elapsed(_replay, cache, trace)
+            stats = cache.get_stats()
+            print(f"{name:>16} {policy:>8}: hit rate {stats['hit_rate']:6.2%}, "
+                  f"{len(trace) / seconds / 1e3:6.0f}k requests/s, {stats['evictions']:7} evictions")
+
+    trace = zipf[:n // 40]
+    seconds = _elapsed(_replay, _ScanEvictCache(size), trace)
+    print(f"{'zipf .99':>16} {'scan':>8}: {len(trace) / seconds / 1e3:21.1f}k requests/s")
+
+
+# ------------------- BENCHMARKS ------------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nBENCH - array engine memory and lookups")
+    print("---------------------------------------")
+    bench_array_engine()
+
+    print("\nBENCH - resize with cached hashes")
+    print("---------------------------------")
+    bench_resize()
+
+    print("\nBENCH - insert latency with incremental resize")
+    print("----------------------------------------------")
+    bench_incremental_resize()
+
+    print("\nBENCH - tombstone churn")
+    print("-----------------------")
+    bench_tombstone_churn()
+
+    print("\nBENCH - bulk load")
+    print("-----------------")
+    bench_bulk_load()
+
+    print("\nBENCH - probing strategies")
+    print("--------------------------")
+    bench_probing()
+
+    print("\nBENCH - vectorized integer lookups")
+    print("----------------------------------")
+    bench_numpy_lookups()
+
+    print("\nBENCH - prime capacity startup")
+    print("------------------------------")
+    bench_prime_startup()
+
+    print("\nBENCH - find_mode and top_k on skewed input")
+    print("-------------------------------------------")
+    bench_find_mode()
+
+    print("\nBENCH - separate chaining bucket types")
+    print("--------------------------------------")
+    bench_chains()
+
+    print("\nBENCH - sharded map thread scaling")
+    print("----------------------------------")
+    bench_sharded()
+
+    print("\nBENCH - process-parallel build")
+    print("------------------------------")
+    bench_parallel_build()
+
+    print("\nBENCH - memory-mapped hash map file")
+    print("-----------------------------------")
+    bench_mmap()
+
+    print("\nBENCH - snapshot load against rebuilding")
+    print("----------------------------------------")
+    bench_snapshot()
+
+    print("\nBENCH - copy-on-write snapshot export")
+    print("-------------------------------------")
+    bench_cow_snapshot()
+
+    print("\nBENCH - stats overhead")
+    print("----------------------")
+    bench_stats()
+
+    print("\nBENCH - hash functions")
+    print("----------------------")
+    bench_hash_functions()
+
+    print("\nBENCH - hash flooding")
+    print("---------------------")
+    bench_hash_flooding()
+
+    print("\nBENCH - treeified chains")
+    print("------------------------")
+    bench_treeify()
+
+    print("\nBENCH - reserve and shrinking")
+    print("-----------------------------")
+    bench_capacity()
+
+    print("\nBENCH - Swiss table lookups")
+    print("---------------------------")
+    bench_swiss()
+
+    print("\nBENCH - cuckoo lookup latency")
+    print("-----------------------------")
+    bench_cuckoo()
+
+    print("\nBENCH - asyncio event loop lag")
+    print("------------------------------")
+    bench_async_lag()
+
+    print("\nBENCH - bounded cache policies")
+    print("------------------------------")
+    bench_cache()
@@ -0,0 +1,327 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Copy-on-write snapshot views shared by the chaining and open
+#              addressing hash maps.
+
+import copy
+import weakref
+
+from a6_include import DynamicArray
+from hash_functions import SeededHash
+
+PAGE_SHIFT = 6
+PAGE_SIZE = 1 << PAGE_SHIFT     # Buckets copied together the first time a snapshot's map writes to one of them
+
+MISSING = object()      # Returned by MapSnapshot._find when the key is not found, since None is a valid value
+
+
+class BucketView:
+    """
+    A bucket array as it was when a snapshot was taken. The array itself is
+    shared with the map, and the map hands over a copy of each page right
+    before its first write to it, so reading the view never sees a write
+    made after the snapshot.
+    """
+
+    __slots__ = ('buckets', 'capacity', 'pages', 'saves', '__weakref__')
+
+    def __init__(self, buckets: DynamicArray, capacity: int) -> None:
+        self.buckets = buckets
+        self.capacity = capacity
+        self.pages = {}     # Page number to the list of its buckets as they were
+        self.saves = 0      # Pages handed over so far, so a read can tell whether one arrived during it
+
+    def __getitem__(self, index: int):
+        page = self.pages.get(index >> PAGE_SHIFT)
+        if page is None:
+            return self.buckets[index]
+        return page[index & (PAGE_SIZE - 1)]
+
+    def page(self, number: int) -> list:
+        """
+        Returns the buckets of a page, the saved copy if there is one and the
+        shared buckets otherwise.
+
+        :param number: Int value representing the page number.
+
+        :return: List of buckets.
+        """
+        saved = self.pages.get(number)
+        if saved is not None:
+            return saved
+        start = number << PAGE_SHIFT
+        return [self.buckets[index] for index in range(start, min(start + PAGE_SIZE, self.capacity))]
+
+
+class SnapshotRegistry:
+    """
+    The open BucketViews of one map. The map calls preserve before every
+    write to a bucket, and views sharing the bucket's array receive a copy
+    of its page if they do not have one yet.
+    """
+
+    __slots__ = ('_views', '_copy_bucket')
+
+    def __init__(self, copy_bucket: callable) -> None:
+        """
+        :param copy_bucket: Function returning a copy of a bucket that later writes cannot change.
+        """
+        self._views = []            # Weak references, so a dropped snapshot stops costing copies
+        self._copy_bucket = copy_bucket
+
+    def track(self, view: BucketView) -> None:
+        """
+        Starts handing over pages to a view.
+        """
+        self._views.append(weakref.ref(view))
+
+    def forget(self, view: BucketView) -> None:
+        """
+        Stops handing over pages to a view.
+        """
+        self._views = [ref for ref in self._views if ref() is not None and ref() is not view]
+
+    def is_empty(self) -> bool:
+        """
+        Returns whether no view is tracked any more.
+        """
+        return len(self._views) == 0
+
+    def preserve(self, buckets: DynamicArray, index: int) -> None:
+        """
+        Hands a copy of the page holding a bucket to every view of the bucket
+        array that does not have it yet. The page is copied once however many
+        views need it.
+
+        :param buckets: The bucket array that is about to be written.
+        :param index: Int value representing the bucket that is about to be written.
+
+        :return: None.
+        """
+        number = index >> PAGE_SHIFT
+        saved = None
+        dropped = False
+        for ref in self._views:
+            view = ref()
+            if view is None:
+                dropped = True
+            elif view.buckets is buckets and number not in view.pages:
+                if saved is None:
+                    start = number << PAGE_SHIFT
+                    saved = [self._copy_bucket(buckets[element])
+                             for element in range(start, min(start + PAGE_SIZE, view.capacity))]
+                view.pages[number] = saved
+                view.saves += 1
+        if dropped is True:
+            self._views = [ref for ref in self._views if ref() is not None]
+
+
+class MapSnapshot:
+    """
+    Read-only view of a hash map as it was when its snapshot method was
+    called. Taking one copies nothing: the view shares the map's buckets, and
+    each page of PAGE_SIZE buckets is copied once, the first time the map
+    writes to it, so an export costs memory only for the pages changed while
+    it runs. Resizes and clear give the map new buckets and leave the shared
+    ones to the view.
+
+    One thread may keep writing the map while other threads read its
+    snapshots. A read that overlaps the copy of a page it used is repeated,
+    so every read sees the map as it was. Close a snapshot, or use it in a
+    with statement, once it is no longer needed.
+    """
+
+    def __init__(self, m, buckets: DynamicArray, capacity: int, size: int,
+                 old_buckets: DynamicArray = None, old_capacity: int = 0, rehash_index: int = 0) -> None:
+        """
+        :param m: The map the snapshot is taken of.
+        :param buckets: The map's bucket array.
+        :param capacity: Int value representing the map's capacity.
+        :param size: Int value representing the number of keys in the map.
+        :param old_buckets: The table being drained by an incremental resize, or None.
+        :param old_capacity: Int value representing the capacity of that table.
+        :param rehash_index: Int value representing the first old bucket not moved yet.
+        """
+        self._map = m
+        # A SeededHash is reseeded in place when the map rehashes, so the view keeps the seed it has now
+        function = m._hash_function
+        self._hash_function = copy.copy(function) if isinstance(function, SeededHash) else function
+        self._size = size
+        self._capacity = capacity
+        self._buckets = BucketView(buckets, capacity)
+        self._old_buckets = None if old_buckets is None else BucketView(old_buckets, old_capacity)
+        self._rehash_index = rehash_index
+        self._views = [view for view in (self._buckets, self._old_buckets) if view is not None]
+        for view in self._views:
+            m._snapshots.track(view)
+
+    def __enter__(self) -> 'MapSnapshot':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stops the map copying pages for this snapshot and releases the ones
+        it copied. The snapshot cannot be read afterwards.
+
+        :return: None.
+        """
+        if self._views is None:
+            return
+        registry = self._map._snapshots
+        for view in self._views:
+            view.pages = {}
+            if registry is not None:
+                registry.forget(view)
+        if registry is not None and registry.is_empty() is True:
+            self._map._snapshots = None
+        self._views = None
+
+    def get_size(self) -> int:
+        """
+        Return size of map when the snapshot was taken
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map when the snapshot was taken
+        """
+        return self._capacity
+
+    def table_load(self) -> float:
+        """
+        Returns the load factor of the hash table when the snapshot was taken.
+
+        :return: A float value representing the load factor.
+        """
+        return self._size / self._capacity
+
+    def get_copied_pages(self) -> int:
+        """
+        Returns the number of pages copied for this snapshot so far.
+
+        :return: An int value representing the number of copied pages.
+        """
+        self._check_open()
+        return sum(len(view.pages) for view in self._views)
+
+    # ------------------------------------------------------------------ #
+
+    def get(self, key: str):
+        """
+        Returns the value a key had when the snapshot was taken.
+
+        :param key: Represents the key, the value will be derived from.
+
+        :return: The key's value, or None if it was not in the map.
+        """
+        value = self._read(key, self._hash(key))
+        return None if value is MISSING else value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Searches for a given key in the snapshot.
+
+        :param key: The key that the method will search for.
+
+        :return: A boolean value representing whether or not the key was found.
+        """
+        return self._read(key, self._hash(key)) is not MISSING
+
+    def get_many(self, keys) -> list:
+        """
+        Returns the values of many keys in the snapshot.
+
+        :param keys: Iterable of keys.
+
+        :return: List of values in the same order as the keys, None for missing keys.
+        """
+        return [self.get(key) for key in keys]
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array containing tuples of all key/value pairs in the snapshot.
+
+        :return: Dynamic array with tuple values.
+        """
+        new_array = DynamicArray()
+        for pair in self.items():
+            new_array.append(pair)
+        return new_array
+
+    def keys(self):
+        """
+        Returns a generator over the keys of the snapshot.
+        """
+        return (key for key, value in self.items())
+
+    def values(self):
+        """
+        Returns a generator over the values of the snapshot.
+        """
+        return (value for key, value in self.items())
+
+    def items(self):
+        """
+        Generates the (key, value) tuples of the snapshot one page at a time.
+        The map can be changed while the generator is used, since a page is
+        read whole before any of its entries are yielded.
+
+        :return: Generator of (key, value) tuples.
+        """
+        self._check_open()
+        for view, start in ((self._buckets, 0), (self._old_buckets, self._rehash_index)):
+            if view is None:
+                continue
+            for number in range(start >> PAGE_SHIFT, (view.capacity + PAGE_SIZE - 1) >> PAGE_SHIFT):
+                # Buckets of the old table before rehash_index had already been moved
+                skip = max(0, start - (number << PAGE_SHIFT))
+                while True:
+                    saved = number in view.pages
+                    pairs = [pair for bucket in view.page(number)[skip:] for pair in self._bucket_items(bucket)]
+                    # Shared buckets are only written once the page was copied, so the pairs
+                    # are those of the snapshot unless a copy arrived while they were read
+                    if saved is True or number not in view.pages:
+                        break
+                yield from pairs
+
+    def _check_open(self) -> None:
+        """
+        Raises ValueError once the snapshot was closed.
+        """
+        if self._views is None:
+            raise ValueError("Snapshot is closed")
+
+    def _read(self, key: str, hash) -> object:
+        """
+        Finds a key, repeating the search if a page was copied while it ran.
+
+        :return: The key's value, or MISSING if it is not found.
+        """
+        self._check_open()
+        while True:
+            saves = [view.saves for view in self._views]
+            value = self._find(key, hash)
+            if saves == [view.saves for view in self._views]:
+                return value
+
+    def _hash(self, key: str):
+        """
+        Hashes a key the way the map did when the snapshot was taken.
+        """
+        return self._hash_function(key)
+
+    def _find(self, key: str, hash) -> object:
+        """
+        Returns the value of a key in the views, or MISSING. Defined by each map's snapshot class.
+        """
+        raise NotImplementedError
+
+    def _bucket_items(self, bucket) -> list:
+        """
+        Returns the (key, value) tuples of a bucket. Defined by each map's snapshot class.
+        """
+        raise NotImplementedError
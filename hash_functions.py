@@ -0,0 +1,150 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: String hash functions that can be given to the hash maps in
+#              place of hash_function_1/2, and batch hashing for lists of keys.
+
+import os
+from hashlib import blake2b
+
+_MASK_64 = (1 << 64) - 1
+
+_FNV_OFFSET = 0xCBF29CE484222325
+_FNV_PRIME = 0x100000001B3
+
+# Odd 64-bit multipliers taken from xxHash64
+_PRIME_1 = 0x9E3779B185EBCA87
+_PRIME_2 = 0xC2B2AE3D27D4EB4F
+_PRIME_3 = 0x165667B19E3779F9
+
+
+def fnv1a_64(key: str) -> int:
+    """
+    64-bit FNV-1a over the UTF-8 bytes of a key. Every byte changes the whole
+    hash, so keys like 'str1' and 'str10' spread out, unlike the character
+    sums of hash_function_1.
+
+    :param key: The key that will be hashed.
+
+    :return: An unsigned 64-bit hash value.
+    """
+    hash = _FNV_OFFSET
+    for byte in key.encode():
+        hash = ((hash ^ byte) * _FNV_PRIME) & _MASK_64
+    return hash
+
+
+def word_hash(key: str) -> int:
+    """
+    wyhash style hash that reads the UTF-8 bytes of a key eight at a time.
+    Each 64-bit word is folded in with a 64 x 64 to 128-bit multiply whose
+    halves are xored together, so the loop takes one step per word instead
+    of one per character. Words are read little-endian, so the hash is the
+    same on every machine.
+
+    :param key: The key that will be hashed.
+
+    :return: An unsigned 64-bit hash value.
+    """
+    data = key.encode()
+    length = len(data)
+    hash = _PRIME_3 ^ length
+    words = int.from_bytes(data, 'little')     # Every word of the key in one int, lowest word first
+
+    for _ in range(0, length, 8):
+        product = (hash ^ (words & _MASK_64)) * _PRIME_1
+        hash = (product ^ (product >> 64)) & _MASK_64
+        words >>= 64
+
+    product = (hash ^ _PRIME_2) * _PRIME_2
+    return (product ^ (product >> 64)) & _MASK_64
+
+
+def builtin_hash(key: str) -> int:
+    """
+    Python's built-in hash of a key as an unsigned 64-bit value. It is the
+    fastest choice, but str hashes are randomized per process (see
+    PYTHONHASHSEED), so maps saved with snapshot files or merged across
+    processes should use fnv1a_64 or word_hash instead.
+
+    :param key: The key that will be hashed.
+
+    :return: An unsigned 64-bit hash value.
+    """
+    return hash(key) & _MASK_64
+
+
+def hash_many(keys, function: callable) -> list:
+    """
+    Hashes a list of keys at once. builtin_hash runs as a single
+    comprehension without a Python call per key, and any other function is
+    mapped over the keys.
+
+    :param keys: Iterable of keys.
+    :param function: The hash function, such as fnv1a_64, word_hash, builtin_hash or hash_function_1.
+
+    :return: List of hash values in the same order as the keys.
+    """
+    if function is builtin_hash:
+        return [hash(key) & _MASK_64 for key in keys]
+    return list(map(function, keys))
+
+
+HASH_FUNCTIONS = (fnv1a_64, word_hash, builtin_hash)
+
+
+class SeededHash:
+    """
+    Keyed hash function with a random seed of its own. Keys are hashed with
+    blake2b in keyed mode, so without the seed nobody can pick keys that
+    collide. A map given a SeededHash also reseeds it and rehashes its keys
+    if a chain or probe run grows abnormally long, so give every map its own
+    instance.
+    """
+
+    def __init__(self, seed: bytes = None) -> None:
+        """
+        :param seed: Up to 64 bytes of seed, or None for 16 random bytes.
+        """
+        self.seed = None
+        self.reseed(seed)
+
+    def __call__(self, key: str) -> int:
+        return int.from_bytes(blake2b(key.encode(), digest_size=8, key=self.seed).digest(), 'little')
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, SeededHash) and other.seed == self.seed
+
+    def __hash__(self) -> int:
+        return hash(self.seed)
+
+    def reseed(self, seed: bytes = None) -> None:
+        """
+        Replaces the seed, which changes the hash of every key.
+
+        :param seed: Up to 64 bytes of seed, or None for 16 random bytes.
+
+        :return: None.
+        """
+        self.seed = os.urandom(16) if seed is None else seed
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nhash functions example 1")
+    print("------------------------")
+    print(hex(fnv1a_64('')), hex(fnv1a_64('a')), hex(fnv1a_64('foobar')))
+    print(word_hash('str1') != word_hash('str10'), word_hash('') == word_hash(''), word_hash('é') != word_hash('e'))
+    keys = ['str' + str(i) for i in range(10)]
+    for function in HASH_FUNCTIONS:
+        print(function.__name__, hash_many(keys, function) == [function(key) for key in keys],
+              len(set(hash_many(keys, function))))
+
+    print("\nSeededHash example 1")
+    print("--------------------")
+    first = SeededHash(b'seed')
+    second = SeededHash(b'seed')
+    print(first('key') == second('key'), first == second, SeededHash()('key') != SeededHash()('key'))
+    second.reseed()
+    print(first('key') == second('key'), first == second)
@@ -0,0 +1,302 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Implements an asyncio facade over the incremental hash maps
+#              that resizes in bounded chunks, yielding to the event loop between them.
+
+import asyncio
+
+from a6_include import DynamicArray, hash_function_1
+from hash_map_sc import HashMap as SCHashMap
+
+RESIZE_CHUNK = 1024     # Buckets built or moved by a resize between two yields to the event loop
+BATCH_SIZE = 1024       # Keys handled by put_many/get_many between two yields to the event loop
+
+
+class AsyncHashMap:
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 map_class: type = SCHashMap,
+                 chunk: int = RESIZE_CHUNK,
+                 **options) -> None:
+        """
+        Initialize new AsyncHashMap around an incremental map_class instance.
+        When a put would grow the table, the new buckets are built chunk
+        buckets at a time with an await between chunks, and a task then moves
+        the old table over chunk buckets at a time. Reads in the meantime are
+        served from both tables, so no single await blocks the event loop for
+        longer than one chunk, however large the table is.
+
+        Every method must be called from the same event loop, and the map
+        must only be changed through this facade.
+
+        :param capacity: Int value representing the starting capacity.
+        :param function: The hash function given to the map.
+        :param map_class: hash_map_sc.HashMap or hash_map_oa.HashMap.
+        :param chunk: Int value representing the buckets handled between two yields.
+        :param options: Extra keyword arguments given to the map, such as chains.
+        """
+        self._map = map_class(capacity, function, incremental=True, **options)
+        self._chunk = chunk
+        self._resizing = asyncio.Lock()     # Held while the buckets of a resize are built
+        self._migration = None              # Task moving the old table into the new one
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        return str(self._map)
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._map.get_size()
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._map.get_capacity()
+
+    def table_load(self) -> float:
+        """
+        Returns the current load factor of the hash table.
+
+        :return: A float value representing the load factor.
+        """
+        return self._map.table_load()
+
+    def is_resizing(self) -> bool:
+        """
+        Returns whether buckets of the old table are still being moved.
+
+        :return: A boolean value representing whether a resize is in progress.
+        """
+        return self._map._old_buckets is not None
+
+    async def put(self, key: str, value: object) -> None:
+        """
+        Updates the key and value pair of a hash map, first growing the table
+        cooperatively if the key would not fit.
+
+        :param key: The key that will be added to the hash map.
+        :param value: The value that will be added to the hash map.
+
+        :return: None.
+        """
+        await self._make_room()
+        self._map.put(key, value)
+
+    async def get(self, key: str) -> object:
+        """
+        Returns the value of a key, or None if it is not in the hash map.
+
+        :param key: Represents the key, the value will be derived from.
+
+        :return: The key's value.
+        """
+        return self._map.get(key)
+
+    async def contains_key(self, key: str) -> bool:
+        """
+        Searches for a given key in the hash map.
+
+        :param key: The key that the method will search for.
+
+        :return: A boolean value representing whether or not the key was found.
+        """
+        return self._map.contains_key(key)
+
+    async def remove(self, key: str) -> None:
+        """
+        Removes a key from the hash map.
+
+        :param key: The key that will be removed.
+
+        :return: None.
+        """
+        self._map.remove(key)
+
+    async def put_many(self, pairs) -> None:
+        """
+        Adds or updates many key/value pairs, yielding to the event loop
+        after every BATCH_SIZE of them.
+
+        :param pairs: Iterable of (key, value) tuples.
+
+        :return: None.
+        """
+        pairs = list(pairs)
+        for start in range(0, len(pairs), BATCH_SIZE):
+            for key, value in pairs[start:start + BATCH_SIZE]:
+                await self._make_room()
+                self._map.put(key, value)
+            await asyncio.sleep(0)
+
+    async def get_many(self, keys) -> list:
+        """
+        Returns the values of many keys, yielding to the event loop after
+        every BATCH_SIZE of them.
+
+        :param keys: Iterable of keys.
+
+        :return: List of values in the same order as the keys, None for missing keys.
+        """
+        keys = list(keys)
+        values = []
+        for start in range(0, len(keys), BATCH_SIZE):
+            values.extend(self._map.get_many(keys[start:start + BATCH_SIZE]))
+            await asyncio.sleep(0)
+        return values
+
+    async def finish_resize(self) -> None:
+        """
+        Waits until a resize in progress has moved every bucket of the old table.
+
+        :return: None.
+        """
+        while self._migration is not None and not self._migration.done():
+            await self._migration
+        # Resizes started by the map itself, such as a rebuild on remove, are moved here
+        while self._map._old_buckets is not None:
+            self._map._rehash_step(self._chunk)
+            await asyncio.sleep(0)
+
+    async def _make_room(self) -> None:
+        """
+        Starts the resize the next put would otherwise do at once. The new
+        buckets are built chunk buckets at a time, and the old table is moved
+        by the _migrate task. Buckets built while a remove started a resize
+        of its own are dropped and the check starts over.
+
+        :return: None.
+        """
+        m = self._map
+        if m._grow_capacity() is None:
+            return
+
+        async with self._resizing:
+            while True:
+                await self.finish_resize()
+                grow = m._grow_capacity()     # Another put may have resized while this one waited
+                if grow is None:
+                    return
+                new_capacity = grow if m._is_prime(grow) is True else m._next_prime(grow)
+
+                buckets = DynamicArray()
+                for start in range(0, new_capacity, self._chunk):
+                    for _ in range(start, min(start + self._chunk, new_capacity)):
+                        buckets.append(m._empty_bucket())
+                    await asyncio.sleep(0)
+
+                # A remove during the awaits may have started a shrink or changed what the put needs,
+                # and starting this resize over it would drop the buckets the shrink has not moved
+                if m._old_buckets is None and m._grow_capacity() == grow:
+                    break
+
+            m._start_rehash(new_capacity, buckets)
+            self._migration = asyncio.get_running_loop().create_task(self._migrate())
+
+    async def _migrate(self) -> None:
+        """
+        Moves the old table into the new one chunk buckets at a time,
+        yielding to the event loop after each chunk.
+
+        :return: None.
+        """
+        while self._map._old_buckets is not None:
+            self._map._rehash_step(self._chunk)
+            await asyncio.sleep(0)
+
+
+async def event_loop_lag(stop: asyncio.Event, interval: float = .001) -> float:
+    """
+    Measures how late the event loop wakes a task that sleeps for an interval
+    over and over, until stop is set.
+
+    :param stop: Event that ends the measurement.
+    :param interval: Float value representing the seconds slept each time.
+
+    :return: A float value representing the largest delay in seconds.
+    """
+    loop = asyncio.get_running_loop()
+    worst = 0.0
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        worst = max(worst, loop.time() - start - interval)
+    return worst
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    from hash_functions import fnv1a_64
+    from hash_map_oa import HashMap as OAHashMap
+
+    async def fill(m, count: int) -> float:
+        """
+        Puts count keys into a map, yielding every 100 puts like a well
+        behaved request handler, and returns the worst event loop lag.
+        """
+        stop = asyncio.Event()
+        monitor = asyncio.get_running_loop().create_task(event_loop_lag(stop))
+        await asyncio.sleep(0)
+        for i in range(count):
+            if isinstance(m, AsyncHashMap):
+                await m.put('str' + str(i), i)
+            else:
+                m.put('str' + str(i), i)
+            if i % 100 == 99:
+                await asyncio.sleep(0)
+        stop.set()
+        return await monitor
+
+    async def main() -> None:
+        print("\nAsyncHashMap example 1")
+        print("----------------------")
+        m = AsyncHashMap(11, hash_function_1)
+        await m.put_many(('str' + str(i), i * 10) for i in range(3000))
+        print(m.get_size(), await m.get('str42'), await m.contains_key('missing'), m.is_resizing())
+        await m.finish_resize()
+        print(m.is_resizing(), await m.get_many(['str0', 'str2999', 'missing']))
+
+        print("\nAsyncHashMap example 2")
+        print("----------------------")
+        m = AsyncHashMap(11, hash_function_1, map_class=OAHashMap)
+        for i in range(1000):
+            await m.put('str' + str(i), i)
+        await m.remove('str0')
+        print(m.get_size(), await m.get('str999'), await m.get('str0'))
+
+        print("\nAsyncHashMap example 3")
+        print("----------------------")
+        for map_class in (SCHashMap, OAHashMap):
+            m = AsyncHashMap(11, fnv1a_64, map_class, chunk=1, shrink=True)
+            count = 0
+            while count < 500 or m._map._grow_capacity() is None:
+                await m.put('str' + str(count), count)
+                count += 1
+            await m.finish_resize()
+
+            async def remove_most() -> None:
+                for i in range(count):
+                    if i % 8 != 0:
+                        await m.remove('str' + str(i))
+                        await asyncio.sleep(0)
+
+            # The growing put builds its buckets while the removes start a shrink
+            await asyncio.gather(m.put('new', 0), remove_most())
+            await m.finish_resize()
+            kept = ['str' + str(i) for i in range(0, count, 8)] + ['new']
+            print(m.get_size() == len(kept), [await m.get(key) for key in kept] == list(range(0, count, 8)) + [0])
+
+        print("\nAsyncHashMap example 4")
+        print("----------------------")
+        blocking = await fill(SCHashMap(11, fnv1a_64), 100000)
+        cooperative = await fill(AsyncHashMap(11, fnv1a_64, chunk=256), 100000)
+        print(cooperative < blocking, round(blocking * 1000), round(cooperative * 1000))
+
+    asyncio.run(main())
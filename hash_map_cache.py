@@ -0,0 +1,543 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Implements a size-bounded cache on the chaining hash map, whose
+#              LRU, LFU and TinyLFU policies evict in O(1).
+
+import sys
+
+from a6_include import hash_function_1
+from hash_functions import builtin_hash
+from hash_map_sc import HashMap as SCHashMap
+
+LRU = 'lru'             # Evicts the least recently used entry
+LFU = 'lfu'             # Evicts the least frequently used entry, the least recently used of those first
+TINY_LFU = 'tinylfu'    # LRU eviction, but a new key only replaces the victim if it is used more often
+CACHE_POLICIES = (LRU, LFU, TINY_LFU)
+
+SKETCH_DEPTH = 4        # Counter rows of a FrequencySketch, each indexed by a different hash (unrolled in _indexes)
+SKETCH_MAX_COUNT = 15   # Counters saturate at 4 bits, as in the TinyLFU paper
+SKETCH_WIDTH = 4        # Counters per row for each entry the cache holds
+SKETCH_SAMPLE = 10      # Additions per entry the cache holds after which every counter is halved
+
+_HALVE = bytes(count >> 1 for count in range(256))      # bytes.translate table that halves each counter
+
+
+def _entry_size(key: str, value: object) -> int:
+    """
+    Default sizeof of a BoundedCache, the shallow size of a key and its value.
+    """
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+
+class CacheEntry:
+    """
+    Value stored in the hash map of a BoundedCache. Every entry is also a
+    node of the cache's eviction lists, so moving or evicting it never
+    searches a list.
+    """
+
+    __slots__ = ('key', 'value', 'size', 'prev', 'next', 'group')
+
+    def __init__(self, key: str = None, value: object = None, size: int = 0) -> None:
+        self.key = key
+        self.value = value
+        self.size = size
+        self.prev = self        # An unlinked entry is its own list, which is how list sentinels start
+        self.next = self
+        self.group = None       # FrequencyGroup holding the entry, for the LFU policy
+
+    def __str__(self) -> str:
+        return str(self.key) + ': ' + str(self.value)
+
+    def unlink(self) -> None:
+        """
+        Removes the entry from the list it is in.
+        """
+        self.prev.next = self.next
+        self.next.prev = self.prev
+
+    def link_after(self, other: 'CacheEntry') -> None:
+        """
+        Inserts the entry into a list right after another entry or sentinel.
+        """
+        self.prev = other
+        self.next = other.next
+        other.next.prev = self
+        other.next = self
+
+
+class FrequencyGroup:
+    """
+    Entries of an LFU BoundedCache used the same number of times, most
+    recently used first. The groups form a list in increasing count order,
+    so the least frequently used entry is always at the end of the first one.
+    """
+
+    __slots__ = ('count', 'entries', 'prev', 'next')
+
+    def __init__(self, count: int = 0) -> None:
+        self.count = count
+        self.entries = CacheEntry()     # Sentinel of the group's entry list
+        self.prev = self
+        self.next = self
+
+    def link_after(self, other: 'FrequencyGroup') -> None:
+        """
+        Inserts the group into the group list right after another group or sentinel.
+        """
+        self.prev = other
+        self.next = other.next
+        other.next.prev = self
+        other.next = self
+
+    def unlink(self) -> None:
+        """
+        Removes the group from the group list.
+        """
+        self.prev.next = self.next
+        self.next.prev = self.prev
+
+
+class FrequencySketch:
+    """
+    Count-min sketch of how often keys were used, in SKETCH_DEPTH rows of
+    saturating counters. A key's estimate is its smallest counter, which can
+    only overcount, and a use only increments the counters at that smallest
+    value, which keeps keys sharing counters from inflating each other. Once
+    SKETCH_SAMPLE additions per cached entry were made, every counter is
+    halved, so old popularity fades.
+    """
+
+    __slots__ = ('_counters', '_width', '_mask', '_additions', '_sample')
+
+    def __init__(self, entries: int) -> None:
+        """
+        :param entries: Int value representing the number of keys the cache holds.
+        """
+        self._width = 1 << max(4, (SKETCH_WIDTH * entries - 1).bit_length())     # Power of two
+        self._mask = self._width - 1
+        self._counters = bytearray(SKETCH_DEPTH * self._width)
+        self._additions = 0
+        self._sample = SKETCH_SAMPLE * entries
+
+    def _indexes(self, hash: int) -> tuple:
+        """
+        Returns the counter of each row for a hash, derived from its two
+        halves by double hashing.
+        """
+        mask = self._mask
+        width = self._width
+        step = (hash >> 32) | 1
+        return (hash & mask, ((hash + step) & mask) + width,
+                ((hash + 2 * step) & mask) + 2 * width, ((hash + 3 * step) & mask) + 3 * width)
+
+    def increment(self, hash: int) -> None:
+        """
+        Counts one use of the key with the given hash.
+
+        :param hash: The 64-bit hash value of the key.
+
+        :return: None.
+        """
+        counters = self._counters
+        first, second, third, fourth = indexes = self._indexes(hash)
+        count = min(counters[first], counters[second], counters[third], counters[fourth])
+        if count < SKETCH_MAX_COUNT:
+            for index in indexes:
+                if counters[index] == count:
+                    counters[index] += 1
+        self._additions += 1
+        if self._additions >= self._sample:
+            self._counters = counters.translate(_HALVE)
+            self._additions //= 2
+
+    def estimate(self, hash: int) -> int:
+        """
+        Returns how often the key with the given hash was used recently.
+
+        :param hash: The 64-bit hash value of the key.
+
+        :return: An int value representing the estimated count.
+        """
+        counters = self._counters
+        first, second, third, fourth = self._indexes(hash)
+        return min(counters[first], counters[second], counters[third], counters[fourth])
+
+
+class BoundedCache:
+    def __init__(self,
+                 max_entries: int = None,
+                 max_bytes: int = None,
+                 policy: str = LRU,
+                 function: callable = hash_function_1,
+                 sizeof: callable = _entry_size,
+                 **options) -> None:
+        """
+        Initialize new BoundedCache, which keeps its entries in a chaining
+        hash map and evicts entries once max_entries or max_bytes would be
+        exceeded. Each entry is stored in the map as a CacheEntry that is also
+        a node of a doubly linked eviction list, so put, get and remove never
+        scan the map or a list.
+
+        policy selects the eviction order, one of CACHE_POLICIES. LRU keeps
+        one list in recency order. LFU keeps a FrequencyGroup list and moves
+        an entry to the next group on every use. TINY_LFU evicts like LRU,
+        but counts every use in a FrequencySketch and refuses a new key that
+        is used less often than the entry it would evict, so keys seen once
+        cannot flush popular ones out.
+
+        :param max_entries: Int value representing the most entries kept, or None.
+        :param max_bytes: Int value representing the most bytes kept, or None.
+        :param policy: The eviction policy, one of CACHE_POLICIES.
+        :param function: The hash function given to the map.
+        :param sizeof: Function of a key and value returning their size in bytes, used with max_bytes.
+        :param options: Extra keyword arguments given to the map, such as chains.
+        """
+        if policy not in CACHE_POLICIES:
+            raise ValueError(f"Unknown cache policy: {policy}")
+        if max_entries is None and max_bytes is None:
+            raise ValueError("A cache needs max_entries, max_bytes or both")
+        if (max_entries is not None and max_entries < 1) or (max_bytes is not None and max_bytes < 1):
+            raise ValueError(f"Cache limits must be positive: {max_entries}, {max_bytes}")
+        self._policy = policy
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._sizeof = sizeof
+
+        # A table as large as max_entries never resizes once the cache is full
+        self._map = SCHashMap(max_entries if max_entries is not None else 11, function, **options)
+        self._bytes = 0
+        self._recency = CacheEntry()        # Sentinel of the LRU list, most recently used first
+        self._groups = FrequencyGroup()     # Sentinel of the LFU group list, least used count first
+        self._sketch = None
+        if policy == TINY_LFU:
+            self._sketch = FrequencySketch(max_entries if max_entries is not None else max(16, max_bytes // 256))
+        self._modifications = 0     # Bumped by every change that adds, removes or moves entries
+        self.reset_stats()
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for entry in self._entries():
+            out += str(entry) + '\n'
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return number of entries in the cache
+        """
+        return self._map.get_size()
+
+    def get_bytes(self) -> int:
+        """
+        Returns the total sizeof of the entries in the cache.
+
+        :return: An int value representing the bytes used.
+        """
+        return self._bytes
+
+    # ------------------------------------------------------------------ #
+
+    def get(self, key: str):
+        """
+        Returns the value of a key and counts it as used, or returns None if
+        it is not in the cache. A miss is not counted as a use, since the put
+        that usually follows it is.
+
+        :param key: Represents the key, the value will be derived from.
+
+        :return: The key's value.
+        """
+        entry = self._map.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        if self._sketch is not None:
+            self._sketch.increment(builtin_hash(key))
+        self._touch(entry)
+        return entry.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Searches for a given key in the cache, without counting it as used.
+
+        :param key: The key that the method will search for.
+
+        :return: A boolean value representing whether or not the key was found.
+        """
+        return self._map.contains_key(key)
+
+    def put(self, key: str, value: object) -> bool:
+        """
+        Adds or updates a key and counts it as used, evicting other entries
+        until the cache is within its limits. A key larger than max_bytes, or
+        a new key that TINY_LFU does not admit, is not stored.
+
+        :param key: The key that will be added to the cache.
+        :param value: The value that will be added to the cache.
+
+        :return: A boolean value representing whether or not the key is now cached.
+        """
+        size = self._sizeof(key, value) if self._max_bytes is not None else 0
+        if self._sketch is not None:
+            hash = builtin_hash(key)        # Represents the key's hash in the sketch
+            self._sketch.increment(hash)
+
+        entry = self._map.get(key)
+        if entry is not None:
+            if self._max_bytes is not None and size > self._max_bytes:
+                self._delete(entry)
+                self._rejections += 1
+                return False
+            self._bytes += size - entry.size
+            entry.value = value
+            entry.size = size
+            self._touch(entry)
+            self._evict(0, entry)
+            return True
+
+        if self._max_bytes is not None and size > self._max_bytes:
+            self._rejections += 1
+            return False
+        if self._sketch is not None and self._over_limit(size):
+            victim = self._victim(None)
+            if self._sketch.estimate(hash) <= self._sketch.estimate(builtin_hash(victim.key)):
+                self._rejections += 1
+                return False
+        self._evict(size, None)
+
+        entry = CacheEntry(key, value, size)
+        self._map.put(key, entry)
+        self._bytes += size
+        self._modifications += 1
+        if self._policy == LFU:
+            self._promote(entry, self._groups)
+        else:
+            entry.link_after(self._recency)
+        return True
+
+    def remove(self, key: str) -> None:
+        """
+        Removes a key from the cache.
+
+        :param key: The key that will be removed.
+
+        :return: None.
+        """
+        entry = self._map.get(key)
+        if entry is not None:
+            self._delete(entry)
+
+    def clear(self) -> None:
+        """
+        Removes every entry, keeping the counters.
+
+        :return: None.
+        """
+        self._map.clear()
+        self._bytes = 0
+        self._recency = CacheEntry()
+        self._groups = FrequencyGroup()
+        self._modifications += 1
+
+    def get_stats(self) -> dict:
+        """
+        Returns the counters kept since the cache was built or reset_stats
+        was called. Rejections are puts that did not store their key.
+
+        :return: Dictionary of stat names to values.
+        """
+        lookups = self._hits + self._misses
+        return {'hits': self._hits, 'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups != 0 else 0.0,
+                'evictions': self._evictions, 'rejections': self._rejections,
+                'size': self.get_size(), 'bytes': self._bytes}
+
+    def reset_stats(self) -> None:
+        """
+        Sets the counters back to zero.
+
+        :return: None.
+        """
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._rejections = 0
+
+    def keys(self):
+        """
+        Returns a generator over the keys of the cache, the next one evicted first.
+        """
+        return (entry.key for entry in self._entries())
+
+    def items(self):
+        """
+        Returns a generator over (key, value) tuples of the cache, the next one evicted first.
+        """
+        return ((entry.key, entry.value) for entry in self._entries())
+
+    # ------------------------------------------------------------------ #
+
+    def _touch(self, entry: CacheEntry) -> None:
+        """
+        Moves an entry to where its latest use puts it in the eviction order.
+
+        :param entry: The entry that was used.
+
+        :return: None.
+        """
+        self._modifications += 1
+        if self._policy == LFU:
+            group = entry.group
+            entry.unlink()
+            self._promote(entry, group)
+            if group.entries.next is group.entries:
+                group.unlink()
+        else:
+            entry.unlink()
+            entry.link_after(self._recency)
+
+    def _promote(self, entry: CacheEntry, group: FrequencyGroup) -> None:
+        """
+        Links an entry into the group after the given one, used one more time,
+        creating that group if it does not exist.
+
+        :param entry: The unlinked entry.
+        :param group: The entry's current group, or the sentinel for a new entry.
+
+        :return: None.
+        """
+        target = group.next
+        if target.count != group.count + 1:
+            target = FrequencyGroup(group.count + 1)
+            target.link_after(group)
+        entry.group = target
+        entry.link_after(target.entries)
+
+    def _over_limit(self, size: int, added: int = 1) -> bool:
+        """
+        Returns whether adding size bytes in added new entries would exceed a limit.
+        """
+        return ((self._max_entries is not None and self._map.get_size() + added > self._max_entries)
+                or (self._max_bytes is not None and self._bytes + size > self._max_bytes))
+
+    def _victim(self, keep):
+        """
+        Returns the entry evicted next, other than keep.
+
+        :param keep: An entry that must not be evicted, or None.
+
+        :return: The victim entry, or None if there is none.
+        """
+        for entry in self._entries():
+            if entry is not keep:
+                return entry
+        return None
+
+    def _evict(self, size: int, keep) -> None:
+        """
+        Evicts entries until a new entry of size bytes fits, or until an
+        updated entry keep fits when size is 0.
+
+        :param size: Int value representing the bytes of the entry being added.
+        :param keep: The entry being updated, which is never evicted, or None.
+
+        :return: None.
+        """
+        added = 1 if keep is None else 0    # An updated entry is already counted
+        while self._over_limit(size, added):
+            self._delete(self._victim(keep))
+            self._evictions += 1
+
+    def _delete(self, entry: CacheEntry) -> None:
+        """
+        Removes an entry from the map and from its eviction list.
+
+        :param entry: The entry that will be removed.
+
+        :return: None.
+        """
+        self._map.remove(entry.key)
+        self._bytes -= entry.size
+        self._modifications += 1
+        entry.unlink()
+        group = entry.group
+        if group is not None and group.entries.next is group.entries:
+            group.unlink()
+
+    def _lists(self):
+        """
+        Generates the sentinels of the eviction lists, the one evicted from first first.
+
+        :return: Generator of CacheEntry sentinels.
+        """
+        if self._policy != LFU:
+            yield self._recency
+            return
+        group = self._groups.next
+        while group is not self._groups:
+            yield group.entries
+            group = group.next
+
+    def _entries(self):
+        """
+        Generates the entries in eviction order, the next victim first.
+
+        :return: Generator of CacheEntry objects.
+        """
+        modifications = self._modifications     # Changes made so far, any new one ends the iteration
+        for sentinel in self._lists():
+            entry = sentinel.prev
+            while entry is not sentinel:
+                yield entry
+                if modifications != self._modifications:
+                    raise RuntimeError("BoundedCache changed during iteration")
+                entry = entry.prev
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nBoundedCache example 1")
+    print("----------------------")
+    c = BoundedCache(3)
+    for key in ('a', 'b', 'c'):
+        c.put(key, key.upper())
+    c.get('a')
+    c.put('d', 'D')
+    print(list(c.keys()), c.get('b'), c.get('a'))
+    print(c.get_stats())
+
+    print("\nBoundedCache example 2")
+    print("----------------------")
+    c = BoundedCache(3, policy=LFU)
+    for key in ('a', 'a', 'a', 'b', 'b', 'c'):
+        c.put(key, key.upper())
+    c.put('d', 'D')
+    c.put('e', 'E')
+    print(c, end='')
+    print(c.get_size(), c.get('c'), c.get('a'))
+
+    print("\nBoundedCache example 3")
+    print("----------------------")
+    for policy in CACHE_POLICIES:
+        c = BoundedCache(100, policy=policy)
+        for i in range(3000):
+            for key in ('hot' + str(i % 100), 'scan' + str(i)):     # Popular keys between keys seen once
+                if c.get(key) is None:
+                    c.put(key, i)
+        print(policy, sum(c.contains_key('hot' + str(i)) for i in range(100)), c.get_stats())
+
+    print("\nBoundedCache example 4")
+    print("----------------------")
+    c = BoundedCache(max_bytes=1000, sizeof=lambda key, value: len(value))
+    for i in range(10):
+        c.put('str' + str(i), 'x' * 150)
+    print(c.get_size(), c.get_bytes(), list(c.keys()))
+    print(c.put('big', 'x' * 1001), c.put('str9', 'x' * 900), c.get_size(), c.get_bytes())
+    c.remove('str9')
+    print(c.get_size(), c.get_bytes(), c.get_stats()['evictions'])
@@ -0,0 +1,603 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Implements a hash map utilizing cuckoo hashing, whose lookups
+#              check at most two buckets and a small stash.
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from hash_functions import fnv1a_64, hash_many, word_hash
+from hash_map_oa import CachedHashEntry, int_hash
+from primes import next_prime
+
+MAX_KICKS = 64      # Entries one insert may evict before the last evicted entry goes to the stash
+STASH_SIZE = 4      # Most entries the stash holds, a fuller one makes the map pick a new salt
+MAX_REHASHES = 8    # Salts a rebuild tries, doubling the tables after every second one, before giving up
+BUCKET_SLOTS = 4    # Suggested bucket_size, which lets the table fill to a load of .9
+
+
+class CuckooHashMap:
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 function_2: callable = hash_function_2,
+                 bucket_size: int = 1) -> None:
+        """
+        Initialize new CuckooHashMap. Its slots are split into two tables of
+        buckets, and a key may only live in bucket function(key) of the first
+        table, bucket function_2(key) of the second table, or the stash. A get
+        therefore compares at most 2 * bucket_size + STASH_SIZE keys, however
+        the keys collide. An insert into two full buckets evicts an entry to
+        its other bucket, up to MAX_KICKS times, and the last entry evicted
+        goes to the stash. An entry that finds the stash full makes the map
+        place every entry again with a new salt, growing the tables if a few
+        salts do not help.
+
+        Both bucket choices mix the two hash values and the salt together, so
+        functions with few distinct values still spread over the whole table.
+        Keys sharing both hash values can only ever fit in their two buckets
+        and the stash. hash_function_1 and hash_function_2 give the same pair
+        to many short keys, such as anagrams, so once no salt separates them
+        the map switches to fnv1a_64 and word_hash, which hash every byte of a
+        key, and hashes its keys again.
+
+        :param capacity: Int value representing the starting number of slots.
+        :param function: The hash function of the first table.
+        :param function_2: The hash function of the second table.
+        :param bucket_size: Int value representing the slots per bucket, 1 or BUCKET_SLOTS.
+        """
+        if bucket_size < 1:
+            raise ValueError(f"Bucket size must be at least 1: {bucket_size}")
+        self._hash_function = function
+        self._hash_function_2 = function_2
+        self._bucket_size = bucket_size
+        self._salt = 0              # Mixed into both bucket choices, changed when entries do not fit
+        # Two choices of one slot fill to about .5, buckets of 4 slots to over .9
+        self._max_load = .45 if bucket_size == 1 else .9
+
+        self._allocate(self._next_prime(max(1, -(-capacity // (2 * bucket_size)))))
+        self._size = 0
+        self._modifications = 0      # Bumped by every change that adds, removes or moves entries
+        self._victim = 0            # Bucket slot evicted next, rotated so evictions do not repeat
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            out += str(i) + ': ' + str(self._tables[i % 2][i // 2]) + '\n'
+        for entry in self._stash.values():
+            out += 'STASH: ' + str(entry) + '\n'
+        return out
+
+    @staticmethod
+    def _next_prime(capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number
+        """
+        return next_prime(capacity)
+
+    def _allocate(self, buckets: int) -> None:
+        """
+        Creates two empty tables with the given number of buckets each.
+
+        :param buckets: Int value representing the buckets per table.
+
+        :return: None.
+        """
+        self._buckets = buckets
+        self._capacity = 2 * buckets * self._bucket_size
+        self._tables = ([None] * (buckets * self._bucket_size), [None] * (buckets * self._bucket_size))
+        self._stash = {}        # Entries without a slot, by key
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    def get_stash_size(self) -> int:
+        """
+        Returns the number of entries that did not fit in either of their buckets.
+
+        :return: An int value representing the stash size.
+        """
+        return len(self._stash)
+
+    # ------------------------------------------------------------------ #
+
+    def _hash(self, key: str) -> tuple:
+        """
+        Returns the tuple of both mixed hash values of a key and both hash
+        function values, cached in its entry so the key is never hashed again
+        when the entry is evicted, the table resized or the salt changed.
+        """
+        return self._mix(self._hash_function(key), self._hash_function_2(key))
+
+    def _mix(self, hash: int, hash_2: int) -> tuple:
+        """
+        Returns the hashes used to pick a key's bucket in each table, each
+        combining both full hash function values with the salt, followed by
+        the two hash function values.
+        """
+        salt = self._salt
+        return int_hash(hash ^ int_hash(hash_2 ^ salt)), int_hash(hash_2 ^ int_hash(hash ^ salt)), hash, hash_2
+
+    def _locate(self, key: str, hash: tuple) -> tuple:
+        """
+        Searches the two buckets and the stash a key may live in.
+
+        :param key: The key being searched for.
+        :param hash: The tuple of both mixed hash values and both hash function values of the key.
+
+        :return: Tuple of the table holding the key and its slot, or of the stash and the key,
+                 or (None, -1) if it is not found.
+        """
+        size = self._bucket_size
+        for table in (0, 1):
+            slots = self._tables[table]
+            start = hash[table] % self._buckets * size
+            for slot in range(start, start + size):
+                entry = slots[slot]
+                if entry is not None and entry.hash == hash and entry.key == key:
+                    return slots, slot
+
+        if key in self._stash:
+            return self._stash, key
+        return None, -1
+
+    def _free_slot(self, entry: CachedHashEntry, table: int) -> int:
+        """
+        Returns the first free slot of an entry's bucket in one table.
+
+        :param entry: The entry that will be placed.
+        :param table: Int value representing the table, 0 or 1.
+
+        :return: The slot index in the table, or -1 if the bucket is full.
+        """
+        slots = self._tables[table]
+        start = entry.hash[table] % self._buckets * self._bucket_size
+        for slot in range(start, start + self._bucket_size):
+            if slots[slot] is None:
+                return slot
+        return -1
+
+    def _place(self, entry: CachedHashEntry, path: list = None):
+        """
+        Puts an entry into a free slot of one of its buckets, evicting entries
+        into their other bucket when both are full.
+
+        :param entry: The entry of a key that is not in the tables.
+        :param path: List the (slots, slot) tuple of every eviction is appended to, or None.
+
+        :return: The entry left without a slot after MAX_KICKS evictions, or None.
+        """
+        size = self._bucket_size
+        table = 0                       # Table whose bucket the next eviction happens in
+
+        for _ in range(MAX_KICKS):
+            for choice in (table, 1 - table):
+                slot = self._free_slot(entry, choice)
+                if slot != -1:
+                    self._tables[choice][slot] = entry
+                    return None
+
+            slots = self._tables[table]
+            slot = entry.hash[table] % self._buckets * size + self._victim
+            self._victim = (self._victim + 1) % size
+            entry, slots[slot] = slots[slot], entry
+            if path is not None:
+                path.append((slots, slot))
+            # The evicted entry's bucket in this table is now full, so it moves to the other one
+            table = 1 - table
+        return entry
+
+    @staticmethod
+    def _unplace(entry: CachedHashEntry, path: list) -> CachedHashEntry:
+        """
+        Undoes the evictions of a _place call, putting every evicted entry
+        back into the slot it was evicted from.
+
+        :param entry: The entry _place returned.
+        :param path: The list of evictions _place appended to.
+
+        :return: The entry _place was given.
+        """
+        for slots, slot in reversed(path):
+            entry, slots[slot] = slots[slot], entry
+        return entry
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key and value pair of a hash map.
+
+        :param key: The key that will be added to the hash map.
+        :param value: The value that will be added to the hash map.
+
+        :return: None.
+        """
+        hash = self._hash(key)
+        slots, index = self._locate(key, hash)
+        if slots is not None:       # Duplicate key, only the value is updated
+            slots[index].value = value
+            return
+
+        # Checks to see if the table needs to be resized.
+        if (self._size + 1) / self._capacity > self._max_load:
+            self.resize_table(self._capacity * 2)
+            hash = self._hash(key)      # The resize may have changed the salt or the hash functions
+
+        self._insert(CachedHashEntry(key, value, hash))
+
+    def _insert(self, entry: CachedHashEntry) -> None:
+        """
+        Adds the entry of a new key. The entry left without a slot goes to
+        the stash, and when the stash is full the evictions are undone and
+        every entry is placed again by _rebuild, or by _rehash_keys when no
+        salt helps. Only keys sharing both fnv1a_64 and word_hash values
+        raise ValueError, and leave the map unchanged.
+
+        :param entry: The entry of a key that is not in the hash map.
+
+        :return: None.
+        """
+        path = []
+        homeless = self._place(entry, path)
+        if homeless is not None:
+            if len(self._stash) < STASH_SIZE:
+                self._stash[homeless.key] = homeless
+            else:
+                self._unplace(homeless, path)
+                entries = list(self._live_entries())
+                # Keys sharing both hash values share both buckets whatever the salt and capacity
+                sharing = sum(1 for other in entries if other.hash[2:] == entry.hash[2:])
+                entries.append(entry)
+                if sharing >= 2 * self._bucket_size + STASH_SIZE or not self._rebuild(entries, self._buckets):
+                    if self._rehash_keys(entries, self._buckets) is False:
+                        raise ValueError(f"Too many keys share the hash values of {entry.key!r}")
+        self._size += 1
+        self._modifications += 1
+
+    def _rebuild(self, entries: list, buckets: int) -> bool:
+        """
+        Places entries into new tables, with a new salt each time the stash
+        overflows, doubling the tables after every second salt. After
+        MAX_REHASHES salts the map is left as it was.
+
+        :param entries: List of the entries the tables will hold.
+        :param buckets: Int value representing the buckets per table to start with.
+
+        :return: A boolean value representing whether or not every entry was placed.
+        """
+        old = (self._buckets, self._tables, self._stash, self._salt)
+        for attempt in range(MAX_REHASHES):
+            if attempt > 0:
+                self._salt = int_hash(self._salt + 1)
+                if attempt % 2 == 0:
+                    buckets = self._next_prime(2 * buckets)
+            if self._place_all(entries, buckets, old[3]) is True:
+                return True
+
+        buckets, self._tables, self._stash, salt = old
+        self._capacity = 2 * buckets * self._bucket_size
+        self._buckets = buckets
+        if salt != self._salt:
+            self._salt = salt
+            for entry in entries:
+                entry.hash = self._mix(entry.hash[2], entry.hash[3])
+        return False
+
+    def _rehash_keys(self, entries: list, buckets: int) -> bool:
+        """
+        Switches to fnv1a_64 and word_hash once the map's hash functions give
+        keys values that no salt separates, and places the entries again
+        under their new hashes. The map is left as it was if that fails too.
+
+        :param entries: List of the entries the tables will hold.
+        :param buckets: Int value representing the buckets per table to start with.
+
+        :return: A boolean value representing whether or not every entry was placed.
+        """
+        functions = (self._hash_function, self._hash_function_2)
+        if functions == (fnv1a_64, word_hash):
+            return False
+        hashes = [entry.hash for entry in entries]
+
+        self._hash_function, self._hash_function_2 = fnv1a_64, word_hash
+        for entry in entries:
+            entry.hash = self._hash(entry.key)
+        if self._rebuild(entries, buckets) is True:
+            return True
+
+        self._hash_function, self._hash_function_2 = functions
+        for index in range(len(entries)):
+            entries[index].hash = hashes[index]
+        return False
+
+    def _place_all(self, entries: list, buckets: int, salt: int) -> bool:
+        """
+        Places entries into new, empty tables, stopping when the stash overflows.
+
+        :param entries: List of the entries the tables will hold.
+        :param buckets: Int value representing the buckets per table.
+        :param salt: The salt the entries' cached hashes were mixed with.
+
+        :return: A boolean value representing whether or not every entry was placed.
+        """
+        self._allocate(buckets)
+        remix = salt != self._salt
+        for entry in entries:
+            if remix is True:
+                entry.hash = self._mix(entry.hash[2], entry.hash[3])
+            homeless = self._place(entry)
+            if homeless is not None:
+                if len(self._stash) == STASH_SIZE:
+                    return False
+                self._stash[homeless.key] = homeless
+        return True
+
+    def get(self, key: str) -> object:
+        """
+        Returns a value, using the associated key in the hash map.
+
+        :param key: Represents the key, the value will be derived from.
+
+        :return: The key's value.
+        """
+        if self._size == 0:
+            return None
+
+        slots, index = self._locate(key, self._hash(key))
+        if slots is None:
+            return None
+        return slots[index].value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Searches for a given key in the hash map.
+
+        :param key: The key that the method will search for.
+
+        :return: A boolean value representing whether or not the key was found.
+        """
+        if self._size == 0:
+            return False
+
+        return self._locate(key, self._hash(key))[0] is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Removes a key from the hash map. The freed slot lets stashed entries
+        move back into their buckets.
+
+        :param key: The key that will be removed.
+
+        :return: None.
+        """
+        if self._size == 0:
+            return
+
+        slots, index = self._locate(key, self._hash(key))
+        if slots is None:
+            return
+        if slots is self._stash:
+            del self._stash[index]
+        else:
+            slots[index] = None
+            if self._stash:
+                self._unstash()
+        self._size -= 1
+        self._modifications += 1
+
+    def _unstash(self) -> None:
+        """
+        Moves stashed entries into free slots of their buckets, without
+        evictions.
+
+        :return: None.
+        """
+        for entry in list(self._stash.values()):
+            for table in (0, 1):
+                slot = self._free_slot(entry, table)
+                if slot != -1:
+                    self._tables[table][slot] = entry
+                    del self._stash[entry.key]
+                    break
+
+    def table_load(self) -> float:
+        """
+        Returns the current load factor of the hash table.
+
+        :return: A float value representing the load factor.
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty slots in the two tables.
+
+        :return: An int value representing the number of empty slots.
+        """
+        return self._capacity - (self._size - len(self._stash))
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the internal hash table, placing every entry
+        again by its cached hashes. If the stash overflows, _rebuild picks a
+        new salt and, failing that, more capacity. Entries that still do not
+        fit leave the table as it was.
+
+        :param new_capacity: Int value representing the new number of slots.
+
+        :return: None.
+        """
+        if new_capacity < self._size:
+            return
+
+        entries = list(self._live_entries())
+        buckets = self._next_prime(max(1, -(-new_capacity // (2 * self._bucket_size))))
+        if self._rebuild(entries, buckets) is True or self._rehash_keys(entries, buckets) is True:
+            self._modifications += 1
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map, without changing the underlying capacity.
+
+        :return: None.
+        """
+        self._allocate(self._buckets)
+        self._size = 0
+        self._modifications += 1
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds or updates many key/value pairs, growing the table once for the
+        final count and hashing every key up front. The hash values are mixed
+        one key at a time, since an insert may change the salt, and keys are
+        hashed again once an insert changed the hash functions.
+
+        :param pairs: Iterable of (key, value) tuples.
+
+        :return: None.
+        """
+        pairs = list(pairs)
+        keys = [key for key, value in pairs]
+        function = self._hash_function
+        hashes = hash_many(keys, function)
+        hashes_2 = hash_many(keys, self._hash_function_2)
+        if (self._size + len(pairs)) / self._capacity > self._max_load:
+            self.resize_table(int((self._size + len(pairs)) / self._max_load) + 1)
+
+        for index in range(len(pairs)):
+            key, value = pairs[index]
+            if self._hash_function is function:
+                hash = self._mix(hashes[index], hashes_2[index])
+            else:
+                hash = self._hash(key)
+            slots, slot = self._locate(key, hash)
+            if slots is not None:
+                slots[slot].value = value
+                continue
+            if (self._size + 1) / self._capacity > self._max_load:
+                self.resize_table(self._capacity * 2)
+                hash = self._hash(key)
+            self._insert(CachedHashEntry(key, value, hash))
+
+    def get_many(self, keys) -> list:
+        """
+        Returns the values of many keys, hashing every key up front.
+
+        :param keys: Iterable of keys.
+
+        :return: List of values in the same order as the keys, None for missing keys.
+        """
+        keys = list(keys)
+        hashes = list(map(self._mix, hash_many(keys, self._hash_function), hash_many(keys, self._hash_function_2)))
+        values = []
+
+        for index in range(len(keys)):
+            slots, slot = self._locate(keys[index], hashes[index])
+            values.append(None if slots is None else slots[slot].value)
+        return values
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes many keys.
+
+        :param keys: Iterable of keys.
+
+        :return: None.
+        """
+        for key in keys:
+            self.remove(key)
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array containing tuples of all key/value pairs in a hash map.
+
+        :return: Dynamic array with tuple values.
+        """
+        new_array = DynamicArray()
+        for entry in self._live_entries():
+            new_array.append((entry.key, entry.value))
+        return new_array
+
+    def _live_entries(self):
+        """
+        Generates the entries of both tables and then the stash. Each call
+        has its own cursor, so several iterations can run at once.
+
+        :return: Generator of CachedHashEntry objects.
+        """
+        modifications = self._modifications     # Changes made so far, any new one ends the iteration
+        tables = self._tables
+        stash = self._stash
+
+        for slots in tables + (stash.values(),):
+            for entry in slots:
+                if modifications != self._modifications:
+                    raise RuntimeError("CuckooHashMap changed during iteration")
+                if entry is not None:
+                    yield entry
+
+    def keys(self):
+        """
+        Returns a generator over the keys of the hash map.
+        """
+        return (entry.key for entry in self._live_entries())
+
+    def values(self):
+        """
+        Returns a generator over the values of the hash map.
+        """
+        return (entry.value for entry in self._live_entries())
+
+    def items(self):
+        """
+        Returns a generator over (key, value) tuples of the hash map.
+        """
+        return ((entry.key, entry.value) for entry in self._live_entries())
+
+    def __iter__(self):
+        """
+        Iterates over the keys of the hash map.
+        """
+        return self.keys()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    from itertools import permutations
+
+    print("\nCuckooHashMap example 1")
+    print("-----------------------")
+    m = CuckooHashMap(11)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+    for i in range(0, 150, 3):
+        m.remove('str' + str(i))
+    print(m.get_size(), m.get_capacity(), round(m.table_load(), 2), m.empty_buckets(), m.get_stash_size())
+    print(m.get('str1'), m.get('str3'), m.contains_key('str149'), m.contains_key('missing'))
+
+    print("\nCuckooHashMap example 2")
+    print("-----------------------")
+    keys = [''.join(letters) for letters in permutations('abcdef')]     # One hash_function_1 value
+    m = CuckooHashMap(11, hash_function_1, hash_function_2, bucket_size=BUCKET_SLOTS)
+    for key in keys:
+        m.put(key, key.upper())
+    print(m.get_size(), m.get_stash_size(), m._hash_function.__name__, m.get_many(['abcdef', 'fedcba', 'abcdeg']))
+    m.resize_table(m.get_size())
+    print(m.get_size(), m.get_capacity() >= m.get_size(), sorted(m.keys()) == sorted(keys))
+    m = CuckooHashMap(11, fnv1a_64, word_hash, bucket_size=BUCKET_SLOTS)
+    m.put_many((key, key.upper()) for key in keys)
+    print(m.get_size(), m.get_capacity(), m.get_stash_size(), m.get_many(['abcdef', 'fedcba', 'abcdeg']))
+    print(sorted(m.keys()) == sorted(keys), m.get_keys_and_values().length())
+    m.clear()
+    print(m.get_size(), m.get('abcdef'), m.get_stash_size())
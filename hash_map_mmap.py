@@ -0,0 +1,277 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Implements a read-only, memory-mapped hash map file that uses
+#              open addressing with quadratic probing, for tables larger than RAM.
+
+import mmap
+import os
+import struct
+from array import array
+from hashlib import blake2b
+
+from primes import next_prime
+
+# File layout: header, append-only heap of key and value records, then the slot table
+_MAGIC = b'A6HM'
+_VERSION = 1
+_HEADER = struct.Struct('<4sIQQQ')  # Magic, version, capacity, size, slot table offset
+_SLOT = struct.Struct('<QQQB7x')    # Hash, key record offset, value record offset, state
+_LENGTH = struct.Struct('<I')       # Length prefix of a key or value record
+
+_EMPTY = 0
+_LIVE = 1
+
+
+def file_hash(key: bytes) -> int:
+    """
+    Hashes a key for a hash map file. Unlike hash_function_1/2 and the
+    built-in hash, the result is the same in every process and every run,
+    which the file format depends on.
+
+    :param key: The encoded key that will be hashed.
+
+    :return: An unsigned 64-bit hash value.
+    """
+    return int.from_bytes(blake2b(key, digest_size=8).digest(), 'little')
+
+
+def _encode(data) -> bytes:
+    """
+    Returns the bytes stored for a key or value, encoding str as UTF-8.
+    """
+    return data.encode() if isinstance(data, str) else bytes(data)
+
+
+class MmapHashMap:
+    def __init__(self, path: str) -> None:
+        """
+        Opens a hash map file written by MmapHashMap.build. The file is mapped
+        read-only, so every process that opens it shares the same pages, and
+        lookups read slots and records in place without loading the table.
+
+        :param path: The path of the hash map file.
+        """
+        with open(path, 'rb') as file:
+            self._mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self._capacity, self._size, self._slots = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self._mm.close()
+            raise ValueError(f"Not a version {_VERSION} hash map file: {path}")
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            hash, key, value, state = _SLOT.unpack_from(self._mm, self._slots + i * _SLOT.size)
+            if state == _LIVE:
+                out += str(i) + ': K: ' + str(self._record(key)) + ' V: ' + str(self._record(value)) + '\n'
+            else:
+                out += str(i) + ': None\n'
+        return out
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Unmaps the file.
+
+        :return: None.
+        """
+        self._mm.close()
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    def table_load(self) -> float:
+        """
+        Returns the current load factor of the hash table.
+
+        :return: A float value representing the load factor.
+        """
+        return self._size / self._capacity
+
+    @staticmethod
+    def build(path: str, pairs) -> None:
+        """
+        Writes a hash map file from key/value pairs. Records are streamed into
+        the heap as the pairs are read, so only 24 bytes per pair are kept in
+        memory. A later pair replaces the value of an earlier one with the same key.
+
+        :param path: The path of the file that will be written.
+        :param pairs: Iterable of (key, value) tuples of str or bytes.
+
+        :return: None.
+        """
+        hashes = array('Q')     # Hash, key offset and value offset of every pair, in pair order
+        keys = array('Q')
+        values = array('Q')
+
+        with open(path, 'w+b') as file:
+            file.write(bytes(_HEADER.size))
+            offset = _HEADER.size
+            for key, value in pairs:
+                key = _encode(key)
+                value = _encode(value)
+                hashes.append(file_hash(key))
+                keys.append(offset)
+                values.append(offset + _LENGTH.size + len(key))
+                file.write(_LENGTH.pack(len(key)) + key + _LENGTH.pack(len(value)) + value)
+                offset += 2 * _LENGTH.size + len(key) + len(value)
+
+            # The slot table starts 8-byte aligned after the heap, and the load stays under .5
+            slots = (offset + 7) // 8 * 8
+            capacity = next_prime(2 * len(hashes) + 1)
+            file.truncate(slots + capacity * _SLOT.size)
+
+            with mmap.mmap(file.fileno(), 0) as mm:
+                size = 0
+                for index in range(len(hashes)):
+                    hash = hashes[index]
+                    for j in range(capacity):
+                        slot = slots + (hash + j * j) % capacity * _SLOT.size
+                        slot_hash, key, value, state = _SLOT.unpack_from(mm, slot)
+                        if state == _EMPTY:
+                            _SLOT.pack_into(mm, slot, hash, keys[index], values[index], _LIVE)
+                            size += 1
+                            break
+                        if slot_hash == hash and _record_at(mm, key) == _record_at(mm, keys[index]):
+                            _SLOT.pack_into(mm, slot, hash, key, values[index], _LIVE)
+                            break
+                _HEADER.pack_into(mm, 0, _MAGIC, _VERSION, capacity, size, slots)
+                mm.flush()
+
+    def _record(self, offset: int) -> bytes:
+        """
+        Returns the bytes of the key or value record at an offset.
+        """
+        return _record_at(self._mm, offset)
+
+    def _find_slot(self, key: bytes) -> int:
+        """
+        Follows the quadratic probe sequence of a key.
+
+        :param key: The encoded key that will be searched for.
+
+        :return: The value record offset of the key, or -1 if it is not found.
+        """
+        mm = self._mm
+        capacity = self._capacity
+        hash = file_hash(key)
+
+        for j in range(capacity):
+            slot_hash, key_offset, value_offset, state = _SLOT.unpack_from(
+                mm, self._slots + (hash + j * j) % capacity * _SLOT.size)
+            if state == _EMPTY:
+                return -1
+            if slot_hash == hash:
+                length = _LENGTH.unpack_from(mm, key_offset)[0]
+                start = key_offset + _LENGTH.size
+                if length == len(key) and mm[start:start + length] == key:
+                    return value_offset
+        return -1
+
+    def get(self, key) -> bytes:
+        """
+        Returns the stored bytes of a key's value, without decoding them.
+
+        :param key: The str or bytes key, the value will be derived from.
+
+        :return: The value's bytes, or None if the key is not found.
+        """
+        if self._size == 0:
+            return None
+        offset = self._find_slot(_encode(key))
+        if offset == -1:
+            return None
+        return self._record(offset)
+
+    def contains_key(self, key) -> bool:
+        """
+        Searches for a given key in the hash map.
+
+        :param key: The str or bytes key that the method will search for.
+
+        :return: A boolean value representing whether or not the key was found.
+        """
+        if self._size == 0:
+            return False
+        return self._find_slot(_encode(key)) != -1
+
+    def items(self):
+        """
+        Returns a generator over (key, value) tuples of bytes, in slot order.
+        """
+        for i in range(self._capacity):
+            hash, key, value, state = _SLOT.unpack_from(self._mm, self._slots + i * _SLOT.size)
+            if state == _LIVE:
+                yield self._record(key), self._record(value)
+
+    def keys(self):
+        """
+        Returns a generator over the keys of the hash map.
+        """
+        return (key for key, value in self.items())
+
+    def values(self):
+        """
+        Returns a generator over the values of the hash map.
+        """
+        return (value for key, value in self.items())
+
+
+def _record_at(mm, offset: int) -> bytes:
+    """
+    Returns the bytes of the length-prefixed record at an offset of a mapped file.
+    """
+    length = _LENGTH.unpack_from(mm, offset)[0]
+    start = offset + _LENGTH.size
+    return mm[start:start + length]
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+
+    def count_hits(path: str) -> int:
+        with MmapHashMap(path) as m:
+            return sum(m.contains_key('str' + str(i)) for i in range(0, 2000, 7))
+
+    print("\nMmapHashMap example 1")
+    print("---------------------")
+    path = os.path.join(tempfile.mkdtemp(), 'table.a6hm')
+    MmapHashMap.build(path, (('str' + str(i), str(i * 10)) for i in range(1000)))
+    with MmapHashMap(path) as m:
+        print(m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+        print(m.get('str0'), m.get('str999'), m.get('missing'), m.contains_key(b'str500'))
+
+    print("\nMmapHashMap example 2")
+    print("---------------------")
+    MmapHashMap.build(path, [('a', 'one'), (b'b', b'two'), ('a', 'three'), ('', b'\x00')])
+    with MmapHashMap(path) as m:
+        print(m.get_size(), sorted(m.items()))
+
+    print("\nMmapHashMap example 3")
+    print("---------------------")
+    MmapHashMap.build(path, (('str' + str(i), '') for i in range(1000)))
+    with ProcessPoolExecutor(2) as pool:
+        print(list(pool.map(count_hits, [path] * 2)))
+    os.remove(path)
@@ -5,86 +5,1257 @@
 # Due Date: 06/09/23
 # Description: Implements a hash map utilizing open addressing with quadratic probing.
 
-from a6_include import (DynamicArray, DynamicArrayException, HashEntry,
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:     # NumpyIntHashMap is only available when NumPy is installed
+    np = None
+
+from a6_include import (DynamicArray, HashEntry,
                         hash_function_1, hash_function_2)
+from cow import MISSING, MapSnapshot, SnapshotRegistry
+from hash_functions import SeededHash, hash_many
+from primes import growth_prime, is_prime, next_prime
+import snapshot
+from stats import MapStats
+
+# Slot states used by the array-backed engine
+_EMPTY = 0
+_LIVE = 1
+_TOMBSTONE = 2
+
+_HASH_MASK = (1 << 64) - 1  # Cached hashes are stored as unsigned 64-bit values
+
+REHASH_STEPS = 16   # Old buckets moved per operation during an incremental resize
+LONG_PROBE = 48     # Probes for one put that make a map with a SeededHash reseed and rehash
+SHRINK_LOAD = .125  # Load factor under which a map built with shrink=True is resized to a load of .25
+
+# Probing strategies accepted by HashMap
+LINEAR = 'linear'
+QUADRATIC = 'quadratic'
+DOUBLE_HASHING = 'double_hashing'   # Step size taken from hash_function_2
+ROBIN_HOOD = 'robin_hood'           # Linear probing with Robin Hood insertion and backward-shift deletion
+PROBING_STRATEGIES = (LINEAR, QUADRATIC, DOUBLE_HASHING, ROBIN_HOOD)
+
+VECTOR_PROBE_ROUNDS = 8     # Probe rounds done with NumPy before falling back to scalar lookups
+
+# Control bytes of SwissHashMap, whose live slots hold the low 7 bits of their hash instead
+GROUP_WIDTH = 16        # Slots whose control bytes are searched together
+SWISS_MAX_LOAD = 7 / 8  # Live slots and tombstones allowed before a SwissHashMap resizes
+_CTRL_EMPTY = 0x80
+_CTRL_DELETED = 0xFE
+_GOLDEN_RATIO_64 = 0x9E3779B97F4A7C15
+
+
+def int_hash(key: int) -> int:
+    """
+    Fibonacci multiplicative hash for integer keys, matching int_hash_array.
+
+    :param key: The integer key that will be hashed.
+
+    :return: An unsigned 64-bit hash value.
+    """
+    hash = ((key & _HASH_MASK) * _GOLDEN_RATIO_64) & _HASH_MASK
+    return hash ^ (hash >> 29)
+
+
+def int_hash_array(keys):
+    """
+    Vectorized int_hash over a NumPy array of integer keys.
+
+    :param keys: NumPy array of integer keys.
+
+    :return: NumPy uint64 array of hash values.
+    """
+    hashes = keys.astype(np.uint64) * np.uint64(_GOLDEN_RATIO_64)   # Wraps around modulo 2 ** 64
+    return hashes ^ (hashes >> np.uint64(29))
+
+
+class CachedHashEntry(HashEntry):
+    """
+    HashEntry that also stores the full hash of its key, so the key is never
+    hashed again on resize and probes can compare hashes before keys.
+    """
+
+    def __init__(self, key: str, value: object, hash: int) -> None:
+        super().__init__(key, value)
+        self.hash = hash
+
+
+def _copy_entry(entry):
+    """
+    Returns a copy of a bucket for a snapshot, since entries are updated and
+    turned into tombstones in place.
+    """
+    if entry is None:
+        return None
+    copied = CachedHashEntry(entry.key, entry.value, entry.hash)
+    copied.is_tombstone = entry.is_tombstone
+    return copied
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    def __init__(self, capacity: int, function, incremental: bool = False,
+                 probing: str = QUADRATIC, stats: bool = False, shrink: bool = False) -> None:
         """
         Initialize new HashMap that uses
         quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+
+        When incremental is True, growing the table does not reinsert every entry
+        at once. The old buckets are kept next to the new ones and each later
+        put/get/contains_key/remove moves REHASH_STEPS of them.
+
+        probing selects the collision resolution, one of PROBING_STRATEGIES.
+
+        When function is a hash_functions.SeededHash, a put that needs
+        LONG_PROBE probes reseeds it and rehashes every key, so keys chosen to
+        collide cannot keep probes long.
+
+        When stats is True, the map keeps MapStats counters, read with get_stats.
+
+        When shrink is True, a remove that leaves the load under SHRINK_LOAD
+        halves the table's load by resizing, never below the starting
+        capacity, and clear goes back to the starting capacity.
+
+        snapshot returns a read-only HashMapSnapshot that shares the buckets
+        with the map, which copies a page of them before its first write.
         """
+        if probing not in PROBING_STRATEGIES:
+            raise ValueError(f"Unknown probing strategy: {probing}")
+        self._probing = probing
+
         self._buckets = DynamicArray()
 
         # capacity must be a prime number
         self._capacity = self._next_prime(capacity)
         for _ in range(self._capacity):
             self._buckets.append(None)
+        self._shrink = shrink
+        self._min_capacity = self._capacity     # Smallest capacity automatic shrinking goes down to
 
         self._hash_function = function
+        self._seeded = isinstance(function, SeededHash)
+        self._reseeds = 0
         self._size = 0
+        self._modifications = 0      # Bumped by every change that adds, removes or moves entries
+        self._tombstones = 0        # Tombstones in the current buckets, they lengthen probes like live entries
+        self._stats = MapStats() if stats is True else None
+
+        self._incremental = incremental
+        self._old_buckets = None    # Table being drained by an incremental resize
+        self._old_capacity = 0
+        self._rehash_index = 0      # Next old bucket that will be moved
+        self._snapshots = None      # SnapshotRegistry of the open snapshots, made by the first one
 
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
+        self._finish_rehash()
         out = ''
         for i in range(self._buckets.length()):
             out += str(i) + ': ' + str(self._buckets[i]) + '\n'
         return out
 
-    def _next_prime(self, capacity: int) -> int:
+    @staticmethod
+    def _next_prime(capacity: int) -> int:
         """
         Increment from given number to find the closest prime number
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity % 2 == 0:
-            capacity += 1
-
-        while not self._is_prime(capacity):
-            capacity += 2
-
-        return capacity
+        return next_prime(capacity)
 
     @staticmethod
     def _is_prime(capacity: int) -> bool:
         """
         Determine if given integer is a prime number and return boolean
+        """
+        return is_prime(capacity)
+
+    def get_size(self) -> int:
+        """
+        Return size of map
         DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity == 2 or capacity == 3:
-            return True
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        DO NOT CHANGE THIS METHOD IN ANY WAY
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key and value pair of a hash map.
+
+        :param key: The key that will be added to the hash map.
+        :param value: The value that will be added to the hash map.
+
+        :return: None.
+        """
+        self._put_key(key, value, self._hash(key))
+
+    def _put_key(self, key: str, value: object, hash) -> None:
+        """
+        put with an already computed hash value, which lets a ShardedHashMap
+        hash a key once both to pick its shard and to probe for it.
+        """
+        if self._old_buckets is not None:
+            self._rehash_step()
+
+        # Checks to see if the table needs to be resized, or rebuilt to clear out tombstones.
+        new_capacity = self._grow_capacity()
+        if new_capacity is not None:
+            if self._incremental is True:
+                self._finish_rehash()
+                self._start_rehash(new_capacity)
+            else:
+                self.resize_table(new_capacity)
+
+        # Keys still waiting in the old table are updated where they are
+        if self._old_buckets is not None:
+            slot = self._find_slot(self._old_buckets, self._old_capacity, key, hash)
+            if slot is not None:
+                if self._snapshots is not None:
+                    self._snapshots.preserve(self._old_buckets, slot)
+                self._old_buckets[slot].value = value
+                return
+
+        self._check_probe(self._put_hashed(key, value, hash))
+
+    def _grow_capacity(self):
+        """
+        Returns the capacity the next put will resize the table to, or None
+        if it fits in the current table. A table whose load is mostly
+        tombstones is rebuilt at the same capacity.
+        """
+        if (self._size + self._tombstones) / self._capacity >= .5:
+            if self.table_load() >= .25:
+                return self._capacity * 2
+            return self._capacity
+        return None
+
+    def _empty_bucket(self):
+        """
+        Returns the contents of a new empty bucket.
+        """
+        return None
+
+    def _put_hashed(self, key: str, value: object, hash: int) -> int:
+        """
+        Adds or updates a key using an already computed hash value.
+
+        :param key: The key that will be added to the hash map.
+        :param value: The value that will be added to the hash map.
+        :param hash: The hash value of the key.
+
+        :return: An int value representing the number of buckets probed.
+        """
+        if self._probing == ROBIN_HOOD:
+            return self._put_robin_hood(key, value, hash)
+
+        tombstone = None                 # First tombstone seen, reused if the key is not found further on
+        probe = None
+        count = 0
+
+        # Follows the probe sequence until the key or an empty bucket is found
+        for count, probe in enumerate(self._probe_sequence(hash, self._capacity)):
+            bucket = self._buckets[probe]
+            if bucket is None:
+                break
+            if bucket.is_tombstone is True:
+                if tombstone is None:
+                    tombstone = probe
+            elif bucket.hash == hash and bucket.key == key:     # Checks for duplicates
+                if self._snapshots is not None:
+                    self._snapshots.preserve(self._buckets, probe)
+                bucket.value = value
+                if self._stats is not None:
+                    self._stats.record_probe(count + 1)
+                return count + 1
+
+        if self._stats is not None:
+            self._stats.record_probe(count + 1)
+            self._stats.record_insert(count > 0)
+        if tombstone is not None:
+            probe = tombstone
+            self._tombstones -= 1
+        if self._snapshots is not None:
+            self._snapshots.preserve(self._buckets, probe)
+        self._buckets[probe] = CachedHashEntry(key, value, hash)
+        self._size += 1
+        self._modifications += 1
+        return count + 1
+
+    def _put_robin_hood(self, key: str, value: object, hash) -> int:
+        """
+        Adds or updates a key with Robin Hood insertion. An entry that is
+        closer to its home bucket than the one being placed gives up its bucket
+        and is carried further along, which keeps probe lengths even.
+
+        :param key: The key that will be added to the hash map.
+        :param value: The value that will be added to the hash map.
+        :param hash: The hash value of the key.
+
+        :return: An int value representing the distance of the key from its home bucket, plus one.
+        """
+        capacity = self._capacity
+        probe = hash % capacity
+        distance = 0        # Distance of the carried entry from its home bucket
+        carried = None      # Entry being placed, created once the key is known to be new
+        length = 0          # Probe length of the new key, known once it has a bucket
+
+        while True:
+            bucket = self._buckets[probe]
+            if bucket is None:
+                if carried is None:
+                    carried = CachedHashEntry(key, value, hash)
+                    self._record_put(distance, True)
+                    length = distance + 1
+                if self._snapshots is not None:
+                    self._snapshots.preserve(self._buckets, probe)
+                self._buckets[probe] = carried
+                self._size += 1
+                self._modifications += 1
+                return length
+            if carried is None and bucket.hash == hash and bucket.key == key:
+                if self._snapshots is not None:
+                    self._snapshots.preserve(self._buckets, probe)
+                bucket.value = value
+                self._record_put(distance, False)
+                return distance + 1
+            displacement = (probe - bucket.hash % capacity) % capacity
+            if displacement < distance:
+                # The key would have been found before this bucket, so it is new
+                if carried is None:
+                    carried = CachedHashEntry(key, value, hash)
+                    self._record_put(distance, True)
+                    length = distance + 1
+                if self._snapshots is not None:
+                    self._snapshots.preserve(self._buckets, probe)
+                self._buckets[probe] = carried
+                carried = bucket
+                distance = displacement
+            probe = (probe + 1) % capacity
+            distance += 1
+
+    def _check_probe(self, length: int) -> None:
+        """
+        Reseeds the hash function and rehashes every key when a put needed
+        LONG_PROBE probes or more and the map hashes with a SeededHash.
+
+        :param length: Int value representing the number of buckets the put probed.
+
+        :return: None.
+        """
+        if length >= LONG_PROBE and self._seeded is True:
+            self._reseed()
+
+    def _reseed(self) -> None:
+        """
+        Gives the hash function a new random seed and puts every key back in
+        a table of the same capacity under its new hash.
+
+        :return: None.
+        """
+        self._finish_rehash()
+        pairs = [(entry.key, entry.value) for entry in self._live_entries()]
+        self._hash_function.reseed()
+        self._reseeds += 1
+
+        stats = self._stats             # Reinserted entries are not counted as operations
+        self._stats = None
+        self._buckets = DynamicArray()
+        for _ in range(self._capacity):
+            self._buckets.append(None)
+        self._size = 0
+        self._tombstones = 0
+        self._modifications += 1
+        for key, value in pairs:
+            self._put_hashed(key, value, self._hash(key))
+        self._stats = stats
+
+    def _record_put(self, distance: int, inserted: bool) -> None:
+        """
+        Counts a Robin Hood put that reached its bucket after the given
+        distance, when stats are enabled.
+        """
+        if self._stats is not None:
+            self._stats.record_probe(distance + 1)
+            if inserted is True:
+                self._stats.record_insert(distance > 0)
+
+    def table_load(self) -> float:
+        """
+        Returns the current load factor of the hash table.
+
+        :return: A float value representing the load factor.
+        """
+        return self._size / self._capacity
+
+    def get_tombstones(self) -> int:
+        """
+        Returns the number of tombstones left in the hash table by remove.
+
+        :return: An int value representing the number of tombstones.
+        """
+        return self._tombstones
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the hash table.
+
+        :return: An int value representing the number of empty buckets.
+        """
+        self._finish_rehash()
+        # Every bucket that does not hold a live entry is empty, tombstones included
+        return self._capacity - self._size
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the internal hash table.
 
-        if capacity == 1 or capacity % 2 == 0:
+        :param new_capacity: Int value representing the new capacity.
+
+        :return: None.
+        """
+        # Checks for a negative capacity value
+        if new_capacity < self._size:
+            return
+        # Checks for a prime number, and updates to the next prime number if not found
+        elif self._is_prime(new_capacity) is False:
+            new_capacity = self._next_prime(new_capacity)
+        self._finish_rehash()
+        # Grows the capacity the same way put would while the entries are reinserted
+        while (self._size - 1) / new_capacity >= .5:
+            new_capacity = self._next_prime(new_capacity * 2)
+
+        start = time.perf_counter()
+        stats = self._stats             # Reinserted entries are not counted as operations
+        self._stats = None
+        length = self._size             # Represents the current size of the hash map.
+        new_array = DynamicArray()      # Represents a temp dynamic array to house old values in hashmap
+        empty_array = DynamicArray()    # Represents new empty array with updated capacity for hash map
+
+        for element in range(self._capacity):
+            if self._buckets[element] is not None and self._buckets[element].is_tombstone is False:
+                new_array.append(self._buckets[element])
+        for bucket in range(new_capacity):
+            empty_array.append(None)
+
+        self._capacity = new_capacity
+        self._buckets = empty_array
+        self._size = 0
+        self._tombstones = 0
+        self._modifications += 1
+        count = 0      # Keeps track of the number of elements added to the hash map.
+        indices = 0    # Keeps track of the current index during iteration
+
+        while count < length:
+            bucket = new_array[indices]
+            self._put_hashed(bucket.key, bucket.value, bucket.hash)
+            count += 1
+            indices += 1
+
+        self._stats = stats
+        if stats is not None:
+            stats.record_resize(time.perf_counter() - start)
+        return
+
+    def reserve(self, count: int) -> None:
+        """
+        Grows the table once so that it can hold the given number of keys
+        under the .5 load limit, instead of doubling repeatedly as they are added.
+
+        :param count: Int value representing the number of keys the table must hold.
+
+        :return: None.
+        """
+        self._finish_rehash()
+        if (count + self._tombstones) / self._capacity >= .5:
+            self.resize_table(growth_prime(2 * count + 1))
+
+    def shrink_to_fit(self) -> None:
+        """
+        Resizes the table to the smallest prime capacity that holds the
+        current keys under the .5 load limit, dropping every tombstone.
+
+        :return: None.
+        """
+        self.resize_table(2 * self._size + 1)
+
+    def _check_shrink(self) -> None:
+        """
+        Shrinks a map built with shrink=True once removes leave its load under
+        SHRINK_LOAD. The new load is .25, so the table has to double its keys
+        before it grows again.
+
+        :return: None.
+        """
+        if self._shrink is False or self._old_buckets is not None or self._capacity <= self._min_capacity:
+            return
+        if self.table_load() < SHRINK_LOAD:
+            new_capacity = max(self._next_prime(4 * self._size), self._min_capacity)
+            if self._incremental is True:
+                self._start_rehash(new_capacity)
+            else:
+                self.resize_table(new_capacity)
+
+    def get(self, key: str) -> object:
+        """
+        Returns a node value, using the associated key in the hash map.
+
+        :param key: Represents the key, the value will be derived from.
+
+        :return: The key's value.
+        """
+        # Checks for an empty hash map
+        if self._size == 0:
+            return None
+        return self._get_key(key, self._hash(key))
+
+    def _get_key(self, key: str, hash) -> object:
+        """
+        get with an already computed hash value.
+        """
+        if self._old_buckets is not None:
+            self._rehash_step()
+
+        entry = self._lookup(key, hash)
+        if entry is None:
+            return None
+        return entry.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Searches for a given key in the hash map.
+
+        :param key: The key that the method will search for.
+
+        :return: A boolean value representing whether or not the key was found.
+        """
+        # Checks for an empty hash map
+        if self._size == 0:
             return False
+        return self._contains_key(key, self._hash(key))
+
+    def _contains_key(self, key: str, hash) -> bool:
+        """
+        contains_key with an already computed hash value.
+        """
+        if self._old_buckets is not None:
+            self._rehash_step()
+
+        return self._lookup(key, hash) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Removes a key from the hash map.
+
+        :param key: The key that will be removed.
+
+        :return: None.
+        """
+        # Checks for an empty hash map
+        if self._size == 0:
+            return
+        self._remove_key(key, self._hash(key))
+        return
+
+    def _remove_key(self, key: str, hash) -> None:
+        """
+        remove with an already computed hash value.
+        """
+        if self._old_buckets is not None:
+            self._rehash_step()
+
+        self._remove_hashed(key, hash)
+        self._check_shrink()
+
+    def _remove_hashed(self, key: str, hash: int) -> None:
+        """
+        Removes a key using an already computed hash value.
+
+        :param key: The key that will be removed.
+        :param hash: The hash value of the key.
+
+        :return: None.
+        """
+        slot = self._find_slot(self._buckets, self._capacity, key, hash)
+        if slot is not None:
+            if self._snapshots is not None:
+                self._snapshots.preserve(self._buckets, slot)
+            if self._probing == ROBIN_HOOD:
+                self._backward_shift(slot)
+            else:
+                self._buckets[slot].is_tombstone = True
+                self._tombstones += 1
+            self._size -= 1
+            self._modifications += 1
+        elif self._old_buckets is not None:
+            # The old table is never inserted into, so a tombstone is enough for every strategy
+            slot = self._find_slot(self._old_buckets, self._old_capacity, key, hash)
+            if slot is not None:
+                if self._snapshots is not None:
+                    self._snapshots.preserve(self._old_buckets, slot)
+                self._old_buckets[slot].is_tombstone = True
+                self._size -= 1
+                self._modifications += 1
+
+    def _backward_shift(self, slot: int) -> None:
+        """
+        Deletes the entry at a bucket by moving the following displaced entries
+        back one bucket each, so Robin Hood tables never hold tombstones.
+
+        :param slot: Int value representing the bucket of the removed entry.
+
+        :return: None.
+        """
+        capacity = self._capacity
+        following = (slot + 1) % capacity
+
+        while True:
+            bucket = self._buckets[following]
+            if bucket is None or bucket.hash % capacity == following:
+                break
+            if self._snapshots is not None:
+                self._snapshots.preserve(self._buckets, following)
+            self._buckets[slot] = bucket
+            slot = following
+            following = (following + 1) % capacity
+        self._buckets[slot] = None
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds or updates many key/value pairs. The table is sized once for the
+        final count and every key is hashed before any of them are inserted.
+
+        :param pairs: Iterable of (key, value) tuples.
+
+        :return: None.
+        """
+        pairs = list(pairs)
+        hashes = self._hash_many([key for key, value in pairs])
+
+        self.reserve(self._size + len(pairs))
+
+        reseeds = self._reseeds
+        for index in range(len(pairs)):
+            key, value = pairs[index]
+            # A reseed makes the hashes computed up front stale
+            hash = hashes[index] if self._reseeds == reseeds else self._hash(key)
+            self._check_probe(self._put_hashed(key, value, hash))
+
+    def get_many(self, keys) -> list:
+        """
+        Returns the values of many keys, hashing every key up front.
+
+        :param keys: Iterable of keys.
+
+        :return: List of values in the same order as the keys, None for missing keys.
+        """
+        keys = list(keys)
+        hashes = self._hash_many(keys)
+        values = []
+
+        for index in range(len(keys)):
+            entry = self._lookup(keys[index], hashes[index])
+            values.append(None if entry is None else entry.value)
+        return values
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes many keys, hashing every key up front.
+
+        :param keys: Iterable of keys.
+
+        :return: None.
+        """
+        keys = list(keys)
+        hashes = self._hash_many(keys)
+
+        for index in range(len(keys)):
+            self._remove_hashed(keys[index], hashes[index])
+        self._check_shrink()
+
+    def merge(self, other, combine=None) -> None:
+        """
+        Adds every key of another hash map. When both maps hash keys the same
+        way, the other map's cached hashes are used and no key is hashed again.
+
+        :param other: hash_map_oa.HashMap or hash_map_sc.HashMap whose keys will be added.
+        :param combine: Function called with (current value, other value) for keys
+                        in both maps. When None, the other map's value replaces the current one.
+
+        :return: None.
+        """
+        reuse = other._hash_scheme() == self._hash_scheme()    # Cached hashes are only valid for the same scheme
+        self._merge_hashed(list(other._hashed_items()), reuse, combine)
+
+    def _merge_hashed(self, entries: list, reuse: bool, combine=None) -> None:
+        """
+        Adds (hash, key, value) entries taken from another map of this class,
+        sizing the table once for all of them. With combine the entries may
+        repeat keys, so the table is sized for the distinct ones.
+
+        :param entries: List of (hash, key, value) tuples, with unique keys unless combine is given.
+        :param reuse: A boolean value representing whether the hashes can be used as they are.
+        :param combine: Function called with (current value, new value) for keys already in the map.
+
+        :return: None.
+        """
+        if combine is None:
+            self.reserve(self._size + len(entries))
+        else:
+            self.reserve(self._size + len({key for hash, key, value in entries}))
+
+        reseeds = self._reseeds
+        for hash, key, value in entries:
+            if reuse is False or self._reseeds != reseeds:
+                hash = self._hash(key)
+            if combine is not None:
+                slot = self._find_slot(self._buckets, self._capacity, key, hash)    # reserve ended any resize
+                if slot is not None:
+                    if self._snapshots is not None:
+                        self._snapshots.preserve(self._buckets, slot)
+                    self._buckets[slot].value = combine(self._buckets[slot].value, value)
+                    continue
+            self._check_probe(self._put_hashed(key, value, hash))
+
+    def _hash_scheme(self) -> tuple:
+        """
+        Returns what the cached hashes depend on, so merge can tell whether
+        another map's cached hashes can be used as they are.
+        """
+        return self._hash_function, self._probing == DOUBLE_HASHING
+
+    def _hashed_items(self):
+        """
+        Returns a generator of (hash, key, value) tuples for the live entries.
+        """
+        return ((entry.hash, entry.key, entry.value) for entry in self._live_entries())
+
+    def _hash(self, key: str):
+        """
+        Hashes a key for the probing strategy. Double hashing caches both hash
+        values as a tuple, so neither is computed again on resize.
+
+        :param key: The key that will be hashed.
+
+        :return: The hash value of the key.
+        """
+        if self._probing == DOUBLE_HASHING:
+            return self._hash_function(key), hash_function_2(key)
+        return self._hash_function(key)
+
+    def _hash_many(self, keys: list) -> list:
+        """
+        Hashes a list of keys for the probing strategy with hash_functions.hash_many.
+
+        :param keys: List of keys that will be hashed.
+
+        :return: List of hash values in the same order as the keys.
+        """
+        hashes = hash_many(keys, self._hash_function)
+        if self._probing == DOUBLE_HASHING:
+            return list(zip(hashes, hash_many(keys, hash_function_2)))
+        return hashes
+
+    def _probe_sequence(self, hash, capacity: int):
+        """
+        Generates the buckets visited for a hash value by the probing strategy.
+
+        :param hash: The hash value of the key.
+        :param capacity: Int value representing the capacity of the bucket array.
+
+        :return: Generator of bucket indices.
+        """
+        if self._probing == DOUBLE_HASHING:
+            index = hash[0] % capacity
+            step = 1 + hash[1] % (capacity - 1)     # Never 0 and coprime with the prime capacity
+            for count in range(capacity):
+                yield (index + count * step) % capacity
+        elif self._probing == QUADRATIC:
+            index = hash % capacity
+            for count in range(capacity):
+                yield (index + count * count) % capacity
+        else:
+            index = hash % capacity
+            for count in range(capacity):
+                yield (index + count) % capacity
+
+    def _find_slot(self, buckets: DynamicArray, capacity: int, key: str, hash, record: bool = True) -> int:
+        """
+        Follows the probe sequence of a key until the key or an empty bucket is found.
+
+        :param buckets: The bucket array that will be searched.
+        :param capacity: Int value representing the capacity of the bucket array.
+        :param key: The key that will be searched for.
+        :param hash: The hash value of the key.
+        :param record: A boolean value representing whether the probe counts in the stats.
+
+        :return: The bucket index of the live entry holding the key, or None if it is not found.
+        """
+        robin_hood = self._probing == ROBIN_HOOD
+        slot = None
+        count = 0
+
+        for count, probe in enumerate(self._probe_sequence(hash, capacity)):
+            entry = buckets[probe]
+            if entry is None:
+                break
+            if entry.is_tombstone is False and entry.hash == hash and entry.key == key:
+                slot = probe
+                break
+            # A Robin Hood probe can stop at the first entry closer to home than the key would be
+            if robin_hood and (probe - entry.hash % capacity) % capacity < count:
+                break
+
+        if self._stats is not None and record is True:
+            self._stats.record_probe(count + 1)
+        return slot
+
+    def _find_entry(self, buckets: DynamicArray, capacity: int, key: str, hash) -> HashEntry:
+        """
+        Finds the live entry holding a key in a bucket array.
+
+        :return: The live entry holding the key, or None if it is not found.
+        """
+        slot = self._find_slot(buckets, capacity, key, hash)
+        if slot is None:
+            return None
+        return buckets[slot]
+
+    def probe_stats(self) -> dict:
+        """
+        Measures how many probes it takes to reach each entry in the hash table.
+
+        :return: Dictionary with the probing strategy, and the average and max probe length.
+        """
+        self._finish_rehash()
+        total = 0       # Sum of the probe lengths of every entry
+        longest = 0     # Longest probe length found
+
+        for element in range(self._capacity):
+            entry = self._buckets[element]
+            if entry is not None and entry.is_tombstone is False:
+                length = 1
+                for probe in self._probe_sequence(entry.hash, self._capacity):
+                    if probe == element:
+                        break
+                    length += 1
+                total += length
+                longest = max(longest, length)
+
+        average = total / self._size if self._size > 0 else 0.0
+        return {'probing': self._probing, 'average': average, 'max': longest}
+
+    def get_stats(self) -> dict:
+        """
+        Returns the counters kept since the map was built or reset_stats was
+        called, along with the current table figures. Every value is kept up
+        to date as the map changes, so this does not scan the table.
+
+        :return: Dictionary of stat names to values, or None when stats are disabled.
+        """
+        if self._stats is None:
+            return None
+        stats = self._stats.as_dict()
+        stats.update({'size': self._size, 'capacity': self._capacity, 'load': self.table_load(),
+                      'reseeds': self._reseeds,
+                      'empty_buckets': self._capacity - self._size, 'tombstones': self._tombstones,
+                      'tombstone_ratio': self._tombstones / self._capacity})
+        return stats
+
+    def reset_stats(self) -> None:
+        """
+        Sets the stats counters back to zero.
+
+        :return: None.
+        """
+        if self._stats is not None:
+            self._stats.reset()
+
+    def _lookup(self, key: str, hash: int) -> HashEntry:
+        """
+        Finds the live entry for a key, checking the table being drained by an
+        incremental resize when one is in progress.
+
+        :param key: The key that will be searched for.
+        :param hash: The hash value of the key.
+
+        :return: The live entry holding the key, or None if it is not found.
+        """
+        entry = self._find_entry(self._buckets, self._capacity, key, hash)
+        if entry is None and self._old_buckets is not None:
+            entry = self._find_entry(self._old_buckets, self._old_capacity, key, hash)
+        return entry
+
+    def _start_rehash(self, new_capacity: int, buckets: DynamicArray = None) -> None:
+        """
+        Begins an incremental resize. The current buckets are kept as the old
+        table and are moved into the new table a few at a time by later calls.
+
+        :param new_capacity: Int value representing the new capacity.
+        :param buckets: Optional DynamicArray of new_capacity empty buckets built by the
+                        caller, such as AsyncHashMap, which builds it a chunk at a time.
+
+        :return: None.
+        """
+        start = time.perf_counter()
+        if self._is_prime(new_capacity) is False:
+            new_capacity = self._next_prime(new_capacity)
+
+        empty_array = buckets           # Represents new empty array with updated capacity for hash map
+        if empty_array is None:
+            empty_array = DynamicArray()
+            for bucket in range(new_capacity):
+                empty_array.append(None)
+
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._rehash_index = 0
+        self._buckets = empty_array
+        self._capacity = new_capacity
+        self._tombstones = 0
+        self._modifications += 1
+        if self._stats is not None:
+            self._stats.record_resize(time.perf_counter() - start)
+
+    def _rehash_step(self, steps: int = REHASH_STEPS) -> None:
+        """
+        Moves up to the given number of old buckets into the new table, and
+        drops the old table once every bucket has been moved.
+
+        :param steps: Int value representing the number of old buckets to move.
+
+        :return: None.
+        """
+        start = time.perf_counter()
+        stats = self._stats             # Moved entries are not counted as operations
+        self._stats = None
+        end = min(self._rehash_index + steps, self._old_capacity)
+
+        for element in range(self._rehash_index, end):
+            entry = self._old_buckets[element]
+            if entry is not None and entry.is_tombstone is False:
+                if self._snapshots is not None:
+                    self._snapshots.preserve(self._old_buckets, element)
+                # Leaves a tombstone behind so probes in the old table still pass this bucket
+                entry.is_tombstone = True
+                self._size -= 1
+                self._put_hashed(entry.key, entry.value, entry.hash)
+        self._rehash_index = end
+
+        self._stats = stats
+        if stats is not None:
+            stats.record_resize(time.perf_counter() - start, 0)
+
+        if end == self._old_capacity:
+            self._old_buckets = None
+            self._old_capacity = 0
+
+    def _finish_rehash(self) -> None:
+        """
+        Completes an incremental resize that is still in progress.
+
+        :return: None.
+        """
+        if self._old_buckets is not None:
+            self._rehash_step(self._old_capacity)
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map, without changing the underlying
+        capacity unless the map was built with shrink=True. The map gets a
+        new array of empty buckets instead of emptying its buckets one at a
+        time. Open snapshots keep the old array.
+
+        :return: None.
+        """
+        if self._shrink is True:
+            self._capacity = self._min_capacity
+        self._buckets = DynamicArray([None] * self._capacity)
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._size = 0
+        self._tombstones = 0
+        self._modifications += 1
+        return
+
+    def save(self, path: str) -> None:
+        """
+        Writes the bucket layout to a binary snapshot file: the capacity, the
+        hash function id, every bucket's state and the cached hashes, so load
+        can rebuild the table without hashing or probing.
+
+        :param path: The path of the file that will be written.
+
+        :return: None.
+        """
+        self._finish_rehash()
+        double = self._probing == DOUBLE_HASHING
+        states = bytearray(self._capacity)  # _EMPTY, _LIVE or _TOMBSTONE for every bucket
+        hashes = []
+        hashes_2 = []                       # Step hashes, only used by double hashing
+        keys = []
+        values = []
+
+        for index in range(self._capacity):
+            entry = self._buckets[index]
+            if entry is None:
+                continue
+            hash = entry.hash
+            if double is True:
+                hash, hash_2 = hash
+                hashes_2.append(hash_2)
+            hashes.append(hash)
+            keys.append(entry.key)
+            values.append(entry.value)
+            states[index] = _TOMBSTONE if entry.is_tombstone is True else _LIVE
+
+        meta = {'kind': 'hash_map_oa.HashMap', 'function': snapshot.function_id(self._hash_function),
+                'capacity': self._capacity, 'size': self._size, 'tombstones': self._tombstones,
+                'probing': self._probing, 'incremental': self._incremental,
+                'shrink': self._shrink, 'min_capacity': self._min_capacity}
+        snapshot.write(path, meta, [states, snapshot.hash_array(hashes),
+                                    snapshot.hash_array(hashes_2), (keys, values)])
+
+    @classmethod
+    def load(cls, path: str, function: callable = None) -> 'HashMap':
+        """
+        Rebuilds a hash map from a snapshot written by save, placing every
+        entry back in its saved bucket with its saved hash.
+
+        :param path: The path of the snapshot file.
+        :param function: The hash function of the map, imported from the saved id when None.
+
+        :return: The loaded hash map.
+        """
+        meta, sections = snapshot.read(path, 'hash_map_oa.HashMap')
+        function = snapshot.check_function(function, meta['function'])
+        m = cls(1, function, meta['incremental'], meta['probing'], shrink=meta.get('shrink', False))
+        m._min_capacity = meta.get('min_capacity', m._min_capacity)
+
+        states = sections[0]
+        hashes = snapshot.unpack_hashes(sections[1])
+        if meta['probing'] == DOUBLE_HASHING:
+            hashes = list(zip(hashes, snapshot.unpack_hashes(sections[2])))
+        keys, values = snapshot.unpickle(sections[3])
+
+        buckets = [None] * meta['capacity']
+        entry = 0                           # Index of the next saved entry
+        for index in range(meta['capacity']):
+            if states[index] != _EMPTY:
+                buckets[index] = CachedHashEntry(keys[entry], values[entry], hashes[entry])
+                buckets[index].is_tombstone = states[index] == _TOMBSTONE
+                entry += 1
+
+        m._buckets = DynamicArray(buckets)
+        m._capacity = meta['capacity']
+        m._size = meta['size']
+        m._tombstones = meta['tombstones']
+        return m
+
+    def snapshot(self) -> 'HashMapSnapshot':
+        """
+        Returns a read-only view of the hash map as it is now, without copying
+        any entry. The map copies a page of buckets into its open snapshots
+        before the first write to it, and a resize leaves the old buckets to them.
+
+        :return: HashMapSnapshot of the map.
+        """
+        if self._snapshots is None:
+            self._snapshots = SnapshotRegistry(_copy_entry)
+        return HashMapSnapshot(self, self._buckets, self._capacity, self._size,
+                               self._old_buckets, self._old_capacity, self._rehash_index)
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array containing tuples of all key/value pairs in a hash map.
+
+        :return: Dynamic array with tuple values.
+        """
+        self._finish_rehash()
+        new_array = DynamicArray()  # Array that will be returned with tuple values
+
+        for element in range(self._capacity):
+            if self._buckets[element] is not None and self._buckets[element].is_tombstone is False:
+                new_array.append((self._buckets[element].key, self._buckets[element].value))
+        return new_array
+
+    def _live_entries(self):
+        """
+        Generates the live entries of the hash map one bucket at a time. Each
+        call has its own cursor, so several iterations can run at once.
+
+        :return: Generator of live HashEntry objects.
+        """
+        self._finish_rehash()
+        modifications = self._modifications     # Changes made so far, any new one ends the iteration
+        buckets = self._buckets
+        capacity = self._capacity
+
+        for element in range(capacity):
+            if modifications != self._modifications:
+                raise RuntimeError("HashMap changed during iteration")
+            entry = buckets[element]
+            if entry is not None and entry.is_tombstone is False:
+                yield entry
+
+    def keys(self):
+        """
+        Returns a generator over the keys of the hash map.
+        """
+        return (entry.key for entry in self._live_entries())
+
+    def values(self):
+        """
+        Returns a generator over the values of the hash map.
+        """
+        return (entry.value for entry in self._live_entries())
+
+    def items(self):
+        """
+        Returns a generator over (key, value) tuples of the hash map.
+        """
+        return ((entry.key, entry.value) for entry in self._live_entries())
+
+    def __iter__(self):
+        """
+        Create iterator for loop over the live entries.
+        """
+        return self._live_entries()
+
+
+class HashMapSnapshot(MapSnapshot):
+    """
+    MapSnapshot of an open addressing HashMap, returned by HashMap.snapshot.
+    """
+
+    def _hash(self, key: str):
+        """
+        Hashes a key for the map's probing strategy, like HashMap._hash.
+        """
+        if self._map._probing == DOUBLE_HASHING:
+            return self._hash_function(key), hash_function_2(key)
+        return self._hash_function(key)
+
+    def _find(self, key: str, hash) -> object:
+        """
+        Returns the value of a key, checking the old table like the map does
+        during an incremental resize, or MISSING if it is not found. Probes
+        of a snapshot are not counted in the map's stats.
+        """
+        buckets = self._buckets
+        slot = self._map._find_slot(buckets, buckets.capacity, key, hash, False)
+        if slot is None and self._old_buckets is not None:
+            buckets = self._old_buckets
+            slot = self._map._find_slot(buckets, buckets.capacity, key, hash, False)
+        return MISSING if slot is None else buckets[slot].value
+
+    def _bucket_items(self, entry) -> list:
+        """
+        Returns the (key, value) tuple of a bucket's live entry, if it has one.
+        """
+        if entry is None or entry.is_tombstone is True:
+            return []
+        return [(entry.key, entry.value)]
+
+
+class ArrayHashMap:
+    """
+    Open addressing hash map with quadratic probing that stores keys, values,
+    cached hashes and slot states in parallel arrays instead of HashEntry objects.
+    """
+
+    _is_prime = staticmethod(HashMap._is_prime)
+    _next_prime = staticmethod(HashMap._next_prime)
+
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new ArrayHashMap with the same capacity rules as HashMap.
+        """
+        self._capacity = self._next_prime(capacity)
+        self._allocate(self._capacity)
+        self._hash_function = function
+        self._size = 0
+        self._tombstones = 0
+        self._modifications = 0      # Bumped by every change that adds, removes or moves entries
+
+    def __str__(self) -> str:
+        """
+        Override string method to match the HashMap output format.
+        """
+        out = ''
+        for i in range(self._capacity):
+            state = self._states[i]
+            if state == _EMPTY:
+                entry = None
+            else:
+                entry = f"K: {self._keys[i]} V: {self._values[i]} TS: {state == _TOMBSTONE}"
+            out += str(i) + ': ' + str(entry) + '\n'
+        return out
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Creates empty storage columns for the given capacity.
+
+        :param capacity: Int value representing the number of slots.
+
+        :return: None.
+        """
+        self._states = bytearray(capacity)              # One state byte per slot
+        self._hashes = array('Q', bytes(8 * capacity))  # Cached hash per slot
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+
+    def _probe(self, key: object, hash: int) -> tuple:
+        """
+        Walks the quadratic probe sequence for a key.
 
-        factor = 3
-        while factor ** 2 <= capacity:
-            if capacity % factor == 0:
-                return False
-            factor += 2
+        :param key: The key being searched for.
+        :param hash: The cached (masked) hash value of the key.
 
-        return True
+        :return: Tuple of the slot holding the key (or -1), and the first slot
+                 the key could be inserted into (or -1).
+        """
+        states = self._states
+        hashes = self._hashes
+        keys = self._keys
+        capacity = self._capacity
+        index = hash % capacity
+        reusable = -1   # First tombstone seen along the probe sequence
+
+        for count in range(capacity):
+            slot = (index + count * count) % capacity
+            state = states[slot]
+            if state == _EMPTY:
+                return -1, slot if reusable == -1 else reusable
+            if state == _TOMBSTONE:
+                if reusable == -1:
+                    reusable = slot
+            elif hashes[slot] == hash and keys[slot] == key:
+                return slot, reusable
+        return -1, reusable
 
     def get_size(self) -> int:
         """
         Return size of map
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
         return self._size
 
     def get_capacity(self) -> int:
         """
         Return capacity of map
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
         return self._capacity
 
-    # ------------------------------------------------------------------ #
-
     def put(self, key: str, value: object) -> None:
         """
         Updates the key and value pair of a hash map.
@@ -94,37 +1265,24 @@ class HashMap:
 
         :return: None.
         """
-        # Checks to see if the table needs to be resized.
-        if self.table_load() >= .5:
-            self.resize_table(self._capacity * 2)
+        # Checks to see if the table needs to be resized, or rebuilt to clear out tombstones.
+        if (self._size + self._tombstones) / self._capacity >= .5:
+            self.resize_table(self._capacity * 2 if self.table_load() >= .25 else self._capacity)
 
-        hash = self._hash_function(key)  # Represents the hash value found with the key
-        index = hash % self._capacity    # Represents the index the key and value will be added to
-        count = 1                        # Variable for quadratic probing formula
+        hash = self._hash_function(key) & _HASH_MASK
+        slot, free = self._probe(key, hash)
 
-        if self._buckets[index] is not None:                        # Checks for occupied buckets
-            if self._buckets[index].is_tombstone is True:
-                self._buckets[index] = HashEntry(key, value)
-                self._size += 1
-                return
-            elif self._buckets[index].key == key:                   # Checks for duplicates
-                self._buckets[index].value = value
-                return
-            # Iterates through with quadratic probing until an empty space is found for hash entry
-            for bucket in range(self._capacity):
-                quad_probe = (index + (count ** 2)) % self._capacity
-                if self._buckets[quad_probe] is None or self._buckets[quad_probe].is_tombstone is True:
-                    self._buckets[quad_probe] = HashEntry(key, value)
-                    self._size += 1
-                    return
-                elif self._buckets[quad_probe].key == key:
-                    self._buckets[quad_probe].value = value
-                    return
-                count += 1
-        else:
-            self._buckets[index] = HashEntry(key, value)
-            self._size += 1
+        if slot != -1:      # Duplicate key, only the value is updated
+            self._values[slot] = value
             return
+        if self._states[free] == _TOMBSTONE:
+            self._tombstones -= 1
+        self._states[free] = _LIVE
+        self._hashes[free] = hash
+        self._keys[free] = key
+        self._values[free] = value
+        self._size += 1
+        self._modifications += 1
 
     def table_load(self) -> float:
         """
@@ -134,86 +1292,71 @@ class HashMap:
         """
         return self._size / self._capacity
 
+    def get_tombstones(self) -> int:
+        """
+        Returns the number of tombstones left in the hash table by remove.
+
+        :return: An int value representing the number of tombstones.
+        """
+        return self._tombstones
+
     def empty_buckets(self) -> int:
         """
         Returns the number of empty buckets in the hash table.
 
         :return: An int value representing the number of empty buckets.
         """
-        num = 0  # Represents the number of empty buckets found
-
-        for element in range(self._capacity):
-            if self._buckets[element] is None or self._buckets[element].is_tombstone is True:
-                num += 1
-        return num
+        return self._capacity - self._size
 
     def resize_table(self, new_capacity: int) -> None:
         """
-        Changes the capacity of the internal hash table.
+        Changes the capacity of the internal hash table, reusing cached hashes.
 
         :param new_capacity: Int value representing the new capacity.
 
         :return: None.
         """
-        # Checks for a negative capacity value
         if new_capacity < self._size:
             return
-        # Checks for a prime number, and updates to the next prime number if not found
         elif self._is_prime(new_capacity) is False:
             new_capacity = self._next_prime(new_capacity)
+        while (self._size - 1) / new_capacity >= .5:
+            new_capacity = self._next_prime(new_capacity * 2)
 
-        length = self._size             # Represents the current size of the hash map.
-        new_array = DynamicArray()      # Represents a temp dynamic array to house old values in hashmap
-        empty_array = DynamicArray()    # Represents new empty array with updated capacity for hash map
-
-        for element in range(self._capacity):
-            if self._buckets[element] is not None and self._buckets[element].is_tombstone is False:
-                new_array.append(self._buckets[element])
-        for bucket in range(new_capacity):
-            empty_array.append(None)
+        states = self._states
+        hashes = self._hashes
+        keys = self._keys
+        values = self._values
+        old_capacity = self._capacity
 
         self._capacity = new_capacity
-        self._buckets = empty_array
-        self._size = 0
-        count = 0      # Keeps track of the number of elements added to the hash map.
-        indices = 0    # Keeps track of the current index during iteration
-
-        while count < length:
-            bucket = new_array[indices]
-            self.put(bucket.key, bucket.value)
-            count += 1
-            indices += 1
-        return
+        self._allocate(new_capacity)
+        self._tombstones = 0
+        self._modifications += 1
+
+        for slot in range(old_capacity):
+            if states[slot] == _LIVE:
+                free = self._probe(keys[slot], hashes[slot])[1]
+                self._states[free] = _LIVE
+                self._hashes[free] = hashes[slot]
+                self._keys[free] = keys[slot]
+                self._values[free] = values[slot]
 
     def get(self, key: str) -> object:
         """
-        Returns a node value, using the associated key in the hash map.
+        Returns a value, using the associated key in the hash map.
 
         :param key: Represents the key, the value will be derived from.
 
         :return: The key's value.
         """
-        # Checks for an empty hash map
         if self._size == 0:
             return None
 
-        hash = self._hash_function(key)  # Represents the hash value found with the key
-        index = hash % self._capacity    # Represents the index the key and value will be added to
-        count = 1                        # Variable for quadratic probing formula
-
-        if self._buckets[index] is None:
+        slot = self._probe(key, self._hash_function(key) & _HASH_MASK)[0]
+        if slot == -1:
             return None
-        elif self._buckets[index].key == key:
-            return self._buckets[index].value
-        # Iterates through with quadratic probing until key or None is found
-        for bucket in range(self._capacity):
-            quad_probe = (index + (count ** 2)) % self._capacity
-            if self._buckets[quad_probe] is None:
-                return None
-            elif self._buckets[quad_probe].key == key:
-                return self._buckets[quad_probe].value
-            count += 1
-        return None
+        return self._values[slot]
 
     def contains_key(self, key: str) -> bool:
         """
@@ -223,27 +1366,10 @@ class HashMap:
 
         :return: A boolean value representing whether or not the key was found.
         """
-        # Checks for an empty hash map
         if self._size == 0:
             return False
 
-        hash = self._hash_function(key)  # Represents the hash value found with the key
-        index = hash % self._capacity    # Represents the index the key and value will be added to
-        count = 1                        # Variable for quadratic probing formula
-
-        if self._buckets[index] is None:
-            return False
-        elif self._buckets[index].key == key:
-            return True
-        # Iterates through with quadratic probing until key or None is found
-        for bucket in range(self._capacity):
-            quad_probe = (index + (count ** 2)) % self._capacity
-            if self._buckets[quad_probe] is None:
-                return False
-            elif self._buckets[quad_probe].key == key:
-                return True
-            count += 1
-        return False
+        return self._probe(key, self._hash_function(key) & _HASH_MASK)[0] != -1
 
     def remove(self, key: str) -> None:
         """
@@ -253,35 +1379,18 @@ class HashMap:
 
         :return: None.
         """
-        # Checks for an empty hash map
         if self._size == 0:
             return
 
-        hash = self._hash_function(key)  # Represents the hash value found with the key
-        index = hash % self._capacity    # Represents the index the key and value will be added to
-        count = 1                        # Variable for quadratic probing formula
-
-        if self._buckets[index] is None:
+        slot = self._probe(key, self._hash_function(key) & _HASH_MASK)[0]
+        if slot == -1:
             return
-        elif self._buckets[index].key == key:
-            if self._buckets[index].is_tombstone is True:
-                return
-            self._buckets[index].is_tombstone = True
-            self._size -= 1
-            return
-        # Iterates through with quadratic probing until key or None is found
-        for bucket in range(self._capacity):
-            quad_probe = (index + (count ** 2)) % self._capacity
-            if self._buckets[quad_probe] is None:
-                return
-            elif self._buckets[quad_probe].key == key:
-                if self._buckets[quad_probe].is_tombstone is True:
-                    return
-                self._buckets[quad_probe].is_tombstone = True
-                self._size -= 1
-                return
-            count += 1
-        return
+        self._states[slot] = _TOMBSTONE
+        self._keys[slot] = None         # Releases references held by the slot
+        self._values[slot] = None
+        self._size -= 1
+        self._modifications += 1
+        self._tombstones += 1
 
     def clear(self) -> None:
         """
@@ -289,10 +1398,10 @@ class HashMap:
 
         :return: None.
         """
-        for element in range(self._capacity):
-            self._buckets[element] = None
+        self._allocate(self._capacity)
         self._size = 0
-        return
+        self._tombstones = 0
+        self._modifications += 1
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -300,34 +1409,435 @@ class HashMap:
 
         :return: Dynamic array with tuple values.
         """
-        new_array = DynamicArray()  # Array that will be returned with tuple values
+        new_array = DynamicArray()
+        states = self._states
 
-        for element in range(self._capacity):
-            if self._buckets[element] is not None and self._buckets[element].is_tombstone is False:
-                new_array.append((self._buckets[element].key, self._buckets[element].value))
+        for slot in range(self._capacity):
+            if states[slot] == _LIVE:
+                new_array.append((self._keys[slot], self._values[slot]))
         return new_array
 
-    def __iter__(self):
+    def _live_slots(self):
+        """
+        Generates the indices of live slots one at a time. Each call has its
+        own cursor, so several iterations can run at once.
+
+        :return: Generator of slot indices.
+        """
+        modifications = self._modifications     # Changes made so far, any new one ends the iteration
+        states = self._states
+
+        for slot in range(self._capacity):
+            if modifications != self._modifications:
+                raise RuntimeError("ArrayHashMap changed during iteration")
+            if states[slot] == _LIVE:
+                yield slot
+
+    def keys(self):
+        """
+        Returns a generator over the keys of the hash map.
+        """
+        return (self._keys[slot] for slot in self._live_slots())
+
+    def values(self):
+        """
+        Returns a generator over the values of the hash map.
+        """
+        return (self._values[slot] for slot in self._live_slots())
+
+    def items(self):
+        """
+        Returns a generator over (key, value) tuples of the hash map.
+        """
+        return ((self._keys[slot], self._values[slot]) for slot in self._live_slots())
+
+
+class NumpyIntHashMap(ArrayHashMap):
+    """
+    ArrayHashMap for integer keys with NumPy columns, so get_many can hash and
+    probe a whole array of keys at once.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """
+        Initialize new NumpyIntHashMap. Keys are hashed with int_hash.
+        """
+        if np is None:
+            raise ImportError("NumpyIntHashMap requires NumPy")
+        super().__init__(capacity, int_hash)
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Creates empty NumPy storage columns for the given capacity.
+
+        :param capacity: Int value representing the number of slots.
+
+        :return: None.
+        """
+        self._states = np.zeros(capacity, dtype=np.uint8)
+        self._hashes = np.zeros(capacity, dtype=np.uint64)
+        self._keys = np.zeros(capacity, dtype=np.int64)
+        self._values = np.empty(capacity, dtype=object)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the internal hash table, reusing cached hashes.
+
+        :param new_capacity: Int value representing the new capacity.
+
+        :return: None.
+        """
+        if new_capacity < self._size:
+            return
+        elif self._is_prime(new_capacity) is False:
+            new_capacity = self._next_prime(new_capacity)
+        while (self._size - 1) / new_capacity >= .5:
+            new_capacity = self._next_prime(new_capacity * 2)
+
+        live = np.nonzero(self._states == _LIVE)[0]
+        hashes = self._hashes[live].tolist()    # Python ints keep the modulo arithmetic exact
+        keys = self._keys[live].tolist()
+        values = self._values[live]
+
+        self._capacity = new_capacity
+        self._allocate(new_capacity)
+        self._tombstones = 0
+        self._modifications += 1
+
+        for index in range(len(keys)):
+            free = self._probe(keys[index], hashes[index])[1]
+            self._states[free] = _LIVE
+            self._hashes[free] = hashes[index]
+            self._keys[free] = keys[index]
+            self._values[free] = values[index]
+
+    def remove(self, key: int) -> None:
+        """
+        Removes a key from the hash map.
+
+        :param key: The key that will be removed.
+
+        :return: None.
+        """
+        if self._size == 0:
+            return
+
+        slot = self._probe(key, int_hash(key))[0]
+        if slot == -1:
+            return
+        self._states[slot] = _TOMBSTONE
+        self._values[slot] = None
+        self._size -= 1
+        self._modifications += 1
+        self._tombstones += 1
+
+    def get_many(self, keys) -> tuple:
+        """
+        Looks up an array of integer keys. Hashing and the first
+        VECTOR_PROBE_ROUNDS quadratic probes are done on whole arrays, and
+        only keys still unresolved after that use the scalar probe.
+
+        :param keys: NumPy array (or sequence) of integer keys.
+
+        :return: Tuple of a boolean hit mask and an object array of values,
+                 with None where the key is missing.
+        """
+        keys = np.asarray(keys, dtype=np.int64)
+        hits = np.zeros(keys.shape[0], dtype=bool)
+        values = np.full(keys.shape[0], None, dtype=object)
+        if self._size == 0:
+            return hits, values
+
+        hashes = int_hash_array(keys)
+        home = (hashes % np.uint64(self._capacity)).astype(np.int64)
+        pending = np.arange(keys.shape[0])      # Positions of keys that are not resolved yet
+
+        for count in range(VECTOR_PROBE_ROUNDS):
+            if pending.shape[0] == 0:
+                break
+            slots = (home[pending] + count * count) % self._capacity
+            states = self._states[slots]
+            found = ((states == _LIVE) & (self._hashes[slots] == hashes[pending])
+                     & (self._keys[slots] == keys[pending]))
+            hits[pending[found]] = True
+            values[pending[found]] = self._values[slots[found]]
+            # Keys that reached an empty slot are misses, the rest keep probing
+            pending = pending[~found & (states != _EMPTY)]
+
+        for position in pending.tolist():
+            slot = self._probe(int(keys[position]), int(hashes[position]))[0]
+            if slot != -1:
+                hits[position] = True
+                values[position] = self._values[slot]
+        return hits, values
+
+
+class SwissHashMap(ArrayHashMap):
+    """
+    ArrayHashMap modeled on SwissTable. Next to the columns it keeps one
+    control byte per slot, holding the low 7 bits of the slot's hash, or
+    _CTRL_EMPTY/_CTRL_DELETED. Probes move a group of GROUP_WIDTH slots at a
+    time and search the group's control bytes with bytearray.find, so keys
+    and cached hashes are only read for slots whose 7 bits match, and most
+    misses end at the first group without reading any key.
+    """
+
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new SwissHashMap. The capacity is rounded up to a power of
+        two of at least GROUP_WIDTH, and the hash function's values are mixed
+        with int_hash, since groups are picked by the high bits of the hash.
+        """
+        self._capacity = max(GROUP_WIDTH, 1 << (capacity - 1).bit_length())
+        self._allocate(self._capacity)
+        self._hash_function = function
+        self._size = 0
+        self._tombstones = 0
+        self._modifications = 0      # Bumped by every change that adds, removes or moves entries
+
+    def __str__(self) -> str:
+        """
+        Override string method to match the HashMap output format.
         """
-        Create iterator for loop.
+        out = ''
+        for i in range(self._capacity):
+            control = self._ctrl[i]
+            if control == _CTRL_EMPTY:
+                entry = None
+            else:
+                entry = f"K: {self._keys[i]} V: {self._values[i]} TS: {control == _CTRL_DELETED}"
+            out += str(i) + ': ' + str(entry) + '\n'
+        return out
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Creates empty storage columns for the given capacity. The control
+        bytes of the first group are repeated after the last slot, so a group
+        starting near the end can be searched without wrapping around.
+
+        :param capacity: Int value representing the number of slots.
+
+        :return: None.
+        """
+        self._ctrl = bytearray([_CTRL_EMPTY]) * (capacity + GROUP_WIDTH)
+        self._hashes = array('Q', bytes(8 * capacity))  # Cached hash per slot
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+
+    def _hash(self, key: str) -> int:
+        """
+        Returns the mixed hash value of a key, int_hash of the function's value.
+        """
+        hash = ((self._hash_function(key) & _HASH_MASK) * _GOLDEN_RATIO_64) & _HASH_MASK
+        return hash ^ (hash >> 29)
+
+    def _set_ctrl(self, slot: int, control: int) -> None:
+        """
+        Sets the control byte of a slot, and its copy after the last slot.
+        """
+        self._ctrl[slot] = control
+        if slot < GROUP_WIDTH:
+            self._ctrl[self._capacity + slot] = control
+
+    def _find(self, key: str, hash: int) -> int:
+        """
+        Searches for a key group by group. Within a group only slots whose
+        control byte matches the low 7 bits of the hash are compared, and the
+        search ends at the first group holding an empty slot.
+
+        :param key: The key being searched for.
+        :param hash: The mixed hash value of the key.
+
+        :return: The slot holding the key, or -1 if it is not found.
+        """
+        ctrl = self._ctrl
+        hashes = self._hashes
+        keys = self._keys
+        mask = self._capacity - 1
+        low = hash & 0x7F                   # Control byte of the key
+        position = (hash >> 7) & mask       # First slot of the group being searched
+        step = 0
+
+        while True:
+            end = position + GROUP_WIDTH
+            index = ctrl.find(low, position, end)
+            while index != -1:
+                slot = index & mask
+                if hashes[slot] == hash and keys[slot] == key:
+                    return slot
+                index = ctrl.find(low, index + 1, end)
+            if ctrl.find(_CTRL_EMPTY, position, end) != -1:
+                return -1
+            # Triangular steps of whole groups reach every group of a power of two table
+            step += GROUP_WIDTH
+            position = (position + step) & mask
+
+    def _find_free(self, hash: int) -> int:
+        """
+        Returns the first empty or deleted slot along the probe sequence of a hash.
+
+        :param hash: The mixed hash value of the key that will be inserted.
+
+        :return: An int value representing the slot.
+        """
+        ctrl = self._ctrl
+        mask = self._capacity - 1
+        position = (hash >> 7) & mask
+        step = 0
+
+        while True:
+            end = position + GROUP_WIDTH
+            empty = ctrl.find(_CTRL_EMPTY, position, end)
+            deleted = ctrl.find(_CTRL_DELETED, position, end)
+            if deleted != -1 and (empty == -1 or deleted < empty):
+                return deleted & mask
+            if empty != -1:
+                return empty & mask
+            step += GROUP_WIDTH
+            position = (position + step) & mask
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key and value pair of a hash map.
+
+        :param key: The key that will be added to the hash map.
+        :param value: The value that will be added to the hash map.
+
+        :return: None.
+        """
+        # Checks to see if the table needs to be resized, or rebuilt to clear out tombstones.
+        if (self._size + self._tombstones) / self._capacity >= SWISS_MAX_LOAD:
+            self.resize_table(self._capacity * 2 if self.table_load() >= SWISS_MAX_LOAD / 2 else self._capacity)
+
+        hash = self._hash(key)
+        slot = self._find(key, hash)
+        if slot != -1:      # Duplicate key, only the value is updated
+            self._values[slot] = value
+            return
+
+        free = self._find_free(hash)
+        if self._ctrl[free] == _CTRL_DELETED:
+            self._tombstones -= 1
+        self._set_ctrl(free, hash & 0x7F)
+        self._hashes[free] = hash
+        self._keys[free] = key
+        self._values[free] = value
+        self._size += 1
+        self._modifications += 1
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the internal hash table, reusing cached hashes.
+
+        :param new_capacity: Int value representing the new capacity, rounded up to a power of two.
+
+        :return: None.
+        """
+        if new_capacity < self._size:
+            return
+        new_capacity = max(GROUP_WIDTH, 1 << (new_capacity - 1).bit_length())
+        while self._size / new_capacity >= SWISS_MAX_LOAD:
+            new_capacity *= 2
+
+        ctrl = self._ctrl
+        hashes = self._hashes
+        keys = self._keys
+        values = self._values
+        old_capacity = self._capacity
+
+        self._capacity = new_capacity
+        self._allocate(new_capacity)
+        self._tombstones = 0
+        self._modifications += 1
+
+        for slot in range(old_capacity):
+            if ctrl[slot] < _CTRL_EMPTY:
+                free = self._find_free(hashes[slot])
+                self._set_ctrl(free, hashes[slot] & 0x7F)
+                self._hashes[free] = hashes[slot]
+                self._keys[free] = keys[slot]
+                self._values[free] = values[slot]
+
+    def get(self, key: str) -> object:
+        """
+        Returns a value, using the associated key in the hash map.
+
+        :param key: Represents the key, the value will be derived from.
+
+        :return: The key's value.
+        """
+        if self._size == 0:
+            return None
+
+        slot = self._find(key, self._hash(key))
+        if slot == -1:
+            return None
+        return self._values[slot]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Searches for a given key in the hash map.
+
+        :param key: The key that the method will search for.
+
+        :return: A boolean value representing whether or not the key was found.
+        """
+        if self._size == 0:
+            return False
+
+        return self._find(key, self._hash(key)) != -1
+
+    def remove(self, key: str) -> None:
+        """
+        Removes a key from the hash map, marking its slot deleted so probes
+        still continue past it.
+
+        :param key: The key that will be removed.
+
+        :return: None.
+        """
+        if self._size == 0:
+            return
+
+        slot = self._find(key, self._hash(key))
+        if slot == -1:
+            return
+        self._set_ctrl(slot, _CTRL_DELETED)
+        self._keys[slot] = None         # Releases references held by the slot
+        self._values[slot] = None
+        self._size -= 1
+        self._modifications += 1
+        self._tombstones += 1
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array containing tuples of all key/value pairs in a hash map.
+
+        :return: Dynamic array with tuple values.
         """
-        temp = 0
-        if self._buckets[temp] is None or self._buckets[temp].is_tombstone is True:
-            for element in range(self._capacity):
-                temp += 1
-        self._index = temp
-        return self
+        new_array = DynamicArray()
+        ctrl = self._ctrl
+
+        for slot in range(self._capacity):
+            if ctrl[slot] < _CTRL_EMPTY:
+                new_array.append((self._keys[slot], self._values[slot]))
+        return new_array
 
-    def __next__(self):
+    def _live_slots(self):
         """
-        Obtain next value and advance iterator
+        Generates the indices of live slots one at a time. Each call has its
+        own cursor, so several iterations can run at once.
+
+        :return: Generator of slot indices.
         """
-        try:
-            value = self._buckets[self._index]
-        except DynamicArrayException:
-            raise StopIteration
-        self._index = self._index + 1
-        return value
+        modifications = self._modifications     # Changes made so far, any new one ends the iteration
+        ctrl = self._ctrl
+
+        for slot in range(self._capacity):
+            if modifications != self._modifications:
+                raise RuntimeError("SwissHashMap changed during iteration")
+            if ctrl[slot] < _CTRL_EMPTY:
+                yield slot
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
@@ -538,3 +2048,167 @@ if __name__ == "__main__":
     print(m)
     for item in m:
         print('K:', item.key, 'V:', item.value)
+
+    print("\nArrayHashMap - put/get/remove example 1")
+    print("---------------------")
+    m = ArrayHashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+    print(m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+    result = True
+    for i in range(150):
+        result &= m.get('str' + str(i)) == i * 100
+        if i % 2 == 0:
+            m.remove('str' + str(i))
+    for i in range(150):
+        result &= m.contains_key('str' + str(i)) == (i % 2 == 1)
+    print(result, m.get_size(), m.get_capacity())
+
+    print("\nincremental resize example 1")
+    print("---------------------")
+    m = HashMap(11, hash_function_1, True)
+    result = True
+    for i in range(300):
+        m.put('str' + str(i), i * 100)
+        if i % 3 == 2:
+            m.remove('str' + str(i - 1))
+    for i in range(300):
+        result &= m.get('str' + str(i)) == (None if i % 3 == 1 else i * 100)
+    print(result, m.get_size(), m.get_capacity())
+
+    print("\nput_many / get_many / remove_many example 1")
+    print("---------------------")
+    m = HashMap(11, hash_function_2)
+    m.put_many(('str' + str(i), i * 100) for i in range(100))
+    print(m.get_size(), m.get_capacity())
+    m.remove_many('str' + str(i) for i in range(0, 100, 2))
+    print(m.get_many(['str0', 'str1', 'str98', 'str99', 'missing']))
+
+    print("\nprobing strategies example 1")
+    print("---------------------")
+    for probing in PROBING_STRATEGIES:
+        m = HashMap(53, hash_function_1, probing=probing)
+        for i in range(150):
+            m.put('str' + str(i), i * 100)
+        for i in range(0, 150, 3):
+            m.remove('str' + str(i))
+        result = all(m.get('str' + str(i)) == (None if i % 3 == 0 else i * 100) for i in range(150))
+        print(probing, result, m.get_size(), m.get_capacity(), m.probe_stats())
+
+    print("\nNumpyIntHashMap - get_many example 1")
+    print("---------------------")
+    if np is None:
+        print("NumPy is not installed")
+    else:
+        m = NumpyIntHashMap(75)
+        keys = [i for i in range(25, 1000, 13)]
+        for key in keys:
+            m.put(key, key * 42)
+        m.remove(25)
+        hits, values = m.get_many(np.array(keys + [key + 1 for key in keys]))
+        print(m.get_size(), m.get_capacity(), int(hits.sum()),
+              all(values[i] == keys[i] * 42 for i in range(1, len(keys))))
+
+    print("\nkeys / values / items example 1")
+    print("---------------------")
+    m = HashMap(11, hash_function_1)
+    for i in range(5):
+        m.put(str(i), i * 10)
+    m.remove('2')
+    print(sorted(m.keys()), sorted(m.values()), sorted(m.items()))
+    print(sum(1 for key in m.keys() for value in m.values()))
+    try:
+        for key in m.keys():
+            m.put(key + '!', 0)
+    except RuntimeError as error:
+        print(error)
+
+    print("\nsave / load example 1")
+    print("---------------------")
+    import os
+    import tempfile
+    path = os.path.join(tempfile.mkdtemp(), 'map.snapshot')
+    for probing in PROBING_STRATEGIES:
+        m = HashMap(11, hash_function_1, probing=probing)
+        for i in range(200):
+            m.put('str' + str(i), i * 10)
+        for i in range(0, 200, 3):
+            m.remove('str' + str(i))
+        m.save(path)
+        loaded = HashMap.load(path)
+        print(probing, loaded.get_size() == m.get_size(), str(loaded) == str(m),
+              sorted(loaded.items()) == sorted(m.items()), loaded.get('str0'), loaded.get('str1'))
+        loaded.put('str0', 0)
+        print(loaded.get_size(), loaded.get_tombstones(), loaded.get('str0'))
+    try:
+        HashMap.load(path, hash_function_2)
+    except ValueError as error:
+        print(error)
+    os.remove(path)
+
+    print("\nget_stats example 1")
+    print("-------------------")
+    m = HashMap(11, hash_function_1, stats=True)
+    for i in range(50):
+        m.put('str' + str(i), i)
+    for i in range(0, 50, 5):
+        m.remove('str' + str(i))
+    stats = m.get_stats()
+    print(stats['size'], stats['capacity'], stats['tombstones'], stats['resizes'], stats['inserts'])
+    print(stats['lookups'], stats['probes'], stats['empty_buckets'] == m.empty_buckets())
+    m.reset_stats()
+    print(m.get_stats()['lookups'], HashMap(11, hash_function_1).get_stats())
+
+    print("\nSeededHash example 1")
+    print("--------------------")
+    from hash_functions import SeededHash
+    function = SeededHash(b'leaked seed')
+    keys = [key for key in ('str' + str(i) for i in range(30000)) if function(key) % 197 == 0][:60]
+    m = HashMap(197, function, stats=True)
+    for key in keys:
+        m.put(key, len(key))
+    print(m.get_size(), m.get_capacity(), m.get_stats()['reseeds'], m.probe_stats()['max'] < LONG_PROBE,
+          function.seed != b'leaked seed', all(m.get(key) == len(key) for key in keys))
+
+    print("\nreserve/shrink example 1")
+    print("------------------------")
+    m = HashMap(11, hash_function_1, shrink=True)
+    m.reserve(1000)
+    capacity = m.get_capacity()
+    for i in range(1000):
+        m.put('str' + str(i), i)
+    print(capacity, m.get_capacity() == capacity)
+    m.remove_many('str' + str(i) for i in range(990))
+    print(m.get_size(), m.get_capacity(), m.get('str995'))
+    m.clear()
+    print(m.get_size(), m.get_capacity())
+    m = HashMap(11, hash_function_1)
+    m.put_many(('str' + str(i), i) for i in range(1000))
+    m.remove_many('str' + str(i) for i in range(990))
+    capacity = m.get_capacity()
+    m.shrink_to_fit()
+    print(capacity, m.get_capacity(), m.get_tombstones(), m.get('str999'))
+
+    print("\nSwissHashMap example 1")
+    print("----------------------")
+    m = SwissHashMap(11, hash_function_1)
+    for i in range(200):
+        m.put('str' + str(i), i * 10)
+    for i in range(0, 200, 2):
+        m.remove('str' + str(i))
+    print(m.get_size(), m.get_capacity(), m.get_tombstones(), round(m.table_load(), 2))
+    print(m.get('str1'), m.get('str2'), m.contains_key('str199'), m.contains_key('missing'))
+    print(sorted(m.values())[:3], m.get_keys_and_values().length())
+
+    print("\nsnapshot example 1")
+    print("------------------")
+    for probing in PROBING_STRATEGIES:
+        m = HashMap(11, hash_function_1, probing=probing)
+        m.put_many(('str' + str(i), i) for i in range(1000))
+        view = m.snapshot()
+        for i in range(0, 1000, 50):
+            m.put('str' + str(i), -i)
+        m.remove('str1')
+        print(probing, view.get('str50'), m.get('str50'), view.get('str1'), m.get('str1'),
+              sum(view.values()), view.get_copied_pages())
+        view.close()
@@ -0,0 +1,111 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Builds hash maps from large inputs on several cores with a
+#              process pool, inserting the per-process entries by cached hash.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from a6_include import hash_function_1
+from hash_map_sc import HashMap as SCHashMap
+
+
+def _build_partition(map_class: type, function: callable, options: dict, pairs: list, combine):
+    """
+    Builds the map of one partition inside a worker process and returns its
+    entries with their cached hashes.
+
+    :param map_class: The hash map class that will be built.
+    :param function: The hash function given to the map.
+    :param options: Extra keyword arguments given to the map.
+    :param pairs: List of (key, value) tuples in the partition.
+    :param combine: Function used for duplicate keys, or None to keep the last value.
+
+    :return: Tuple of the map's hash scheme and a list of its (hash, key, value) tuples,
+             which pickle far smaller than the map itself.
+    """
+    m = map_class(11, function, **options)
+    if combine is None:
+        m.put_many(pairs)
+    else:
+        # Without hashes to reuse, every key is hashed once and combined in the same lookup
+        m._merge_hashed([(None, key, value) for key, value in pairs], False, combine)
+    return m._hash_scheme(), list(m._hashed_items())
+
+
+def parallel_build(pairs,
+                   map_class: type = SCHashMap,
+                   function: callable = hash_function_1,
+                   workers: int = None,
+                   combine=None,
+                   **options):
+    """
+    Builds one hash map from many key/value pairs with a process pool. The
+    pairs are split by the built-in hash of their key, so every copy of a key
+    lands in the same partition, and each worker builds the map of one
+    partition. The entries of every partition are then inserted by their
+    cached hashes, so no key is hashed again.
+
+    map_class, function, combine and the pairs must be picklable, which
+    means module-level functions rather than lambdas.
+
+    :param pairs: Iterable of (key, value) tuples.
+    :param map_class: hash_map_sc.HashMap or hash_map_oa.HashMap.
+    :param function: The hash function given to the map.
+    :param workers: Int value representing the number of processes, os.cpu_count() when None.
+    :param combine: Function called with (current value, new value) for repeated keys,
+                    such as operator.add for counting. When None, the last value is kept.
+    :param options: Extra keyword arguments given to the map, such as incremental.
+
+    :return: The built hash map.
+    """
+    workers = workers or os.cpu_count() or 1
+    partitions = [[] for _ in range(workers)]
+    for pair in pairs:
+        partitions[hash(pair[0]) % workers].append(pair)
+
+    with ProcessPoolExecutor(workers) as pool:
+        parts = list(pool.map(_build_partition,
+                              [map_class] * workers, [function] * workers, [options] * workers,
+                              partitions, [combine] * workers))
+
+    # Partitions share no keys, so the table is sized once for all of them. The hashes are
+    # reused unless a worker's SeededHash was reseeded and no longer matches the result's.
+    result = map_class(11, function, **options)
+    scheme = result._hash_scheme()
+    result._merge_hashed([entry for part_scheme, entries in parts for entry in entries],
+                         all(part_scheme == scheme for part_scheme, entries in parts))
+    return result
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    from operator import add
+
+    from hash_map_oa import HashMap as OAHashMap
+
+    print("\nparallel_build example 1")
+    print("------------------------")
+    m = parallel_build((('str' + str(i), i) for i in range(1000)), OAHashMap, workers=2)
+    print(m.get_size(), m.get('str0'), m.get('str999'), m.contains_key('str1000'))
+
+    print("\nparallel_build example 2")
+    print("------------------------")
+    words = "the quick brown fox jumps over the lazy dog the end".split()
+    m = parallel_build(((word, 1) for word in words * 100), workers=3, combine=add)
+    print(m.get_size(), m.get('the'), m.get('fox'))
+
+    print("\nmerge example 1")
+    print("---------------")
+    m1 = SCHashMap(11, hash_function_1)
+    m2 = OAHashMap(11, hash_function_1)
+    for word in ('a', 'b', 'c'):
+        m1.put(word, 1)
+    for word in ('b', 'c', 'd'):
+        m2.put(word, 10)
+    m1.merge(m2, add)
+    print(sorted(m1.items()))
+    m2.merge(m1)
+    print(sorted(m2.items()))
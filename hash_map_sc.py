@@ -6,71 +6,473 @@
 # Description: Implements a hashmap by utilizing chaining.
 
 
+import heapq
+import time
+from array import array
+from bisect import bisect_left
+from operator import itemgetter
+
 from a6_include import (DynamicArray, LinkedList,
                         hash_function_1, hash_function_2)
+from cow import MISSING, MapSnapshot, SnapshotRegistry
+from hash_functions import SeededHash, hash_many
+from primes import growth_prime, is_prime, next_prime
+import snapshot
+from stats import MapStats
+
+REHASH_STEPS = 16   # Old chains moved per operation during an incremental resize
+LONG_CHAIN = 32     # Chain length that makes a map with a SeededHash reseed and rehash
+TREEIFY_THRESHOLD = 8       # Suggested treeify length, the one Java's HashMap uses
+UNTREEIFY_THRESHOLD = 6     # Tree buckets shrinking below this length turn back into chains
+SHRINK_LOAD = .25   # Load factor under which a map built with shrink=True is resized to a load of .5
+
+# Bucket implementations accepted by HashMap
+LINKED_CHAINS = 'linked'                # a6_include.LinkedList nodes
+ARRAY_CHAINS = 'array'                  # Flat list of (hash, key, value) triples
+MOVE_TO_FRONT_CHAINS = 'move_to_front'  # Array chains that move a key to the front when it is found
+
+_MISSING = object()     # Returned by chain lookups when the key is not found, since None is a valid value
+
+
+class LinkedChain(LinkedList):
+    """
+    LinkedList bucket whose nodes also cache the hash of their key.
+    """
+
+    def _node(self, key: str, hash: int):
+        """
+        Walks the chain looking for a key, comparing cached hashes before keys.
+
+        :return: The node holding the key, or None if it is not found.
+        """
+        for node in self:
+            if node.hash == hash and node.key == key:
+                return node
+        return None
+
+    def find(self, key: str, hash: int):
+        """
+        Returns the value of a key, or _MISSING if it is not in the chain.
+        """
+        node = self._node(key, hash)
+        return _MISSING if node is None else node.value
+
+    def update(self, key: str, hash: int, value: object) -> bool:
+        """
+        Replaces the value of a key already in the chain.
+
+        :return: A boolean value representing whether or not the key was found.
+        """
+        node = self._node(key, hash)
+        if node is None:
+            return False
+        node.value = value
+        return True
+
+    def increment(self, key: str, hash: int, amount):
+        """
+        Adds an amount to the value of a key already in the chain.
+
+        :return: The new value, or _MISSING if the key is not in the chain.
+        """
+        node = self._node(key, hash)
+        if node is None:
+            return _MISSING
+        node.value += amount
+        return node.value
+
+    def add(self, key: str, value: object, hash: int) -> None:
+        """
+        Inserts a key that is not in the chain yet at the front of the chain.
+        """
+        self.insert(key, value)
+        self.contains(key).hash = hash      # The new node is the head, so this does not walk the chain
+
+    def discard(self, key: str, hash: int) -> bool:
+        """
+        Removes a key from the chain.
+
+        :return: A boolean value representing whether or not the key was removed.
+        """
+        return self.remove(key)
+
+    def entries(self):
+        """
+        Returns a generator of (hash, key, value) tuples for the chain.
+        """
+        return ((node.hash, node.key, node.value) for node in self)
+
+    def extend(self, entries: list) -> None:
+        """
+        Adds (hash, key, value) entries of keys that are not in the chain yet,
+        so that entries() returns them in the same order.
+        """
+        for index in range(len(entries) - 1, -1, -1):
+            hash, key, value = entries[index]
+            self.add(key, value, hash)
+
+
+class ArrayChain:
+    """
+    Bucket that stores its entries as consecutive hash, key and value items
+    of one flat list, so an entry costs three list slots instead of a node.
+    """
+
+    __slots__ = ('_items',)
+
+    def __init__(self) -> None:
+        self._items = []
+
+    def __str__(self) -> str:
+        items = self._items
+        pairs = [f"({items[i + 1]}: {items[i + 2]})" for i in range(0, len(items), 3)]
+        return 'ARR [' + ' -> '.join(pairs) + ']'
+
+    def length(self) -> int:
+        """
+        Return the number of entries in the chain
+        """
+        return len(self._items) // 3
+
+    def _index(self, key: str, hash: int) -> int:
+        """
+        Finds the position of a key's hash item, checking the first two
+        entries without a loop since most chains hold no more than two.
+
+        :return: The index of the entry's hash item, or -1 if it is not found.
+        """
+        items = self._items
+        length = len(items)
+        if length == 0:
+            return -1
+        if items[0] == hash and items[1] == key:
+            return 0
+        if length == 3:
+            return -1
+        if items[3] == hash and items[4] == key:
+            return 3
+        for index in range(6, length, 3):
+            if items[index] == hash and items[index + 1] == key:
+                return index
+        return -1
+
+    def find(self, key: str, hash: int):
+        """
+        Returns the value of a key, or _MISSING if it is not in the chain.
+        """
+        index = self._index(key, hash)
+        return _MISSING if index == -1 else self._items[index + 2]
+
+    def update(self, key: str, hash: int, value: object) -> bool:
+        """
+        Replaces the value of a key already in the chain.
+
+        :return: A boolean value representing whether or not the key was found.
+        """
+        index = self._index(key, hash)
+        if index == -1:
+            return False
+        self._items[index + 2] = value
+        return True
+
+    def increment(self, key: str, hash: int, amount):
+        """
+        Adds an amount to the value of a key already in the chain.
+
+        :return: The new value, or _MISSING if the key is not in the chain.
+        """
+        index = self._index(key, hash)
+        if index == -1:
+            return _MISSING
+        self._items[index + 2] += amount
+        return self._items[index + 2]
+
+    def add(self, key: str, value: object, hash: int) -> None:
+        """
+        Appends a key that is not in the chain yet.
+        """
+        self._items += (hash, key, value)
+
+    def discard(self, key: str, hash: int) -> bool:
+        """
+        Removes a key from the chain.
+
+        :return: A boolean value representing whether or not the key was removed.
+        """
+        index = self._index(key, hash)
+        if index == -1:
+            return False
+        del self._items[index:index + 3]
+        return True
+
+    def entries(self):
+        """
+        Returns a generator of (hash, key, value) tuples for the chain.
+        """
+        items = self._items
+        return ((items[i], items[i + 1], items[i + 2]) for i in range(0, len(items), 3))
+
+    def extend(self, entries: list) -> None:
+        """
+        Appends (hash, key, value) entries of keys that are not in the chain yet.
+        """
+        for entry in entries:
+            self._items += entry
+
+
+class MoveToFrontChain(ArrayChain):
+    """
+    ArrayChain that moves an entry to the front of the chain whenever it is
+    found, so hot keys are checked first.
+    """
+
+    __slots__ = ()
+
+    def _index(self, key: str, hash: int) -> int:
+        index = ArrayChain._index(self, key, hash)
+        if index > 0:
+            items = self._items
+            # One slice assignment, so a snapshot reading the chain never sees the entry twice
+            items[0:index + 3] = items[index:index + 3] + items[0:index]
+            return 0
+        return index
+
+    def entries(self):
+        """
+        Returns a generator of (hash, key, value) tuples for a copy of the
+        chain, since a get or contains_key reorders it while it is iterated.
+        """
+        items = self._items[:]
+        return ((items[i], items[i + 1], items[i + 2]) for i in range(0, len(items), 3))
+
+
+class TreeChain:
+    """
+    Bucket that keeps its entries ordered by (hash, key), the way Java's
+    HashMap treeifies long bins. The order lives in a sorted list searched
+    with bisect, so lookups take O(log n) comparisons, and the memmove an
+    insert or delete costs runs in C. Keys that share a hash must be
+    comparable with each other, as str keys are.
+    """
+
+    __slots__ = ('_order', '_values')
+
+    def __init__(self, entries=()) -> None:
+        """
+        :param entries: Iterable of (hash, key, value) tuples with unique keys.
+        """
+        entries = sorted(entries, key=lambda entry: (entry[0], entry[1]))
+        self._order = [(hash, key) for hash, key, value in entries]    # Sorted (hash, key) tuples
+        self._values = [value for hash, key, value in entries]         # Value of every tuple in _order
+
+    def __str__(self) -> str:
+        pairs = [f"({self._order[i][1]}: {self._values[i]})" for i in range(len(self._order))]
+        return 'TREE [' + ' -> '.join(pairs) + ']'
+
+    def length(self) -> int:
+        """
+        Return the number of entries in the chain
+        """
+        return len(self._order)
+
+    def _index(self, key: str, hash: int) -> int:
+        """
+        Binary searches for a key.
+
+        :return: The index of the key in _order, or -1 if it is not found.
+        """
+        index = bisect_left(self._order, (hash, key))
+        if index < len(self._order) and self._order[index][0] == hash and self._order[index][1] == key:
+            return index
+        return -1
+
+    def find(self, key: str, hash: int):
+        """
+        Returns the value of a key, or _MISSING if it is not in the chain.
+        """
+        index = self._index(key, hash)
+        return _MISSING if index == -1 else self._values[index]
+
+    def update(self, key: str, hash: int, value: object) -> bool:
+        """
+        Replaces the value of a key already in the chain.
+
+        :return: A boolean value representing whether or not the key was found.
+        """
+        index = self._index(key, hash)
+        if index == -1:
+            return False
+        self._values[index] = value
+        return True
+
+    def increment(self, key: str, hash: int, amount):
+        """
+        Adds an amount to the value of a key already in the chain.
+
+        :return: The new value, or _MISSING if the key is not in the chain.
+        """
+        index = self._index(key, hash)
+        if index == -1:
+            return _MISSING
+        self._values[index] += amount
+        return self._values[index]
+
+    def add(self, key: str, value: object, hash: int) -> None:
+        """
+        Inserts a key that is not in the chain yet at its ordered position.
+        """
+        index = bisect_left(self._order, (hash, key))
+        self._order.insert(index, (hash, key))
+        self._values.insert(index, value)
+
+    def discard(self, key: str, hash: int) -> bool:
+        """
+        Removes a key from the chain.
+
+        :return: A boolean value representing whether or not the key was removed.
+        """
+        index = self._index(key, hash)
+        if index == -1:
+            return False
+        del self._order[index]
+        del self._values[index]
+        return True
+
+    def entries(self):
+        """
+        Returns a generator of (hash, key, value) tuples in (hash, key) order.
+        """
+        return ((self._order[i][0], self._order[i][1], self._values[i]) for i in range(len(self._order)))
+
+    def extend(self, entries: list) -> None:
+        """
+        Adds (hash, key, value) entries of keys that are not in the chain yet.
+        """
+        for hash, key, value in entries:
+            self.add(key, value, hash)
+
+
+_CHAIN_CLASSES = {LINKED_CHAINS: LinkedChain, ARRAY_CHAINS: ArrayChain, MOVE_TO_FRONT_CHAINS: MoveToFrontChain}
+_EMPTY_COPY = ArrayChain()      # Copy of every empty chain, shared since snapshots never change their copies
+
+
+def _copy_chain(chain):
+    """
+    Returns a copy of a chain for a snapshot. Trees stay trees, and every
+    other chain becomes an ArrayChain, whose lookups never reorder it.
+    """
+    if chain.length() == 0:
+        return _EMPTY_COPY
+    if type(chain) is TreeChain:
+        return TreeChain(chain.entries())
+    copied = ArrayChain()
+    copied.extend(chain.entries())
+    return copied
+
+
+def _peek(chain, key: str, hash: int):
+    """
+    Returns the value of a key in a chain, or _MISSING, without moving the
+    key to the front of a MoveToFrontChain the map shares with a snapshot.
+    """
+    if type(chain) is MoveToFrontChain:
+        index = ArrayChain._index(chain, key, hash)
+        return _MISSING if index == -1 else chain._items[index + 2]
+    return chain.find(key, hash)
 
 
 class HashMap:
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 incremental: bool = False,
+                 chains: str = LINKED_CHAINS,
+                 stats: bool = False,
+                 treeify: int = None,
+                 shrink: bool = False) -> None:
         """
         Initialize new HashMap that uses
         separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+
+        When incremental is True, growing the table does not relink every chain
+        at once. The old buckets are kept next to the new ones and each later
+        put/get/contains_key/remove moves REHASH_STEPS of them.
+
+        chains selects the bucket implementation: LINKED_CHAINS, ARRAY_CHAINS
+        or MOVE_TO_FRONT_CHAINS.
+
+        When function is a hash_functions.SeededHash, a chain that reaches
+        LONG_CHAIN entries reseeds it and rehashes every key, so keys chosen
+        to collide cannot keep chains long.
+
+        When stats is True, the map keeps MapStats counters, read with get_stats.
+
+        When treeify is a length, such as TREEIFY_THRESHOLD, a chain that
+        grows past it becomes a TreeChain with O(log n) lookups, and turns back
+        into a chain when it shrinks below UNTREEIFY_THRESHOLD.
+
+        When shrink is True, a remove that leaves the load under SHRINK_LOAD
+        halves the table's load by resizing, never below the starting
+        capacity, and clear goes back to the starting capacity.
+
+        snapshot returns a read-only HashMapSnapshot that shares the chains
+        with the map, which copies a page of them before its first write.
         """
+        if chains not in _CHAIN_CLASSES:
+            raise ValueError(f"Unknown chain type: {chains}")
+        self._chains = chains
+        self._chain_class = _CHAIN_CLASSES[chains]
+        if treeify is not None and treeify < UNTREEIFY_THRESHOLD:
+            raise ValueError(f"Treeify threshold must be at least {UNTREEIFY_THRESHOLD}: {treeify}")
+        self._treeify = treeify
+
         self._buckets = DynamicArray()
 
         # capacity must be a prime number
         self._capacity = self._next_prime(capacity)
         for _ in range(self._capacity):
-            self._buckets.append(LinkedList())
+            self._buckets.append(self._chain_class())
+        self._cleared = self._chain_class()     # Empty chain shared by every bucket of a cleared table
+        self._shrink = shrink
+        self._min_capacity = self._capacity     # Smallest capacity automatic shrinking goes down to
 
         self._hash_function = function
+        self._seeded = isinstance(function, SeededHash)
+        self._reseeds = 0
         self._size = 0
+        self._modifications = 0      # Bumped by every change that adds, removes or moves entries
+        self._occupied = 0          # Non-empty chains in the current buckets, so empty_buckets does not scan
+        self._stats = MapStats() if stats is True else None
+
+        self._incremental = incremental
+        self._old_buckets = None    # Table being drained by an incremental resize
+        self._old_capacity = 0
+        self._rehash_index = 0      # Next old chain that will be moved
+        self._snapshots = None      # SnapshotRegistry of the open snapshots, made by the first one
 
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
+        self._finish_rehash()
         out = ''
         for i in range(self._buckets.length()):
             out += str(i) + ': ' + str(self._buckets[i]) + '\n'
         return out
 
-    def _next_prime(self, capacity: int) -> int:
+    @staticmethod
+    def _next_prime(capacity: int) -> int:
         """
-        Increment from given number and the find the closest prime number
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        Increment from given number to find the closest prime number
         """
-        if capacity % 2 == 0:
-            capacity += 1
-
-        while not self._is_prime(capacity):
-            capacity += 2
-
-        return capacity
+        return next_prime(capacity)
 
     @staticmethod
     def _is_prime(capacity: int) -> bool:
         """
         Determine if given integer is a prime number and return boolean
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity == 2 or capacity == 3:
-            return True
-
-        if capacity == 1 or capacity % 2 == 0:
-            return False
-
-        factor = 3
-        while factor ** 2 <= capacity:
-            if capacity % factor == 0:
-                return False
-            factor += 2
-
-        return True
+        return is_prime(capacity)
 
     def get_size(self) -> int:
         """
@@ -97,20 +499,183 @@ class HashMap:
 
         :return: None.
         """
-        # Checks to see if the table needs to be resized.
-        if self.table_load() >= 1:
-            self.resize_table(self._capacity * 2)
+        self._put_key(key, value, self._hash_function(key))
+        return
 
-        hash = self._hash_function(key)                     # Represents the hash value found with the key
-        index = hash % self._capacity                       # Represents the index the key and value will be added to
-        chain = self._buckets[index]                        # Represents the linked list (chain) at the index
+    def _put_key(self, key: str, value: object, hash: int) -> None:
+        """
+        put with an already computed hash value, which lets a ShardedHashMap
+        hash a key once both to pick its shard and to find its chain.
+        """
+        self._prepare_insert()
+        self._check_chain(self._put_hashed(key, value, hash))
 
-        if chain.remove(key) is True:                       # Checks for a duplicate key in the table, and replaces it
-            chain.insert(key, value)
-            return
-        chain.insert(key, value)
+    def _put_hashed(self, key: str, value: object, hash: int):
+        """
+        Adds or updates a key using an already computed hash value.
+
+        :param key: The key that will be added to the hash map.
+        :param value: The value that will be added to the hash map.
+        :param hash: The hash value of the key.
+
+        :return: The chain the key was added to, or None if it was already in the map.
+        """
+        chain = self._buckets[hash % self._capacity]        # Represents the chain at the index
+        if self._stats is not None:
+            self._stats.record_probe(chain.length())
+        if self._snapshots is not None:
+            self._snapshots.preserve(self._buckets, hash % self._capacity)
+
+        # Checks for a duplicate key in the table, and replaces its value in place
+        if chain.update(key, hash, value) is True:
+            return None
+        old_chain = self._old_chain(hash)
+        if old_chain is not None:
+            if self._snapshots is not None:
+                self._snapshots.preserve(self._old_buckets, hash % self._old_capacity)
+            if old_chain.update(key, hash, value) is True:
+                return None
+        chain = self._add(chain, key, value, hash)
         self._size += 1
-        return
+        self._modifications += 1
+        return chain
+
+    def _check_chain(self, chain) -> None:
+        """
+        Reseeds the hash function and rehashes every key when a key was added
+        to a chain of LONG_CHAIN entries or more and the map hashes with a SeededHash.
+
+        :param chain: The chain a key was added to, or None.
+
+        :return: None.
+        """
+        if self._seeded is True and chain is not None and chain.length() >= LONG_CHAIN:
+            self._reseed()
+
+    def _reseed(self) -> None:
+        """
+        Gives the hash function a new random seed and relinks every key into
+        chains of the same capacity under its new hash.
+
+        :return: None.
+        """
+        self._finish_rehash()
+        pairs = [(key, value) for hash, key, value in self._live_entries()]
+        self._hash_function.reseed()
+        self._reseeds += 1
+
+        stats = self._stats             # Relinked entries are not counted as operations
+        self._stats = None
+        self._buckets = DynamicArray()  # New chains, since snapshots may share the current ones
+        for _ in range(self._capacity):
+            self._buckets.append(self._chain_class())
+        self._occupied = 0
+        self._modifications += 1
+        for key, value in pairs:
+            hash = self._hash_function(key)
+            self._add(self._buckets[hash % self._capacity], key, value, hash)
+        self._stats = stats
+
+    def _add(self, chain, key: str, value: object, hash: int) -> None:
+        """
+        Adds a key that is not in the hash map yet to a chain of the current
+        buckets, counting the chain if it was empty.
+
+        :param chain: The chain the key belongs to.
+        :param key: The key that will be added.
+        :param value: The value of the key.
+        :param hash: The hash value of the key.
+
+        :return: The chain the key was added to.
+        """
+        collided = chain.length() != 0
+        if collided is False:
+            self._occupied += 1
+        if self._snapshots is not None:
+            self._snapshots.preserve(self._buckets, hash % self._capacity)
+        if self._stats is not None:
+            self._stats.record_insert(collided)
+        if chain is self._cleared:          # The bucket gets a chain of its own on its first key
+            chain = self._chain_class()
+            self._buckets[hash % self._capacity] = chain
+        chain.add(key, value, hash)
+
+        if self._treeify is not None and chain.length() > self._treeify and type(chain) is not TreeChain:
+            self._buckets[hash % self._capacity] = TreeChain(chain.entries())
+        return chain
+
+    def increment(self, key: str, amount=1):
+        """
+        Adds an amount to the value of a key in place, inserting the key with
+        the amount as its value if it is not in the hash map yet.
+
+        :param key: The key whose value will be incremented.
+        :param amount: The amount added to the value.
+
+        :return: The new value of the key.
+        """
+        return self._increment_key(key, amount, self._hash_function(key))
+
+    def _increment_key(self, key: str, amount, hash: int):
+        """
+        increment with an already computed hash value.
+        """
+        self._prepare_insert()
+
+        chain = self._buckets[hash % self._capacity]
+        if self._stats is not None:
+            self._stats.record_probe(chain.length())
+        if self._snapshots is not None:
+            self._snapshots.preserve(self._buckets, hash % self._capacity)
+
+        value = chain.increment(key, hash, amount)
+        if value is _MISSING:
+            old_chain = self._old_chain(hash)
+            if old_chain is not None:
+                if self._snapshots is not None:
+                    self._snapshots.preserve(self._old_buckets, hash % self._old_capacity)
+                value = old_chain.increment(key, hash, amount)
+        if value is not _MISSING:
+            return value
+        chain = self._add(chain, key, amount, hash)
+        self._size += 1
+        self._modifications += 1
+        self._check_chain(chain)
+        return amount
+
+    def _prepare_insert(self) -> None:
+        """
+        Moves part of an incremental resize along, and grows the table if one
+        more key would reach the load limit.
+
+        :return: None.
+        """
+        if self._old_buckets is not None:
+            self._rehash_step()
+
+        # Checks to see if the table needs to be resized.
+        new_capacity = self._grow_capacity()
+        if new_capacity is not None:
+            if self._incremental is True:
+                self._finish_rehash()
+                self._start_rehash(new_capacity)
+            else:
+                self.resize_table(new_capacity)
+
+    def _grow_capacity(self):
+        """
+        Returns the capacity the next new key will grow the table to, or None
+        if it fits in the current table.
+        """
+        if self.table_load() >= 1:
+            return self._capacity * 2
+        return None
+
+    def _empty_bucket(self):
+        """
+        Returns the contents of a new empty bucket.
+        """
+        return self._chain_class()
 
     def empty_buckets(self) -> int:
         """
@@ -118,14 +683,8 @@ class HashMap:
 
         :return: An int value representing the number of empty buckets.
         """
-        num = 0  # Represents the number of empty buckets found
-
-        for element in range(self._capacity):
-            chain = self._buckets[element]
-            # Checks for empty linked lists (empty buckets)
-            if chain.length() == 0:
-                num += 1
-        return num
+        self._finish_rehash()
+        return self._capacity - self._occupied
 
     def table_load(self) -> float:
         """
@@ -137,13 +696,22 @@ class HashMap:
 
     def clear(self) -> None:
         """
-        Clears the contents of the hash map, without changing the underlying capacity.
+        Clears the contents of the hash map, without changing the underlying
+        capacity unless the map was built with shrink=True. The map gets a
+        new bucket array in which every bucket holds the same shared empty
+        chain, so no chain is visited or made, and a bucket gets a chain of
+        its own when its first key is added. Open snapshots keep the old array.
 
         :return: None.
         """
-        for element in range(self._capacity):
-            self._buckets[element] = LinkedList()
+        if self._shrink is True:
+            self._capacity = self._min_capacity
+        self._buckets = DynamicArray([self._cleared] * self._capacity)
+        self._old_buckets = None
+        self._old_capacity = 0
         self._size = 0
+        self._occupied = 0
+        self._modifications += 1
         return
 
     def resize_table(self, new_capacity: int) -> None:
@@ -160,7 +728,14 @@ class HashMap:
         # Checks for a prime number, and updates to the next prime number if not found
         elif self._is_prime(new_capacity) is False:
             new_capacity = self._next_prime(new_capacity)
-
+        self._finish_rehash()
+        # Grows the capacity the same way put would while the entries are reinserted
+        while (self._size - 1) / new_capacity >= 1:
+            new_capacity = self._next_prime(new_capacity * 2)
+
+        start = time.perf_counter()
+        stats = self._stats                   # Relinked entries are not counted as operations
+        self._stats = None
         length = self._size                   # Represents the current size of the hash map.
         new_array = DynamicArray()            # Represents a temp dynamic array to house old values in hashmap
         empty_array = DynamicArray()          # Represents new empty array with updated capacity for hash map
@@ -168,25 +743,70 @@ class HashMap:
         for element in range(self._capacity):
             new_array.append(self._buckets[element])
         for bucket in range(new_capacity):
-            empty_array.append(LinkedList())
+            empty_array.append(self._chain_class())
 
         self._capacity = new_capacity
+        self._modifications += 1
         self._buckets = empty_array
-        self._size = 0
+        self._occupied = 0
         count = 0                             # Keeps track of the number of elements added to the hash map.
         indices = 0                           # Keeps track of the current index during iteration
 
+        # Keys are already unique, so entries are relinked by their cached hash without duplicate checks
         while count < length:
             chain = new_array[indices]
             if chain.length() != 0:
-                for node in chain:
-                    self.put(node.key, node.value)
+                for hash, key, value in chain.entries():
+                    self._add(empty_array[hash % new_capacity], key, value, hash)
                     count += 1
                 indices += 1
             else:
                 indices += 1
+
+        self._stats = stats
+        if stats is not None:
+            stats.record_resize(time.perf_counter() - start)
         return
 
+    def reserve(self, count: int) -> None:
+        """
+        Grows the table once so that it can hold the given number of keys
+        without resizing, instead of doubling repeatedly as they are added.
+
+        :param count: Int value representing the number of keys the table must hold.
+
+        :return: None.
+        """
+        self._finish_rehash()
+        if count / self._capacity >= 1:
+            self.resize_table(growth_prime(count + 1))
+
+    def shrink_to_fit(self) -> None:
+        """
+        Resizes the table to the smallest prime capacity that holds the
+        current keys, releasing the memory of buckets left by removed keys.
+
+        :return: None.
+        """
+        self.resize_table(self._size + 1)
+
+    def _check_shrink(self) -> None:
+        """
+        Shrinks a map built with shrink=True once removes leave its load under
+        SHRINK_LOAD. The new load is .5, so the table has to double its keys
+        before it grows again.
+
+        :return: None.
+        """
+        if self._shrink is False or self._old_buckets is not None or self._capacity <= self._min_capacity:
+            return
+        if self.table_load() < SHRINK_LOAD:
+            new_capacity = max(self._next_prime(2 * self._size), self._min_capacity)
+            if self._incremental is True:
+                self._start_rehash(new_capacity)
+            else:
+                self.resize_table(new_capacity)
+
     def get(self, key: str):
         """
         Returns a node value, using the associated key in the hash map.
@@ -198,16 +818,19 @@ class HashMap:
         # Checks for an empty hash map
         if self._size == 0:
             return None
+        return self._get_key(key, self._hash_function(key))
 
-        hash = self._hash_function(key)  # Represents the hash value found with the key
-        index = hash % self._capacity    # Represents the index the key and value will be added to
-        chain = self._buckets[index]     # Represents the linked list (chain) at the index
+    def _get_key(self, key: str, hash: int):
+        """
+        get with an already computed hash value.
+        """
+        if self._old_buckets is not None:
+            self._rehash_step()
 
-        if chain.length() == 0:
+        value = self._lookup(key, hash)
+        if value is _MISSING:
             return None
-        for node in chain:
-            if node.key == key:
-                return node.value
+        return value
 
     def contains_key(self, key: str) -> bool:
         """
@@ -220,17 +843,16 @@ class HashMap:
         # Checks for an empty hash map
         if self._size == 0:
             return False
+        return self._contains_key(key, self._hash_function(key))
 
-        hash = self._hash_function(key)  # Represents the hash value found with the key
-        index = hash % self._capacity    # Represents the index the key and value will be added to
-        chain = self._buckets[index]     # Represents the linked list (chain) at the index
+    def _contains_key(self, key: str, hash: int) -> bool:
+        """
+        contains_key with an already computed hash value.
+        """
+        if self._old_buckets is not None:
+            self._rehash_step()
 
-        if chain.length() == 0:
-            return False
-        for node in chain:
-            if node.key == key:
-                return True
-        return False
+        return self._lookup(key, hash) is not _MISSING
 
     def remove(self, key: str) -> None:
         """
@@ -243,15 +865,368 @@ class HashMap:
         # Checks for an empty hash map
         if self._size == 0:
             return
+        self._remove_key(key, self._hash_function(key))
+        return
+
+    def _remove_key(self, key: str, hash: int) -> None:
+        """
+        remove with an already computed hash value.
+        """
+        if self._old_buckets is not None:
+            self._rehash_step()
 
-        hash = self._hash_function(key)  # Represents the hash value found with the key
-        index = hash % self._capacity    # Represents the index the key and value will be added to
-        chain = self._buckets[index]     # Represents the linked list (chain) at the index
+        self._remove_hashed(key, hash)
+        self._check_shrink()
 
-        if chain.remove(key) is True:
-            self._size -= 1
+    def _remove_hashed(self, key: str, hash: int) -> None:
+        """
+        Removes a key using an already computed hash value.
+
+        :param key: The key that will be removed.
+        :param hash: The hash value of the key.
+
+        :return: None.
+        """
+        chain = self._buckets[hash % self._capacity]
+        old_chain = self._old_chain(hash)
+        if self._stats is not None:
+            self._stats.record_probe(chain.length())
+        if self._snapshots is not None:
+            self._snapshots.preserve(self._buckets, hash % self._capacity)
+            if old_chain is not None:
+                self._snapshots.preserve(self._old_buckets, hash % self._old_capacity)
+
+        if chain.discard(key, hash) is True:
+            if chain.length() == 0:
+                self._occupied -= 1
+            elif type(chain) is TreeChain and chain.length() < UNTREEIFY_THRESHOLD:
+                self._buckets[hash % self._capacity] = self._chain_class()
+                self._buckets[hash % self._capacity].extend(list(chain.entries()))
+        elif old_chain is None or old_chain.discard(key, hash) is False:
             return
-        return
+        self._size -= 1
+        self._modifications += 1
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds or updates many key/value pairs. The table is sized once for the
+        final count and every key is hashed before any of them are inserted.
+
+        :param pairs: Iterable of (key, value) tuples.
+
+        :return: None.
+        """
+        pairs = list(pairs)
+        hashes = hash_many([key for key, value in pairs], self._hash_function)
+
+        self.reserve(self._size + len(pairs))
+
+        reseeds = self._reseeds
+        for index in range(len(pairs)):
+            key, value = pairs[index]
+            # A reseed makes the hashes computed up front stale
+            hash = hashes[index] if self._reseeds == reseeds else self._hash_function(key)
+            self._check_chain(self._put_hashed(key, value, hash))
+
+    def get_many(self, keys) -> list:
+        """
+        Returns the values of many keys, hashing every key up front.
+
+        :param keys: Iterable of keys.
+
+        :return: List of values in the same order as the keys, None for missing keys.
+        """
+        keys = list(keys)
+        hashes = hash_many(keys, self._hash_function)
+        values = []
+
+        for index in range(len(keys)):
+            value = self._lookup(keys[index], hashes[index])
+            values.append(None if value is _MISSING else value)
+        return values
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes many keys, hashing every key up front.
+
+        :param keys: Iterable of keys.
+
+        :return: None.
+        """
+        keys = list(keys)
+        hashes = hash_many(keys, self._hash_function)
+
+        for index in range(len(keys)):
+            self._remove_hashed(keys[index], hashes[index])
+        self._check_shrink()
+
+    def merge(self, other, combine=None) -> None:
+        """
+        Adds every key of another hash map. When both maps hash keys the same
+        way, the other map's cached hashes are used and no key is hashed again.
+
+        :param other: hash_map_sc.HashMap or hash_map_oa.HashMap whose keys will be added.
+        :param combine: Function called with (current value, other value) for keys
+                        in both maps. When None, the other map's value replaces the current one.
+
+        :return: None.
+        """
+        reuse = other._hash_scheme() == self._hash_scheme()    # Cached hashes are only valid for the same scheme
+        self._merge_hashed(list(other._hashed_items()), reuse, combine)
+
+    def _merge_hashed(self, entries: list, reuse: bool, combine=None) -> None:
+        """
+        Adds (hash, key, value) entries taken from another map of this class,
+        sizing the table once for all of them. With combine the entries may
+        repeat keys, so the table is sized for the distinct ones.
+
+        :param entries: List of (hash, key, value) tuples, with unique keys unless combine is given.
+        :param reuse: A boolean value representing whether the hashes can be used as they are.
+        :param combine: Function called with (current value, new value) for keys already in the map.
+
+        :return: None.
+        """
+        if combine is None:
+            self.reserve(self._size + len(entries))
+        else:
+            self.reserve(self._size + len({key for hash, key, value in entries}))
+
+        reseeds = self._reseeds
+        for hash, key, value in entries:
+            if reuse is False or self._reseeds != reseeds:
+                hash = self._hash_function(key)
+            if combine is not None:
+                chain = self._buckets[hash % self._capacity]
+                current = chain.find(key, hash)
+                if current is not _MISSING:
+                    if self._snapshots is not None:
+                        self._snapshots.preserve(self._buckets, hash % self._capacity)
+                    chain.update(key, hash, combine(current, value))
+                    continue
+            self._check_chain(self._put_hashed(key, value, hash))
+
+    def _hash_scheme(self) -> tuple:
+        """
+        Returns what the cached hashes depend on, so merge can tell whether
+        another map's cached hashes can be used as they are.
+        """
+        return self._hash_function, False
+
+    def _hashed_items(self):
+        """
+        Returns a generator of (hash, key, value) tuples for every entry.
+        """
+        return self._live_entries()
+
+    def get_stats(self) -> dict:
+        """
+        Returns the counters kept since the map was built or reset_stats was
+        called, along with the current table figures. For this map a probe is
+        one entry of the chain a key hashes to, so probe_lengths is the
+        histogram of chain lengths met by each operation.
+
+        :return: Dictionary of stat names to values, or None when stats are disabled.
+        """
+        if self._stats is None:
+            return None
+        stats = self._stats.as_dict()
+        stats.update({'size': self._size, 'capacity': self._capacity, 'load': self.table_load(),
+                      'reseeds': self._reseeds, 'empty_buckets': self._capacity - self._occupied})
+        return stats
+
+    def reset_stats(self) -> None:
+        """
+        Sets the stats counters back to zero.
+
+        :return: None.
+        """
+        if self._stats is not None:
+            self._stats.reset()
+
+    def _old_chain(self, hash: int):
+        """
+        Returns the chain of the table being drained by an incremental resize
+        that could still hold a key with the given hash.
+
+        :param hash: The hash value of the key.
+
+        :return: The old chain, or None if there is none left to check.
+        """
+        if self._old_buckets is None:
+            return None
+        index = hash % self._old_capacity
+        if index < self._rehash_index:  # This chain has already been moved
+            return None
+        return self._old_buckets[index]
+
+    def _lookup(self, key: str, hash: int):
+        """
+        Finds the value of a key in the current table, or in the old table
+        during an incremental resize.
+
+        :param key: The key that will be searched for.
+        :param hash: The hash value of the key.
+
+        :return: The key's value, or _MISSING if it is not found.
+        """
+        chain = self._buckets[hash % self._capacity]
+        if self._stats is not None:
+            self._stats.record_probe(chain.length())
+
+        value = chain.find(key, hash)
+        if value is _MISSING:
+            old_chain = self._old_chain(hash)
+            if old_chain is not None:
+                value = old_chain.find(key, hash)
+        return value
+
+    def _start_rehash(self, new_capacity: int, buckets: DynamicArray = None) -> None:
+        """
+        Begins an incremental resize. The current buckets are kept as the old
+        table and their chains are moved into the new table a few at a time.
+
+        :param new_capacity: Int value representing the new capacity.
+        :param buckets: Optional DynamicArray of new_capacity empty chains built by the
+                        caller, such as AsyncHashMap, which builds it a chunk at a time.
+
+        :return: None.
+        """
+        start = time.perf_counter()
+        if self._is_prime(new_capacity) is False:
+            new_capacity = self._next_prime(new_capacity)
+
+        empty_array = buckets           # Represents new empty array with updated capacity for hash map
+        if empty_array is None:
+            empty_array = DynamicArray()
+            for bucket in range(new_capacity):
+                empty_array.append(self._chain_class())
+
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._rehash_index = 0
+        self._buckets = empty_array
+        self._capacity = new_capacity
+        self._occupied = 0
+        self._modifications += 1
+        if self._stats is not None:
+            self._stats.record_resize(time.perf_counter() - start)
+
+    def _rehash_step(self, steps: int = REHASH_STEPS) -> None:
+        """
+        Moves up to the given number of old chains into the new table, and
+        drops the old table once every chain has been moved.
+
+        :param steps: Int value representing the number of old chains to move.
+
+        :return: None.
+        """
+        start = time.perf_counter()
+        stats = self._stats             # Moved entries are not counted as operations
+        self._stats = None
+        end = min(self._rehash_index + steps, self._old_capacity)
+
+        for element in range(self._rehash_index, end):
+            for hash, key, value in self._old_buckets[element].entries():
+                self._add(self._buckets[hash % self._capacity], key, value, hash)
+        self._rehash_index = end
+
+        self._stats = stats
+        if stats is not None:
+            stats.record_resize(time.perf_counter() - start, 0)
+
+        if end == self._old_capacity:
+            self._old_buckets = None
+            self._old_capacity = 0
+
+    def _finish_rehash(self) -> None:
+        """
+        Completes an incremental resize that is still in progress.
+
+        :return: None.
+        """
+        if self._old_buckets is not None:
+            self._rehash_step(self._old_capacity)
+
+    def save(self, path: str) -> None:
+        """
+        Writes the bucket layout to a binary snapshot file: the capacity, the
+        hash function id, every chain's length and the cached hashes, so load
+        can rebuild the chains without hashing.
+
+        :param path: The path of the file that will be written.
+
+        :return: None.
+        """
+        self._finish_rehash()
+        lengths = array('I')        # Number of entries in every chain
+        hashes = []
+        keys = []
+        values = []
+
+        for index in range(self._capacity):
+            chain = self._buckets[index]
+            lengths.append(chain.length())
+            for hash, key, value in chain.entries():
+                hashes.append(hash)
+                keys.append(key)
+                values.append(value)
+
+        meta = {'kind': 'hash_map_sc.HashMap', 'function': snapshot.function_id(self._hash_function),
+                'capacity': self._capacity, 'size': self._size,
+                'incremental': self._incremental, 'chains': self._chains, 'treeify': self._treeify,
+                'shrink': self._shrink, 'min_capacity': self._min_capacity}
+        snapshot.write(path, meta, [lengths, snapshot.hash_array(hashes), (keys, values)])
+
+    @classmethod
+    def load(cls, path: str, function: callable = None) -> 'HashMap':
+        """
+        Rebuilds a hash map from a snapshot written by save, placing every
+        entry back in its saved chain and position with its saved hash.
+
+        :param path: The path of the snapshot file.
+        :param function: The hash function of the map, imported from the saved id when None.
+
+        :return: The loaded hash map.
+        """
+        meta, sections = snapshot.read(path, 'hash_map_sc.HashMap')
+        function = snapshot.check_function(function, meta['function'])
+        m = cls(1, function, meta['incremental'], meta['chains'], treeify=meta.get('treeify'),
+                shrink=meta.get('shrink', False))
+        m._min_capacity = meta.get('min_capacity', m._min_capacity)
+
+        lengths = array('I')
+        lengths.frombytes(sections[0])
+        entries = list(zip(snapshot.unpack_hashes(sections[1]), *snapshot.unpickle(sections[2])))
+
+        buckets = DynamicArray()
+        start = 0                   # Index of the first saved entry of the next chain
+        for length in lengths:
+            chain = m._chain_class()
+            if m._treeify is not None and length > m._treeify:
+                chain = TreeChain()
+            if length > 0:
+                chain.extend(entries[start:start + length])
+                start += length
+                m._occupied += 1
+            buckets.append(chain)
+
+        m._buckets = buckets
+        m._capacity = meta['capacity']
+        m._size = meta['size']
+        return m
+
+    def snapshot(self) -> 'HashMapSnapshot':
+        """
+        Returns a read-only view of the hash map as it is now, without copying
+        any chain. The map copies a page of chains into its open snapshots
+        before the first write to it, and a resize leaves the old chains to them.
+
+        :return: HashMapSnapshot of the map.
+        """
+        if self._snapshots is None:
+            self._snapshots = SnapshotRegistry(_copy_chain)
+        return HashMapSnapshot(self, self._buckets, self._capacity, self._size,
+                               self._old_buckets, self._old_capacity, self._rehash_index)
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -259,6 +1234,7 @@ class HashMap:
 
         :return: Dynamic array with tuple values.
         """
+        self._finish_rehash()
         count = 0                   # Keeps track of the number of elements added to the hash map.
         indices = 0                 # Keeps track of the current index during iteration
 
@@ -267,14 +1243,49 @@ class HashMap:
         while count < self._size:
             chain = self._buckets[indices]
             if chain.length() != 0:
-                for node in chain:
-                    new_array.append((node.key, node.value))
+                for hash, key, value in chain.entries():
+                    new_array.append((key, value))
                     count += 1
                 indices += 1
             else:
                 indices += 1
         return new_array
 
+    def _live_entries(self):
+        """
+        Generates the (hash, key, value) entries of every chain one at a time.
+        Each call has its own cursor, so several iterations can run at once.
+
+        :return: Generator of (hash, key, value) tuples.
+        """
+        self._finish_rehash()
+        modifications = self._modifications     # Changes made so far, any new one ends the iteration
+        buckets = self._buckets
+
+        for element in range(self._capacity):
+            for entry in buckets[element].entries():
+                if modifications != self._modifications:
+                    raise RuntimeError("HashMap changed during iteration")
+                yield entry
+
+    def keys(self):
+        """
+        Returns a generator over the keys of the hash map.
+        """
+        return (key for hash, key, value in self._live_entries())
+
+    def values(self):
+        """
+        Returns a generator over the values of the hash map.
+        """
+        return (value for hash, key, value in self._live_entries())
+
+    def items(self):
+        """
+        Returns a generator over (key, value) tuples of the hash map.
+        """
+        return ((key, value) for hash, key, value in self._live_entries())
+
     def find_mode_put(self, key: str, value=1) -> tuple:
         """
         Updates the key in a hash map, and uses the key's value to count the amount of duplicates of that same key.
@@ -284,22 +1295,31 @@ class HashMap:
 
         :return: Returns the key and value that was added.
         """
-        # Checks to see if the table needs to be resized.
-        if self.table_load() >= 1:
-            self.resize_table(self._capacity * 2)
+        return key, self.increment(key, value)
 
-        hash = self._hash_function(key)                # Represents the hash value found with the key
-        index = hash % self._capacity                  # Represents the index the key and value will be added to
-        chain = self._buckets[index]                   # Represents the linked list (chain) at the index
 
-        duplicates = self.get(key)
+class HashMapSnapshot(MapSnapshot):
+    """
+    MapSnapshot of a chaining HashMap, returned by HashMap.snapshot.
+    """
 
-        if chain.remove(key) is True:                  # Checks for a duplicate key in the table, and updates the value
-            chain.insert(key, value + duplicates)
-            return key, value + duplicates
-        chain.insert(key, value)
-        self._size += 1
-        return key, value
+    def _find(self, key: str, hash: int) -> object:
+        """
+        Returns the value of a key, checking the old table like the map does
+        during an incremental resize, or MISSING if it is not found.
+        """
+        value = _peek(self._buckets[hash % self._capacity], key, hash)
+        if value is _MISSING and self._old_buckets is not None:
+            index = hash % self._old_buckets.capacity
+            if index >= self._rehash_index:     # Chains before it had already been moved
+                value = _peek(self._old_buckets[index], key, hash)
+        return MISSING if value is _MISSING else value
+
+    def _bucket_items(self, chain) -> list:
+        """
+        Returns the (key, value) tuples of a chain.
+        """
+        return [(key, value) for hash, key, value in chain.entries()]
 
 
 def find_mode(da: DynamicArray) -> (DynamicArray, int):
@@ -310,24 +1330,37 @@ def find_mode(da: DynamicArray) -> (DynamicArray, int):
 
     :return: A dynamic array an int value representing the frequency of the mode.
     """
-    map = HashMap()                             # Hash map that will contain key/values derived from da array
-    mode_array = DynamicArray()                 # Array that will contain modes found in hash map
-    frequency = None                            # Represents the current frequency for mode
+    map = HashMap(chains=ARRAY_CHAINS)  # Hash map that will contain key/values derived from da array
+    modes = []              # Keys that reached the current highest frequency, in the order they reached it
+    frequency = None        # Represents the current frequency for mode
 
     for num in range(da.length()):
-        pair = map.find_mode_put(da[num])       # Adds values into hash map and returns the key/value pair added
-        value = pair[1]
-        if mode_array.length() == 0:
-            mode_array.append(pair[0])
+        key = da[num]
+        value = map.increment(key)      # One hash and one chain walk per element
+        if frequency is None or frequency < value:
+            modes.clear()
+            modes.append(key)
             frequency = value
         elif frequency == value:
-            mode_array.append(pair[0])
-        # if new key/value pair has a higher frequency, replaces mode_array with new array containing new pair
-        elif frequency < value:
-            mode_array = DynamicArray()
-            mode_array.append(pair[0])
-            frequency = value
-    return mode_array, frequency
+            modes.append(key)
+    return DynamicArray(modes), frequency
+
+
+def top_k(da: DynamicArray, k: int) -> DynamicArray:
+    """
+    Finds the k most frequent values of a dynamic array, using a hash map to
+    count them and a heap to select the largest counts.
+
+    :param da: Dynamic array that the values will derive from.
+    :param k: Int value representing the number of values returned.
+
+    :return: A dynamic array of (value, frequency) tuples, most frequent first.
+    """
+    map = HashMap(chains=ARRAY_CHAINS)  # Hash map that will contain key/values derived from da array
+
+    for num in range(da.length()):
+        map.increment(da[num])
+    return DynamicArray(heapq.nlargest(k, map.items(), key=itemgetter(1)))
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
@@ -530,3 +1563,161 @@ if __name__ == "__main__":
         da = DynamicArray(case)
         mode, frequency = find_mode(da)
         print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}\n")
+
+    print("\nincremental resize example 1")
+    print("---------------------")
+    m = HashMap(11, hash_function_1, True)
+    result = True
+    for i in range(300):
+        m.put('str' + str(i), i * 100)
+        if i % 3 == 2:
+            m.remove('str' + str(i - 1))
+    for i in range(300):
+        result &= m.get('str' + str(i)) == (None if i % 3 == 1 else i * 100)
+    print(result, m.get_size(), m.get_capacity())
+
+    print("\nput_many / get_many / remove_many example 1")
+    print("---------------------")
+    m = HashMap(11, hash_function_2)
+    m.put_many(('str' + str(i), i * 100) for i in range(100))
+    print(m.get_size(), m.get_capacity())
+    m.remove_many('str' + str(i) for i in range(0, 100, 2))
+    print(m.get_many(['str0', 'str1', 'str98', 'str99', 'missing']))
+
+    print("\nkeys / values / items example 1")
+    print("---------------------")
+    m = HashMap(11, hash_function_1)
+    for i in range(5):
+        m.put(str(i), i * 10)
+    m.remove('2')
+    print(sorted(m.keys()), sorted(m.values()), sorted(m.items()))
+    print(sum(1 for key in m.keys() for value in m.values()))
+    try:
+        for key in m.keys():
+            m.put(key + '!', 0)
+    except RuntimeError as error:
+        print(error)
+
+    print("\ntop_k example 1")
+    print("---------------")
+    da = DynamicArray(["one", "two", "three", "four", "five", "two", "three", "three", "five", "five", "five"])
+    print(top_k(da, 3))
+
+    print("\nchain types example 1")
+    print("---------------------")
+    for chains in (LINKED_CHAINS, ARRAY_CHAINS, MOVE_TO_FRONT_CHAINS):
+        m = HashMap(5, hash_function_1, chains=chains)
+        for key in ('ab', 'ba', 'c', 'ab'):
+            m.put(key, key.upper())
+        m.get('ba')
+        print(m.get_size(), str(m._buckets[0]))
+
+    print("\nchain types example 2")
+    print("---------------------")
+    for chains in (LINKED_CHAINS, ARRAY_CHAINS, MOVE_TO_FRONT_CHAINS):
+        m = HashMap(11, lambda key: 0, chains=chains)    # Every key in one chain
+        for i in range(6):
+            m.put(str(i), i)
+        seen = []
+        for key in m.keys():
+            m.get('5')
+            seen.append(key)
+        print(chains, sorted(seen) == [str(i) for i in range(6)])
+
+    print("\nsave / load example 1")
+    print("---------------------")
+    import os
+    import tempfile
+    path = os.path.join(tempfile.mkdtemp(), 'map.snapshot')
+    for chains in (LINKED_CHAINS, ARRAY_CHAINS, MOVE_TO_FRONT_CHAINS):
+        m = HashMap(11, hash_function_1, chains=chains)
+        for i in range(200):
+            m.put('str' + str(i), i * 10)
+        m.remove('str0')
+        m.save(path)
+        loaded = HashMap.load(path)
+        print(chains, loaded.get_size() == m.get_size(), str(loaded) == str(m),
+              loaded.get('str0'), loaded.get('str1'), loaded.get_capacity())
+    try:
+        HashMap.load(path, hash_function_2)
+    except ValueError as error:
+        print(error)
+    os.remove(path)
+
+    print("\nget_stats example 1")
+    print("-------------------")
+    m = HashMap(11, hash_function_1, stats=True)
+    for i in range(50):
+        m.put('str' + str(i), i)
+    for i in range(0, 50, 5):
+        m.remove('str' + str(i))
+    stats = m.get_stats()
+    print(stats['size'], stats['capacity'], stats['resizes'], stats['inserts'], stats['collisions'])
+    print(stats['lookups'], stats['probes'], stats['empty_buckets'] == m.empty_buckets())
+    m.reset_stats()
+    print(m.get_stats()['lookups'], HashMap(11, hash_function_1).get_stats())
+
+    print("\nSeededHash example 1")
+    print("--------------------")
+    from hash_functions import SeededHash
+    function = SeededHash(b'leaked seed')
+    keys = [key for key in ('str' + str(i) for i in range(20000)) if function(key) % 97 == 0][:40]
+    m = HashMap(97, function, stats=True)
+    for key in keys:
+        m.put(key, len(key))
+    longest = max(m._buckets[i].length() for i in range(m.get_capacity()))
+    print(m.get_size(), m.get_capacity(), m.get_stats()['reseeds'], longest < LONG_CHAIN,
+          function.seed != b'leaked seed', all(m.get(key) == len(key) for key in keys))
+
+    print("\nTreeChain example 1")
+    print("-------------------")
+    from itertools import permutations
+    keys = [''.join(letters) for letters in permutations('abcde')]     # 120 keys with one hash_function_1 value
+    m = HashMap(11, hash_function_1, treeify=TREEIFY_THRESHOLD)
+    for key in keys:
+        m.put(key, key.upper())
+    tree = m._buckets[hash_function_1('abcde') % m.get_capacity()]
+    print(type(tree).__name__, tree.length(), m.get('edcba'), m.contains_key('abcdf'))
+    for key in keys[5:]:
+        m.remove(key)
+    chain = m._buckets[hash_function_1('abcde') % m.get_capacity()]
+    print(type(chain).__name__, chain.length(), m.get_size(), m.get('abced'), m.get('edcba'))
+    try:
+        HashMap(11, hash_function_1, treeify=2)
+    except ValueError as error:
+        print(error)
+
+    print("\nreserve/shrink example 1")
+    print("------------------------")
+    m = HashMap(11, hash_function_1, shrink=True)
+    m.reserve(1000)
+    capacity = m.get_capacity()
+    for i in range(1000):
+        m.put('str' + str(i), i)
+    print(capacity, m.get_capacity() == capacity)
+    m.remove_many('str' + str(i) for i in range(990))
+    print(m.get_size(), m.get_capacity(), m.get('str995'))
+    m.clear()
+    print(m.get_size(), m.get_capacity())
+    m = HashMap(11, hash_function_1)
+    m.put_many(('str' + str(i), i) for i in range(1000))
+    m.remove_many('str' + str(i) for i in range(990))
+    capacity = m.get_capacity()
+    m.shrink_to_fit()
+    print(capacity, m.get_capacity(), m.get('str999'))
+
+    print("\nsnapshot example 1")
+    print("------------------")
+    m = HashMap(11, hash_function_1)
+    m.put_many(('str' + str(i), i) for i in range(1000))
+    with m.snapshot() as view:
+        exported = view.items()
+        print(next(exported), view.get_copied_pages())
+        m.put('str0', 'changed')
+        m.remove('str1')
+        for i in range(1000, 3000):
+            m.put('str' + str(i), i)
+        print(view.get_size(), view.get('str0'), view.get('str1'), view.contains_key('str2999'))
+        print(len(list(exported)) + 1, m.get_size(), m.get('str0'), view.get_copied_pages())
+    m.put('str0', 0)
+    print(m._snapshots is None)
@@ -0,0 +1,409 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Implements a thread-safe hash map that partitions keys across
+#              independently locked hash map shards.
+
+import copy
+import threading
+
+from a6_include import DynamicArray, hash_function_1
+from hash_functions import SeededHash
+from hash_map_oa import int_hash
+from hash_map_sc import HashMap as SCHashMap
+
+
+class ShardedHashMap:
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 shards: int = 16,
+                 map_class: type = SCHashMap,
+                 **options) -> None:
+        """
+        Initialize new ShardedHashMap. Keys are partitioned across the given
+        number of map_class instances by the high bits of their mixed hash,
+        and every shard has its own lock and resizes on its own schedule.
+        Shards of hash_map_sc.HashMap or hash_map_oa.HashMap are handed the
+        hash that picked them, so a key is hashed once per operation unless
+        the shard no longer hashes the same way, after reseeding its
+        SeededHash or with double hashing.
+
+        :param capacity: Int value representing the total starting capacity.
+        :param function: The hash function used by every shard.
+        :param shards: Int value representing the number of shards, a power of two.
+        :param map_class: hash_map_sc.HashMap, hash_map_oa.HashMap or another map with the same API.
+        :param options: Extra keyword arguments given to every shard, such as incremental.
+        """
+        if shards < 1 or shards & (shards - 1) != 0:
+            raise ValueError(f"Shard count must be a power of two: {shards}")
+
+        self._hash_function = function
+        self._scheme = (function, False)    # _hash_scheme of a shard the sharding hash can be handed to
+        self._hashed = hasattr(map_class, '_put_key')      # Whether shards have the hashed entry points
+        self._shift = 64 - (shards.bit_length() - 1)    # Leaves the top bits of a 64-bit hash
+        # A SeededHash is reseeded by the shard that detects long chains, so every shard
+        # gets its own copy and the copy kept here to pick shards never changes
+        self._shards = tuple(map_class(max(1, capacity // shards),
+                                       copy.copy(function) if isinstance(function, SeededHash) else function,
+                                       **options)
+                             for _ in range(shards))
+        self._locks = tuple(threading.Lock() for _ in range(shards))
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for index in range(len(self._shards)):
+            with self._locks[index]:
+                out += 'SHARD ' + str(index) + ':\n' + str(self._shards[index])
+        return out
+
+    def _route(self, key: str) -> tuple:
+        """
+        Returns the shard that owns a key and the key's hash. The hash is
+        mixed to pick the shard, since hash_function_1/2 leave the high bits
+        of small keys empty.
+
+        :param key: The key whose shard will be found.
+
+        :return: Tuple of an int value representing the shard index and the hash value of the key.
+        """
+        hash = self._hash_function(key)
+        return int_hash(hash) >> self._shift, hash
+
+    def _takes_hash(self, shard) -> bool:
+        """
+        Returns whether a shard can be given the hash _route computed instead
+        of hashing the key again. Called under the shard's lock, since a
+        reseed changes the answer.
+        """
+        return self._hashed is True and shard._hash_scheme() == self._scheme
+
+    def get_shard_count(self) -> int:
+        """
+        Return number of shards
+        """
+        return len(self._shards)
+
+    def get_size(self) -> int:
+        """
+        Returns the number of keys across every shard.
+
+        :return: An int value representing the size.
+        """
+        size = 0
+        for index in range(len(self._shards)):
+            with self._locks[index]:
+                size += self._shards[index].get_size()
+        return size
+
+    def get_capacity(self) -> int:
+        """
+        Returns the total capacity of every shard.
+
+        :return: An int value representing the capacity.
+        """
+        capacity = 0
+        for index in range(len(self._shards)):
+            with self._locks[index]:
+                capacity += self._shards[index].get_capacity()
+        return capacity
+
+    def table_load(self) -> float:
+        """
+        Returns the load factor across every shard.
+
+        :return: A float value representing the load factor.
+        """
+        return self.get_size() / self.get_capacity()
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key and value pair in the shard that owns the key.
+
+        :param key: The key that will be added to the hash map.
+        :param value: The value that will be added to the hash map.
+
+        :return: None.
+        """
+        index, hash = self._route(key)
+        with self._locks[index]:
+            shard = self._shards[index]
+            if self._takes_hash(shard) is True:
+                shard._put_key(key, value, hash)
+            else:
+                shard.put(key, value)
+
+    def increment(self, key: str, amount=1):
+        """
+        Adds an amount to the value of a key in place, inserting the key with
+        the amount as its value if it is not in the hash map yet. Only shards
+        that provide increment, such as hash_map_sc.HashMap, support this.
+
+        :param key: The key whose value will be incremented.
+        :param amount: The amount added to the value.
+
+        :return: The new value of the key.
+        """
+        index, hash = self._route(key)
+        with self._locks[index]:
+            shard = self._shards[index]
+            if self._takes_hash(shard) is True and hasattr(shard, '_increment_key'):
+                return shard._increment_key(key, amount, hash)
+            return shard.increment(key, amount)
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value of a key, or None if it is not in the hash map.
+
+        :param key: Represents the key, the value will be derived from.
+
+        :return: The key's value.
+        """
+        index, hash = self._route(key)
+        with self._locks[index]:
+            shard = self._shards[index]
+            if self._takes_hash(shard) is True:
+                return shard._get_key(key, hash)
+            return shard.get(key)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Searches for a given key in the hash map.
+
+        :param key: The key that the method will search for.
+
+        :return: A boolean value representing whether or not the key was found.
+        """
+        index, hash = self._route(key)
+        with self._locks[index]:
+            shard = self._shards[index]
+            if self._takes_hash(shard) is True:
+                return shard._contains_key(key, hash)
+            return shard.contains_key(key)
+
+    def remove(self, key: str) -> None:
+        """
+        Removes a key from the hash map.
+
+        :param key: The key that will be removed.
+
+        :return: None.
+        """
+        index, hash = self._route(key)
+        with self._locks[index]:
+            shard = self._shards[index]
+            if self._takes_hash(shard) is True:
+                shard._remove_key(key, hash)
+            else:
+                shard.remove(key)
+
+    def _partition(self, items, key_of) -> list:
+        """
+        Groups items by the shard that owns their key, keeping their positions
+        and the hashes of their keys.
+
+        :param items: List of items.
+        :param key_of: Function returning the key of an item.
+
+        :return: List with a list of (position, item, hash) tuples for every shard.
+        """
+        groups = [[] for _ in range(len(self._shards))]
+        for position in range(len(items)):
+            index, hash = self._route(key_of(items[position]))
+            groups[index].append((position, items[position], hash))
+        return groups
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds or updates many key/value pairs, taking each shard's lock once.
+
+        :param pairs: Iterable of (key, value) tuples.
+
+        :return: None.
+        """
+        groups = self._partition(list(pairs), lambda pair: pair[0])
+        for index in range(len(self._shards)):
+            if groups[index]:
+                with self._locks[index]:
+                    shard = self._shards[index]
+                    if self._hashed is True:
+                        # Sizes the shard once, and rehashes the keys itself if the hashes do not apply
+                        shard._merge_hashed([(hash, key, value) for position, (key, value), hash in groups[index]],
+                                            self._takes_hash(shard))
+                    else:
+                        shard.put_many(pair for position, pair, hash in groups[index])
+
+    def get_many(self, keys) -> list:
+        """
+        Returns the values of many keys, taking each shard's lock once.
+
+        :param keys: Iterable of keys.
+
+        :return: List of values in the same order as the keys, None for missing keys.
+        """
+        keys = list(keys)
+        groups = self._partition(keys, lambda key: key)
+        values = [None] * len(keys)
+
+        for index in range(len(self._shards)):
+            if groups[index]:
+                with self._locks[index]:
+                    shard = self._shards[index]
+                    if self._takes_hash(shard) is True:
+                        found = [shard._get_key(key, hash) for position, key, hash in groups[index]]
+                    else:
+                        found = shard.get_many(key for position, key, hash in groups[index])
+                for entry in range(len(found)):
+                    values[groups[index][entry][0]] = found[entry]
+        return values
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes many keys, taking each shard's lock once.
+
+        :param keys: Iterable of keys.
+
+        :return: None.
+        """
+        groups = self._partition(list(keys), lambda key: key)
+        for index in range(len(self._shards)):
+            if groups[index]:
+                with self._locks[index]:
+                    shard = self._shards[index]
+                    if self._takes_hash(shard) is True:
+                        for position, key, hash in groups[index]:
+                            shard._remove_key(key, hash)
+                    else:
+                        shard.remove_many(key for position, key, hash in groups[index])
+
+    def clear(self) -> None:
+        """
+        Clears every shard, without changing their capacities.
+
+        :return: None.
+        """
+        for index in range(len(self._shards)):
+            with self._locks[index]:
+                self._shards[index].clear()
+
+    def reserve(self, count: int) -> None:
+        """
+        Sizes every shard for its even share of the given number of keys. A
+        shard that receives more than its share still grows as usual.
+
+        :param count: Int value representing the number of keys the map must hold.
+
+        :return: None.
+        """
+        share = -(-count // len(self._shards))
+        for index in range(len(self._shards)):
+            with self._locks[index]:
+                self._shards[index].reserve(share)
+
+    def shrink_to_fit(self) -> None:
+        """
+        Resizes every shard to the smallest capacity that holds its keys.
+
+        :return: None.
+        """
+        for index in range(len(self._shards)):
+            with self._locks[index]:
+                self._shards[index].shrink_to_fit()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array containing tuples of all key/value pairs in every shard.
+
+        :return: Dynamic array with tuple values.
+        """
+        new_array = DynamicArray()
+        for pair in self.items():
+            new_array.append(pair)
+        return new_array
+
+    def items(self):
+        """
+        Returns a generator over (key, value) tuples of every shard. Each
+        shard is copied under its lock when the iteration reaches it, so other
+        threads may keep changing the map; every shard is seen consistently,
+        but the shards are not all seen at the same moment.
+        """
+        for index in range(len(self._shards)):
+            with self._locks[index]:
+                pairs = list(self._shards[index].items())
+            yield from pairs
+
+    def keys(self):
+        """
+        Returns a generator over the keys of every shard.
+        """
+        return (key for key, value in self.items())
+
+    def values(self):
+        """
+        Returns a generator over the values of every shard.
+        """
+        return (value for key, value in self.items())
+
+    def __iter__(self):
+        """
+        Iterates over the keys of every shard.
+        """
+        return self.keys()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    from hash_map_oa import HashMap as OAHashMap
+
+    print("\nShardedHashMap example 1")
+    print("------------------------")
+    m = ShardedHashMap(64, hash_function_1, shards=4)
+    for i in range(100):
+        m.put('str' + str(i), i * 10)
+    m.remove('str0')
+    print(m.get_size(), m.get('str42'), m.contains_key('str0'), m.get_shard_count())
+    print(sorted(m.keys())[:3], sum(m.values()))
+
+    print("\nShardedHashMap example 2")
+    print("------------------------")
+    m = ShardedHashMap(11, hash_function_1, shards=8, map_class=OAHashMap)
+    threads = [threading.Thread(target=m.put_many,
+                                args=([('t' + str(t) + '-' + str(i), i) for i in range(500)],))
+               for t in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(m.get_size(), m.get_many(['t0-0', 't3-499', 'missing']))
+
+    print("\nShardedHashMap example 3")
+    print("------------------------")
+    m = ShardedHashMap(11, hash_function_1, shards=2)
+    counters = [threading.Thread(target=lambda: [m.increment('hits') for _ in range(1000)])
+                for _ in range(4)]
+    for thread in counters:
+        thread.start()
+    for thread in counters:
+        thread.join()
+    print(m.get('hits'))
+    try:
+        ShardedHashMap(shards=3)
+    except ValueError as error:
+        print(error)
+
+    print("\nShardedHashMap example 4")
+    print("------------------------")
+    m = ShardedHashMap(11, hash_function_1, shards=4, shrink=True)
+    m.reserve(2000)
+    print(m.get_capacity())
+    m.put_many(('str' + str(i), i) for i in range(2000))
+    capacity = m.get_capacity()
+    m.remove_many('str' + str(i) for i in range(1990))
+    print(m.get_size(), m.get_capacity() < capacity)
+    m.shrink_to_fit()
+    print(m.get_size(), m.get('str1995'))
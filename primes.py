@@ -0,0 +1,81 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Prime capacity helpers shared by the hash map implementations.
+
+# Smallest prime >= 2 ** k, indexed by k, used to pre-size tables without a prime search
+GROWTH_PRIMES = (
+    2, 2, 5, 11, 17, 37, 67, 131, 257, 521, 1031, 2053, 4099, 8209, 16411, 32771,
+    65537, 131101, 262147, 524309, 1048583, 2097169, 4194319, 8388617, 16777259,
+    33554467, 67108879, 134217757, 268435459, 536870923, 1073741827, 2147483659,
+    4294967311, 8589934609, 17179869209, 34359738421, 68719476767, 137438953481,
+    274877906951, 549755813911, 1099511627791,
+)
+
+# Witnesses that make Miller-Rabin deterministic for every n < 3.3 * 10 ** 24
+_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+
+def is_prime(capacity: int) -> bool:
+    """
+    Determine if given integer is a prime number with a deterministic Miller-Rabin test.
+
+    :param capacity: The integer that will be tested.
+
+    :return: A boolean value representing whether or not the integer is prime.
+    """
+    if capacity < 2:
+        return False
+    for witness in _WITNESSES:
+        if capacity % witness == 0:
+            return capacity == witness
+
+    # Writes capacity - 1 as odd * 2 ** twos
+    odd = capacity - 1
+    twos = 0
+    while odd % 2 == 0:
+        odd //= 2
+        twos += 1
+
+    for witness in _WITNESSES:
+        x = pow(witness, odd, capacity)
+        if x == 1 or x == capacity - 1:
+            continue
+        for _ in range(twos - 1):
+            x = x * x % capacity
+            if x == capacity - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def next_prime(capacity: int) -> int:
+    """
+    Increment from given number to find the closest prime number, skipping even numbers.
+
+    :param capacity: The number the search starts from.
+
+    :return: The smallest odd prime greater than or equal to capacity.
+    """
+    if capacity % 2 == 0:
+        capacity += 1
+
+    while not is_prime(capacity):
+        capacity += 2
+
+    return capacity
+
+
+def growth_prime(capacity: int) -> int:
+    """
+    Returns a prime capacity of at least the given size from GROWTH_PRIMES in
+    O(1), falling back to next_prime beyond the end of the table.
+
+    :param capacity: Int value representing the minimum capacity.
+
+    :return: A prime capacity, at most about twice the given size.
+    """
+    index = max(2, (capacity - 1).bit_length())
+    if index < len(GROWTH_PRIMES):
+        return GROWTH_PRIMES[index]
+    return next_prime(capacity)
@@ -0,0 +1,148 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Versioned binary snapshot format shared by the hash map save/load methods.
+
+import importlib
+import json
+import pickle
+import struct
+from array import array
+
+MAGIC = b'A6SN'
+VERSION = 1
+
+# Magic, version, metadata length, section count
+_HEADER = struct.Struct('<4sHIH')
+_SECTION = struct.Struct('<Q')      # Byte length in front of every section
+
+
+def function_id(function: callable) -> str:
+    """
+    Returns the id a hash function is saved under, its module and name.
+
+    :param function: A module-level hash function.
+
+    :return: The function id.
+    """
+    if not hasattr(function, '__qualname__'):
+        raise ValueError(f"Only module-level hash functions can be saved, not {function!r}")
+    return function.__module__ + ':' + function.__qualname__
+
+
+def resolve_function(id: str) -> callable:
+    """
+    Imports the hash function a snapshot was saved with.
+
+    :param id: The function id returned by function_id.
+
+    :return: The hash function.
+    """
+    module, name = id.split(':')
+    function = importlib.import_module(module)
+    for attribute in name.split('.'):
+        function = getattr(function, attribute)
+    return function
+
+
+def check_function(function: callable, id: str) -> callable:
+    """
+    Returns the hash function a snapshot must be loaded with. The cached
+    hashes in a snapshot are only valid for the function that made them.
+
+    :param function: The hash function given to load, or None to import the saved one.
+    :param id: The function id stored in the snapshot.
+
+    :return: The hash function.
+    """
+    if function is None:
+        return resolve_function(id)
+    if function_id(function) != id:
+        raise ValueError(f"Snapshot was saved with hash function {id}, not {function_id(function)}")
+    return function
+
+
+def hash_array(hashes) -> array:
+    """
+    Packs cached hashes into an unsigned 64-bit array.
+
+    :param hashes: Iterable of hash values.
+
+    :return: array('Q') of the hashes.
+    """
+    try:
+        return array('Q', hashes)
+    except OverflowError:
+        raise ValueError("Snapshots need hash values between 0 and 2 ** 64 - 1") from None
+
+
+def write(path: str, meta: dict, sections: list) -> None:
+    """
+    Writes a snapshot file: a fixed header, JSON metadata, then each section
+    as a length-prefixed block of bytes. Arrays are written as their raw
+    buffers and any other section is pickled.
+
+    :param path: The path of the file that will be written.
+    :param meta: Dict of JSON-serializable metadata, such as the capacity.
+    :param sections: List of bytes-like objects, arrays or picklable objects.
+
+    :return: None.
+    """
+    meta = json.dumps(meta).encode()
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, len(meta), len(sections)))
+        file.write(meta)
+        for section in sections:
+            if isinstance(section, array):
+                data = section.tobytes()
+            elif isinstance(section, (bytes, bytearray)):
+                data = section
+            else:
+                data = pickle.dumps(section, pickle.HIGHEST_PROTOCOL)
+            file.write(_SECTION.pack(len(data)))
+            file.write(data)
+
+
+def read(path: str, kind: str) -> tuple:
+    """
+    Reads a snapshot file written by write.
+
+    :param path: The path of the snapshot file.
+    :param kind: The map class the snapshot must have been saved from.
+
+    :return: Tuple of the metadata dict and a list of memoryview sections.
+    """
+    with open(path, 'rb') as file:
+        data = memoryview(file.read())
+
+    magic, version, meta_length, count = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not a version {VERSION} hash map snapshot: {path}")
+    offset = _HEADER.size
+    meta = json.loads(bytes(data[offset:offset + meta_length]))
+    if meta['kind'] != kind:
+        raise ValueError(f"Snapshot holds a {meta['kind']}, not a {kind}")
+    offset += meta_length
+
+    sections = []
+    for _ in range(count):
+        length = _SECTION.unpack_from(data, offset)[0]
+        offset += _SECTION.size
+        sections.append(data[offset:offset + length])
+        offset += length
+    return meta, sections
+
+
+def unpack_hashes(section) -> array:
+    """
+    Returns the array('Q') stored in a section.
+    """
+    hashes = array('Q')
+    hashes.frombytes(section)
+    return hashes
+
+
+def unpickle(section):
+    """
+    Returns the object pickled in a section.
+    """
+    return pickle.loads(section)
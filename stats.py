@@ -0,0 +1,73 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Counters kept by the hash maps when they are built with stats=True.
+
+
+class MapStats:
+    """
+    Operation counters of one hash map. The map updates them as it works, so
+    reading them never scans the table.
+    """
+
+    __slots__ = ('lookups', 'probes', 'probe_lengths', 'inserts', 'collisions',
+                 'resizes', 'resize_seconds', 'longest_resize')
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Sets every counter back to zero.
+
+        :return: None.
+        """
+        self.lookups = 0            # Probe sequences or chains walked by put/get/contains_key/remove
+        self.probes = 0             # Buckets or chain entries those walks covered
+        self.probe_lengths = {}     # Histogram of walk length to number of walks
+        self.inserts = 0            # New keys added
+        self.collisions = 0         # New keys whose home bucket was already taken
+        self.resizes = 0
+        self.resize_seconds = 0.0   # Includes the steps of incremental resizes
+        self.longest_resize = 0.0
+
+    def record_probe(self, length: int) -> None:
+        """
+        Counts one probe sequence or chain walk of the given length.
+        """
+        self.lookups += 1
+        self.probes += length
+        self.probe_lengths[length] = self.probe_lengths.get(length, 0) + 1
+
+    def record_insert(self, collided: bool) -> None:
+        """
+        Counts one new key, and whether its home bucket was already taken.
+        """
+        self.inserts += 1
+        if collided is True:
+            self.collisions += 1
+
+    def record_resize(self, seconds: float, count: int = 1) -> None:
+        """
+        Counts time spent resizing. Steps of an incremental resize pass a
+        count of 0, so only the resize that started them is counted.
+        """
+        self.resizes += count
+        self.resize_seconds += seconds
+        self.longest_resize = max(self.longest_resize, seconds)
+
+    def as_dict(self) -> dict:
+        """
+        Returns the counters and the rates derived from them.
+
+        :return: Dictionary of counter names to values.
+        """
+        return {'lookups': self.lookups,
+                'probes': self.probes,
+                'average_probe': self.probes / self.lookups if self.lookups > 0 else 0.0,
+                'probe_lengths': dict(sorted(self.probe_lengths.items())),
+                'inserts': self.inserts,
+                'collisions': self.collisions,
+                'collision_rate': self.collisions / self.inserts if self.inserts > 0 else 0.0,
+                'resizes': self.resizes,
+                'resize_seconds': self.resize_seconds,
+                'longest_resize': self.longest_resize}